@@ -0,0 +1,256 @@
+"""
+CLI não interativa (headless) para importações e manutenção.
+
+Pensada para cron/scripts: não exibe splash, não pede login nem navegação
+em menu. O resumo da execução é impresso em JSON no stdout; mensagens de
+andamento dos serviços e o progresso (JSON lines) vão para o stderr.
+
+Exemplos:
+	python -m app.cli import itr --years 2020-2024 --workers 8
+	python -m app.cli import fca --years 2023,2024 --progress none
+	python -m app.cli import dfp --years 2024 --profile-memory
+	python -m app.cli restatements --years 2024 --min-pct 1
+	python -m app.cli migrate
+	python -m app.cli backup
+
+Códigos de saída:
+	0 sucesso | 1 falha | 2 uso inválido | 3 falha parcial (algum ano falhou)
+"""
+import argparse
+import contextlib
+import json
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+
+EXIT_OK = 0
+EXIT_FALHA = 1
+EXIT_USO = 2
+EXIT_PARCIAL = 3
+
+TIPOS_IMPORTACAO = ('fca', 'itr', 'dfp')
+COLUNAS_RESUMO = (
+	'arquivo', 'total_registros', 'inseridos', 'atualizados', 'ignorados', 'erros',
+	'segundos', 'linhas_s',
+)
+
+
+def parse_anos(valor: str) -> list[int]:
+	"""Converte '2020-2024', '2020,2022' ou '2024' em lista ordenada de anos."""
+	anos = set()
+	try:
+		for parte in valor.split(','):
+			parte = parte.strip()
+			if not parte:
+				continue
+			if '-' in parte:
+				inicio, fim = (int(p) for p in parte.split('-', 1))
+				if inicio > fim:
+					raise argparse.ArgumentTypeError(f'Intervalo de anos inválido: {parte}')
+				anos.update(range(inicio, fim + 1))
+			else:
+				anos.add(int(parte))
+	except ValueError:
+		raise argparse.ArgumentTypeError(f'Anos inválidos: {valor}. Use 2024, 2020-2024 ou 2020,2022')
+	if not anos:
+		raise argparse.ArgumentTypeError('Informe ao menos um ano')
+	return sorted(anos)
+
+
+def parse_percentual(valor: str) -> Decimal:
+	"""'1', '2.5' ou '2,5' -> Decimal não negativo."""
+	try:
+		pct = Decimal(valor.replace(',', '.'))
+	except ArithmeticError:
+		raise argparse.ArgumentTypeError(f'Percentual inválido: {valor}')
+	if not pct.is_finite() or pct < 0:
+		raise argparse.ArgumentTypeError(f'Percentual inválido: {valor}')
+	return pct
+
+
+def _criar_servico(tipo: str, progresso=None, perfil_memoria: bool = False):
+	if tipo == 'fca':
+		from .services.importacao.fca_import_service import FcaImportService
+		return FcaImportService(progresso, perfil_memoria)
+	if tipo == 'itr':
+		from .services.importacao.itr_import_service import ItrImportService
+		return ItrImportService(progresso, perfil_memoria)
+	from .services.importacao.dfp_import_service import DfpImportService
+	return DfpImportService(progresso, perfil_memoria)
+
+
+def _resumo_ano(tipo: str, resultado) -> dict:
+	if tipo == 'fca':
+		inseridos, atualizados, ignorados, erros, _ = resultado
+		return {
+			'inseridos': inseridos,
+			'atualizados': atualizados,
+			'ignorados': ignorados,
+			'erros': erros,
+		}
+	return {'arquivos': [dict(zip(COLUNAS_RESUMO, linha)) for linha in resultado]}
+
+
+def _atualizar_ttm() -> dict:
+	"""Recalcula a DRE TTM das empresas com demonstrativos novos."""
+	from .services.ttm_service import TtmService
+	inicio = time.perf_counter()
+	try:
+		item = {'status': 'ok', **TtmService().atualizar()._asdict()}
+	except Exception as e:
+		item = {'status': 'erro', 'erro': str(e)}
+	item['duracao_s'] = round(time.perf_counter() - inicio, 3)
+	return item
+
+
+def cmd_importar(args) -> tuple[dict, int]:
+	"""
+	Baixa os anos em paralelo (--workers) e importa sequencialmente,
+	na ordem dos anos, para não disputar o lock de escrita do SQLite.
+	Com --profile-memory não há executor: cada ano é baixado logo antes de
+	ser importado. O tracemalloc é global ao processo; um download em
+	andamento durante a importação de outro ano misturaria as alocações e
+	teria o rastreamento encerrado pelo perfil do ano anterior.
+
+	Depois de ITR/DFP com algum ano importado, atualiza a DRE TTM como o
+	menu de importação. Uma falha nela vai para 'ttm' no resultado sem
+	mudar o status da importação.
+	"""
+	progresso = None
+	if args.progress == 'json':
+		from .ui.progresso import JsonLinesProgresso
+		progresso = JsonLinesProgresso(tipo=args.tipo)
+	servico = _criar_servico(args.tipo, progresso, args.profile_memory)
+	importar = servico.importar_arquivo if args.tipo == 'fca' else servico.importar_arquivos
+	anos_resumo = []
+
+	with contextlib.ExitStack() as pilha:
+		if args.profile_memory:
+			baixar = servico.baixar
+		else:
+			pool = pilha.enter_context(ThreadPoolExecutor(max_workers=max(1, args.workers)))
+			downloads = {ano: pool.submit(servico.baixar, ano) for ano in args.years}
+			baixar = lambda ano: downloads[ano].result()
+		for ano in args.years:
+			inicio = time.perf_counter()
+			try:
+				paths = baixar(ano)
+			except Exception as e:
+				servico.registrar_falha(ano, e)
+				item = {'ano': ano, 'status': 'erro', 'erro': str(e)}
+			else:
+				try:
+					item = {'ano': ano, 'status': 'ok', **_resumo_ano(args.tipo, importar(ano, paths))}
+				except Exception as e:
+					item = {'ano': ano, 'status': 'erro', 'erro': str(e)}
+			item['duracao_s'] = round(time.perf_counter() - inicio, 3)
+			if ano in servico.metricas:
+				item['metricas'] = servico.metricas[ano].como_dict()
+			if ano in servico.erros:
+				item['detalhe_erros'] = servico.erros[ano].como_dict()
+			anos_resumo.append(item)
+
+	ok = sum(1 for item in anos_resumo if item['status'] == 'ok')
+	if ok == len(anos_resumo):
+		status, codigo = 'ok', EXIT_OK
+	elif ok == 0:
+		status, codigo = 'erro', EXIT_FALHA
+	else:
+		status, codigo = 'parcial', EXIT_PARCIAL
+
+	resultado = {'comando': 'import', 'tipo': args.tipo, 'status': status, 'anos': anos_resumo}
+	if args.tipo in ('itr', 'dfp') and ok:
+		resultado['ttm'] = _atualizar_ttm()
+	return resultado, codigo
+
+
+def cmd_reapresentacoes(args) -> tuple[dict, int]:
+	"""Documentos reapresentados em cada ano com as contas alteradas (última versão x anterior)."""
+	from .services.reapresentacao_service import ReapresentacaoService
+	servico = ReapresentacaoService()
+	anos_resumo = []
+	for ano in args.years:
+		documentos = []
+		for r in servico.reapresentacoes(ano, args.min_pct):
+			if not r.diferencas:
+				continue
+			documentos.append({
+				'cnpj': r.cnpj, 'razao_social': r.razao_social, 'data_referencia': r.data_referencia,
+				'versao_anterior': r.versao_anterior, 'versao': r.versao,
+				'contas': [
+					{campo: (str(valor) if isinstance(valor, Decimal) else valor) for campo, valor in d._asdict().items()}
+					for d in r.diferencas
+				],
+			})
+		anos_resumo.append({'ano': ano, 'documentos': documentos})
+	return {'comando': 'restatements', 'status': 'ok', 'anos': anos_resumo}, EXIT_OK
+
+
+def cmd_migrate(args) -> tuple[dict, int]:
+	# as migrations já foram aplicadas em main()
+	return {'comando': 'migrate', 'status': 'ok'}, EXIT_OK
+
+
+def cmd_backup(args) -> tuple[dict, int]:
+	from .services.backup_service import make_backup
+	destino = make_backup()
+	return {'comando': 'backup', 'status': 'ok', 'arquivo': str(destino)}, EXIT_OK
+
+
+def build_parser() -> argparse.ArgumentParser:
+	parser = argparse.ArgumentParser(
+		prog='python -m app.cli',
+		description='D-MARK I - importações e manutenção sem interação (saída JSON).',
+	)
+	sub = parser.add_subparsers(dest='comando', required=True)
+
+	p_import = sub.add_parser('import', help='Importa dados da CVM')
+	p_import.add_argument('tipo', choices=TIPOS_IMPORTACAO, help='Conjunto de dados')
+	p_import.add_argument('--years', type=parse_anos, required=True,
+		help='Anos: 2024, 2020-2024 ou 2020,2022')
+	p_import.add_argument('--workers', type=int, default=1,
+		help='Downloads simultâneos (padrão: 1)')
+	p_import.add_argument('--progress', choices=('json', 'none'), default='json',
+		help='Progresso em JSON lines no stderr ou nenhum (padrão: json)')
+	p_import.add_argument('--profile-memory', action='store_true',
+		help='Perfil de memória por etapa (tracemalloc; bem mais lento)')
+	p_import.set_defaults(func=cmd_importar)
+
+	p_restat = sub.add_parser('restatements', help='Lista as reapresentações de ITR/DFP já importadas')
+	p_restat.add_argument('--years', type=parse_anos, required=True,
+		help='Anos de referência: 2024, 2020-2024 ou 2020,2022')
+	p_restat.add_argument('--min-pct', type=parse_percentual, default=Decimal('0'),
+		help='Variação mínima por conta, em %% do valor anterior (padrão: 0)')
+	p_restat.set_defaults(func=cmd_reapresentacoes)
+
+	p_migrate = sub.add_parser('migrate', help='Aplica as migrations pendentes')
+	p_migrate.set_defaults(func=cmd_migrate)
+
+	p_backup = sub.add_parser('backup', help='Cria um backup do banco')
+	p_backup.set_defaults(func=cmd_backup)
+
+	return parser
+
+
+def main(argv: list[str] | None = None) -> int:
+	args = build_parser().parse_args(argv)
+
+	from .core.utils import ensure_dirs
+	from .db.bootstrap import apply_migrations
+
+	# stdout fica reservado para o JSON final
+	try:
+		with contextlib.redirect_stdout(sys.stderr):
+			ensure_dirs()
+			apply_migrations()
+			resumo, codigo = args.func(args)
+	except Exception as e:
+		resumo, codigo = {'comando': args.comando, 'status': 'erro', 'erro': str(e)}, EXIT_FALHA
+
+	print(json.dumps(resumo, ensure_ascii=False))
+	return codigo
+
+
+if __name__ == '__main__':
+	sys.exit(main())
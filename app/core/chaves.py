@@ -0,0 +1,40 @@
+"""
+Conjunto compacto de chaves únicas já gravadas no banco.
+
+Usado pelas importações para descartar, antes do INSERT, linhas que já
+existem na base (reimportações ignoram a grande maioria das linhas).
+"""
+import sys
+from typing import Hashable, Iterable
+
+intern = sys.intern
+
+
+def _compactar(chave: tuple) -> tuple:
+	"""Interna os textos da chave: CNPJ, data, grupo e conta se repetem em milhares de chaves."""
+	return tuple(intern(valor) if type(valor) is str else valor for valor in chave)
+
+
+class ChaveSet:
+	"""
+	Guarda as chaves (tuplas) exatas, com os textos internados: cada
+	string distinta fica uma vez na memória, e o custo por chave é a tupla
+	e a entrada no set.
+
+	A pertinência é por igualdade, não só por hash: uma chave nova nunca é
+	descartada por colidir com uma já gravada.
+	"""
+
+	__slots__ = ('_chaves',)
+
+	def __init__(self, chaves: Iterable[tuple] = ()):
+		self._chaves = {_compactar(chave) for chave in chaves}
+
+	def __contains__(self, chave: Hashable) -> bool:
+		return chave in self._chaves
+
+	def __len__(self) -> int:
+		return len(self._chaves)
+
+	def add(self, chave: tuple) -> None:
+		self._chaves.add(_compactar(chave))
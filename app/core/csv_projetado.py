@@ -0,0 +1,91 @@
+"""
+Leitura de CSV projetada: só as colunas usadas, por posição.
+
+O cabeçalho é lido uma vez e as colunas pedidas viram posições de um
+itemgetter; cada linha do csv.reader sai como tupla só com esses campos,
+na ordem pedida (sem montar um dict por linha como o DictReader).
+
+Colunas ausentes no cabeçalho são reportadas antes da primeira linha
+(ValidationError, com a coluna parecida quando parece renomeada), em vez
+de virarem '' em cada row.get. Só as declaradas como opcionais são lidas
+como '' quando faltam.
+"""
+import csv
+import difflib
+from operator import itemgetter
+from typing import Iterable, Iterator, List, Optional, Sequence, Tuple
+from .excecoes import ValidationError
+
+
+class LeitorCsvProjetado:
+	"""
+	Uso:
+		leitor = LeitorCsvProjetado(f, ('CNPJ_CIA', 'VL_CONTA'), arquivo=nome)
+		for row_num, (cnpj, valor) in enumerate(leitor, start=2): ...
+
+	Linhas com menos colunas que as posições projetadas saem como None (o
+	chamador registra o erro com mensagem_linha_incompleta e segue).
+	"""
+
+	def __init__(self, fonte: Iterable[str], colunas: Sequence[str], arquivo: str = '',
+				 opcionais: Sequence[str] = (), delimiter: str = ';', quoting: int = csv.QUOTE_NONE):
+		self.arquivo = arquivo
+		self.colunas = tuple(colunas)
+		# padrão dos CSVs da CVM: sem aspas, '\\' como escape
+		escapechar = '\\' if quoting == csv.QUOTE_NONE else None
+		self._reader = csv.reader(fonte, delimiter=delimiter, quoting=quoting, escapechar=escapechar)
+
+		cabecalho = next(self._reader, None)
+		if cabecalho is None:
+			raise ValidationError(f"{arquivo or 'CSV'}: arquivo vazio (sem cabeçalho)")
+		if cabecalho:
+			# BOM UTF-8 (lido como latin1 vira 'ï»¿')
+			cabecalho[0] = cabecalho[0].lstrip('\ufeff\xef\xbb\xbf')
+		self.cabecalho: List[str] = [nome.strip() for nome in cabecalho]
+
+		posicoes = {}
+		for i, nome in enumerate(self.cabecalho):
+			posicoes.setdefault(nome, i)
+		faltando = [nome for nome in self.colunas if nome not in posicoes and nome not in opcionais]
+		if faltando:
+			raise ValidationError(self._mensagem_ausentes(faltando))
+
+		# opcionais ausentes apontam para uma posição extra, completada com ''
+		extra = len(self.cabecalho)
+		indices = [posicoes.get(nome, extra) for nome in self.colunas]
+		self.ausentes: Tuple[str, ...] = tuple(nome for nome in self.colunas if nome not in posicoes)
+		self.largura = max((i for i in indices if i != extra), default=-1) + 1
+		self._projetar = itemgetter_tupla(indices)
+		if self.ausentes:
+			projetar, vazio = self._projetar, ['']
+			self._projetar = lambda linha: projetar(linha[:extra] + vazio)
+
+	@property
+	def mensagem_linha_incompleta(self) -> str:
+		return f"Linha incompleta: esperadas ao menos {self.largura} colunas"
+
+	def __iter__(self) -> Iterator[Optional[tuple]]:
+		projetar = self._projetar
+		while True:
+			try:
+				# map em C no caminho comum; IndexError = linha curta (já consumida)
+				yield from map(projetar, self._reader)
+				return
+			except IndexError:
+				yield None
+
+	def _mensagem_ausentes(self, faltando: List[str]) -> str:
+		detalhes = []
+		for nome in faltando:
+			parecidas = difflib.get_close_matches(nome, self.cabecalho, n=1, cutoff=0.6)
+			detalhes.append(f"{nome} (renomeada para {parecidas[0]}?)" if parecidas else nome)
+		return f"{self.arquivo or 'CSV'}: colunas ausentes no cabeçalho: {', '.join(detalhes)}"
+
+
+def itemgetter_tupla(indices: Iterable[int]):
+	"""itemgetter que sempre devolve tupla (com um índice só, devolveria o item)."""
+	indices = tuple(indices)
+	if len(indices) == 1:
+		item = itemgetter(indices[0])
+		return lambda linha: (item(linha),)
+	return itemgetter(*indices)
@@ -0,0 +1,72 @@
+"""
+Conversão de datas dos arquivos CVM/B3 para ISO (YYYY-MM-DD).
+
+Um arquivo anual tem poucas datas distintas repetidas em milhões de linhas,
+então parse_date é memorizado (lru_cache) e os formatos usuais, ISO e
+dd/mm/aaaa, são tratados por fatiamento, sem regex nem exceções.
+
+Semântica (a mesma do parse_date original de utils):
+- vazio/None -> ""
+- 'd/m/a' (3 partes) -> 'aaaa-mm-dd' com zeros à esquerda, sem validar
+- começa com aaaa-mm-dd -> retornado como está
+- qualquer outra coisa -> ValidationError
+"""
+from functools import lru_cache
+from typing import Iterable, List
+from .excecoes import ValidationError
+
+
+def parse_date(date_str: str) -> str:
+	"""Converte data de dd/mm/aaaa para YYYY-MM-DD"""
+	if not date_str:
+		return ""
+	if type(date_str) is not str:
+		raise ValidationError(f"Data inválida: {date_str}. Use formato dd/mm/aaaa")
+	return _parse_date_str(date_str)
+
+
+def parse_dates(valores: Iterable[str]) -> List[str]:
+	"""
+	Versão para colunas: converte cada valor distinto uma única vez e
+	reaproveita o resultado. Levanta ValidationError no primeiro inválido.
+	"""
+	convertidos = {}
+	resultado = []
+	for valor in valores:
+		try:
+			resultado.append(convertidos[valor])
+		except KeyError:
+			convertidos[valor] = iso = parse_date(valor)
+			resultado.append(iso)
+	return resultado
+
+
+def _comeca_com_iso(date_str: str) -> bool:
+	# equivale a re.match(r'\d{4}-\d{2}-\d{2}', date_str)
+	return (len(date_str) >= 10 and date_str[4] == '-' and date_str[7] == '-'
+			and date_str[:4].isdecimal() and date_str[5:7].isdecimal() and date_str[8:10].isdecimal())
+
+
+@lru_cache(maxsize=4096)
+def _parse_date_str(date_str: str) -> str:
+	# dd/mm/aaaa completo (caso comum)
+	if len(date_str) == 10 and date_str[2] == '/' and date_str[5] == '/' and date_str.count('/') == 2:
+		return f"{date_str[6:]}-{date_str[3:5]}-{date_str[:2]}"
+
+	# ISO: aaaa-mm-dd no início (aceita sufixo, ex.: hora)
+	if '/' not in date_str:
+		if _comeca_com_iso(date_str):
+			return date_str
+		raise ValidationError(f"Data inválida: {date_str}. Use formato dd/mm/aaaa")
+
+	# d/m/a com partes curtas
+	parts = date_str.split('/')
+	if len(parts) == 3:
+		day, month, year = parts
+		return f"{year.zfill(4)}-{month.zfill(2)}-{day.zfill(2)}"
+
+	# com '/' mas sem 3 partes: ainda pode começar com aaaa-mm-dd
+	if _comeca_com_iso(date_str):
+		return date_str
+
+	raise ValidationError(f"Data inválida: {date_str}. Use formato dd/mm/aaaa")
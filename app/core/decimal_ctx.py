@@ -1,4 +1,5 @@
 from decimal import Decimal, ROUND_HALF_UP, InvalidOperation
+from array import array
 
 HALF_UP = ROUND_HALF_UP
 
@@ -34,4 +35,93 @@ def money(x) -> Decimal:
     return D(x).quantize(Decimal("0.0001"), rounding=HALF_UP)
 
 def qty(x) -> Decimal:
-    return D(x).quantize(Decimal("0.000001"), rounding=HALF_UP)
\ No newline at end of file
+    return D(x).quantize(Decimal("0.000001"), rounding=HALF_UP)
+
+# --- Inteiros em escala fixa (ingestão dos arquivos CVM) ---
+#
+# money(x) == from_scaled(to_scaled(x, MONEY_SCALE), MONEY_SCALE), idem para
+# qty/QTY_SCALE. O caminho rápido cobre o formato dos CSVs da CVM
+# ([-]dígitos[.dígitos], ASCII) só com partition/int; qualquer outra coisa
+# (vírgula, espaços internos, lixo, None) cai no D() tolerante.
+
+MONEY_SCALE = 4
+QTY_SCALE = 6
+
+_UM = Decimal(1)
+
+
+def to_scaled(value, scale: int) -> int:
+    """
+    Converte para inteiro em 10**-scale, arredondando HALF_UP como
+    money()/qty(). Ex.: to_scaled('-1.23455', 4) -> -12346
+    """
+    if value.__class__ is str:
+        s = value.strip()
+        if not s:
+            return 0
+        negativo = s[0] == '-'
+        if negativo:
+            s = s[1:]
+        inteiro, _, frac = s.partition('.')
+        digitos = inteiro + frac
+        if digitos and digitos.isdigit() and digitos.isascii():
+            if len(frac) <= scale:
+                n = int(digitos + '0' * (scale - len(frac)))
+            else:
+                n = int(inteiro + frac[:scale])
+                if frac[scale] >= '5':
+                    n += 1
+            return -n if negativo else n
+    return int(D(value).scaleb(scale).quantize(_UM, rounding=HALF_UP))
+
+
+def to_scaled_many(values, scale: int) -> array:
+    """
+    to_scaled em lote; devolve array('q') (int64). Valores fora do int64
+    levantam OverflowError.
+    """
+    escalar = to_scaled
+    return array('q', [escalar(v, scale) for v in values])
+
+
+def from_scaled(n: int, scale: int) -> Decimal:
+    return Decimal(n).scaleb(-scale)
+
+
+def scaled_str(n: int, scale: int) -> str:
+    """Texto decimal sem notação científica: scaled_str(-12346, 4) -> '-1.2346'"""
+    if not scale:
+        return str(n)
+    inteiro, frac = divmod(-n if n < 0 else n, 10 ** scale)
+    return f"{'-' if n < 0 else ''}{inteiro}.{frac:0{scale}d}"
+
+
+def _texto_escala(value, scale: int) -> str:
+    """
+    scaled_str(to_scaled(value, scale), scale) montado direto do texto
+    quando não há arredondamento com "vai um" (o caso comum).
+    """
+    if value.__class__ is str:
+        s = value.strip()
+        negativo = s[:1] == '-'
+        if negativo:
+            s = s[1:]
+        inteiro, _, frac = s.partition('.')
+        digitos = inteiro + frac
+        if digitos and digitos.isdigit() and digitos.isascii() and (len(frac) <= scale or frac[scale] < '5'):
+            frac = frac[:scale].ljust(scale, '0')
+            inteiro = inteiro.lstrip('0') or '0'
+            if negativo and (inteiro != '0' or frac.strip('0')):
+                return f"-{inteiro}.{frac}"
+            return f"{inteiro}.{frac}"
+    return scaled_str(to_scaled(value, scale), scale)
+
+
+def money_str(x) -> str:
+    """Mesmo valor de money(x), em texto (para colunas TEXT)."""
+    return _texto_escala(x, MONEY_SCALE)
+
+
+def qty_str(x) -> str:
+    """Mesmo valor de qty(x), em texto (para colunas TEXT)."""
+    return _texto_escala(x, QTY_SCALE)
@@ -0,0 +1,125 @@
+"""
+Coleta de erros das importações com memória limitada.
+
+Em vez de acumular uma string por linha rejeitada, o ColetorErros mantém:
+- contadores por categoria (CNPJ inválido, data inválida, falha no insert...);
+- uma amostra das últimas mensagens (buffer circular de tamanho fixo);
+- um arquivo de rejeitados, gravado em streaming, com a linha bruta do CSV.
+
+Formato do arquivo de rejeitados (latin1, como os CSVs da CVM):
+	arquivo;linha;categoria;mensagem;conteudo
+O conteúdo é a linha original (que também usa ';'), então deve ser lido com
+split(';', 4). Para falhas no insert, o conteúdo são os valores normalizados.
+"""
+import os
+from collections import Counter, deque
+from datetime import datetime
+from typing import Iterator, List, TextIO
+from .utils import ValidationError
+
+REJEITADOS_DIR = os.path.join('.', 'imports', 'rejeitados')
+
+CNPJ_INVALIDO = 'cnpj_invalido'
+DATA_INVALIDA = 'data_invalida'
+VALIDACAO = 'validacao'
+FALHA_INSERT = 'falha_insert'
+OUTROS = 'outros'
+
+ROTULOS = {
+	CNPJ_INVALIDO: 'CNPJ inválido',
+	DATA_INVALIDA: 'Data inválida',
+	VALIDACAO: 'Outras validações',
+	FALHA_INSERT: 'Falha no insert',
+	OUTROS: 'Outros',
+}
+
+
+def categorizar(erro: Exception) -> str:
+	"""Classifica a exceção levantada na leitura/validação de uma linha."""
+	mensagem = str(erro)
+	if mensagem.startswith('CNPJ'):
+		return CNPJ_INVALIDO
+	if mensagem.startswith('Data inválida'):
+		return DATA_INVALIDA
+	if isinstance(erro, ValidationError):
+		return VALIDACAO
+	return OUTROS
+
+
+class LinhasLidas:
+	"""
+	Iterador sobre um arquivo texto que guarda a última linha lida, para que
+	a linha bruta possa ir para o arquivo de rejeitados. Uso:
+		fonte = LinhasLidas(f)
+		reader = csv.DictReader(fonte, ...)
+	"""
+
+	__slots__ = ('_arquivo', 'ultima')
+
+	def __init__(self, arquivo: TextIO):
+		self._arquivo = arquivo
+		self.ultima = ''
+
+	def __iter__(self) -> Iterator[str]:
+		return self
+
+	def __next__(self) -> str:
+		self.ultima = next(self._arquivo)
+		return self.ultima
+
+
+class ColetorErros:
+	"""Erros de uma importação (um tipo + ano)."""
+
+	def __init__(self, tipo: str, ano: int, max_amostras: int = 50, diretorio: str = REJEITADOS_DIR):
+		self.tipo = tipo
+		self.ano = ano
+		self.contagem = Counter()
+		self.amostras = deque(maxlen=max_amostras)
+		self.diretorio = diretorio
+		self.caminho_rejeitados = None
+		self._rejeitados = None
+
+	@property
+	def total(self) -> int:
+		return sum(self.contagem.values())
+
+	def registrar(self, categoria: str, arquivo: str, linha, mensagem: str, conteudo: str = '') -> None:
+		"""Conta o erro, guarda a mensagem na amostra e grava a linha rejeitada."""
+		self.contagem[categoria] += 1
+		self.amostras.append(f"{arquivo} - linha {linha}: {mensagem}")
+		self._gravar(arquivo, linha, categoria, mensagem, conteudo)
+
+	def registrar_excecao(self, erro: Exception, arquivo: str, linha, conteudo: str = '') -> None:
+		self.registrar(categorizar(erro), arquivo, linha, str(erro), conteudo)
+
+	def resumo(self) -> List[list]:
+		"""Linhas [rótulo, quantidade] por categoria, da mais frequente para a menos."""
+		return [[ROTULOS.get(categoria, categoria), n] for categoria, n in self.contagem.most_common()]
+
+	def como_dict(self) -> dict:
+		return {
+			'total': self.total,
+			'categorias': dict(self.contagem),
+			'amostras': list(self.amostras),
+			'arquivo_rejeitados': self.caminho_rejeitados,
+		}
+
+	def fechar(self) -> None:
+		if self._rejeitados is not None:
+			self._rejeitados.close()
+			self._rejeitados = None
+
+	def _gravar(self, arquivo: str, linha, categoria: str, mensagem: str, conteudo: str) -> None:
+		if self._rejeitados is None:
+			# arquivo só é criado na primeira rejeição
+			os.makedirs(self.diretorio, exist_ok=True)
+			carimbo = datetime.now().strftime('%Y%m%d_%H%M%S')
+			self.caminho_rejeitados = os.path.join(self.diretorio, f'{self.tipo}_{self.ano}_{carimbo}.csv')
+			# 'a': duas execuções no mesmo segundo compartilham o arquivo
+			self._rejeitados = open(self.caminho_rejeitados, 'a', encoding='latin1', errors='replace', newline='')
+			if self._rejeitados.tell() == 0:
+				self._rejeitados.write('arquivo;linha;categoria;mensagem;conteudo\n')
+		mensagem = mensagem.replace(';', ',').replace('\n', ' ')
+		conteudo = conteudo.rstrip('\r\n')
+		self._rejeitados.write(f"{arquivo};{linha};{categoria};{mensagem};{conteudo}\n")
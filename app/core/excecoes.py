@@ -0,0 +1,4 @@
+"""Exceções de domínio compartilhadas (reexportadas por app.core.utils)."""
+
+
+class ValidationError(Exception): ...
@@ -41,11 +41,14 @@ def fmt_profit_pct(v: Decimal | None) -> str:
         return Fore.RED + s + Style.RESET_ALL
     return s
 
-def render_table(rows, headers, tablefmt='fancy_grid'):
-    """Renderiza tabela usando tabulate ou fallback simples."""
+def render_table(rows, headers, tablefmt='fancy_grid', numparse=True):
+    """
+    Renderiza tabela usando tabulate ou fallback simples.
+    numparse=False mantém como texto colunas que parecem números ('1.10').
+    """
     try:
         from tabulate import tabulate
-        return tabulate(rows, headers=headers, tablefmt=tablefmt)
+        return tabulate(rows, headers=headers, tablefmt=tablefmt, disable_numparse=not numparse)
     except ImportError:
         # Fallback simples sem tabulate
         lines = []
@@ -0,0 +1,76 @@
+"""
+Índice em memória de tickers e nomes para busca por prefixo.
+
+As telas de carteira e extrato resolvem tickers o tempo todo (e o
+autocomplete busca a cada tecla); um LIKE no SQLite por consulta é caro
+demais para isso. O índice guarda uma lista ordenada de chaves
+normalizadas e busca o prefixo com bisect: O(log n) para achar o início e
+só os resultados são percorridos depois, em microssegundos para dezenas de
+milhares de ativos.
+
+Chaves indexadas de cada ativo: o ticker e cada palavra do nome (sem
+acentos, em maiúsculas), então 'PETR', 'PETRO' e 'BRASIL' acham a
+PETR4. O índice é imutável: uma alteração no cadastro descarta o índice
+inteiro (ver AtivoService), e o próximo uso o reconstrói.
+"""
+import unicodedata
+from bisect import bisect_left
+from typing import Dict, Generic, Iterable, List, Optional, Tuple, TypeVar
+
+T = TypeVar('T')
+
+
+def normalizar_busca(texto: str) -> str:
+	"""'Petróleo Brasileiro' -> 'PETROLEO BRASILEIRO'"""
+	texto = unicodedata.normalize('NFKD', texto)
+	return ''.join(c for c in texto if not unicodedata.combining(c)).upper().strip()
+
+
+class IndicePrefixo(Generic[T]):
+	"""
+	Uso:
+		indice = IndicePrefixo((a.ticker, a.nome, a) for a in ativos)
+		indice.exato('PETR4')       # -> ativo ou None
+		indice.buscar('petro', 10)  # -> até 10 ativos, tickers primeiro
+	"""
+
+	__slots__ = ('_por_ticker', '_tickers', '_palavras', '_tickers_palavras')
+
+	def __init__(self, entradas: Iterable[Tuple[str, str, T]]):
+		self._por_ticker: Dict[str, T] = {}
+		pares: List[Tuple[str, str]] = []
+		for ticker, nome, item in entradas:
+			ticker = ticker.upper()
+			self._por_ticker[ticker] = item
+			pares += ((palavra, ticker) for palavra in set(normalizar_busca(nome).split()))
+		pares.sort()
+		self._tickers: List[str] = sorted(self._por_ticker)
+		# listas paralelas: palavra do nome -> ticker
+		self._palavras = [palavra for palavra, _ in pares]
+		self._tickers_palavras = [ticker for _, ticker in pares]
+
+	def __len__(self) -> int:
+		return len(self._por_ticker)
+
+	def exato(self, ticker: str) -> Optional[T]:
+		return self._por_ticker.get(ticker.strip().upper())
+
+	def buscar(self, prefixo: str, limite: int = 10) -> List[T]:
+		"""
+		Ativos com ticker ou palavra do nome começando com `prefixo`:
+		primeiro os de ticker, depois os de nome, cada grupo em ordem
+		alfabética; sem repetir ativos. Só os `limite` primeiros são
+		percorridos, mesmo para prefixos curtos.
+		"""
+		prefixo = normalizar_busca(prefixo)
+		if not prefixo or limite <= 0:
+			return []
+		encontrados: List[str] = []
+		for chaves, tickers in ((self._tickers, self._tickers), (self._palavras, self._tickers_palavras)):
+			# o intervalo do prefixo é contíguo na lista ordenada
+			i = bisect_left(chaves, prefixo)
+			while i < len(chaves) and chaves[i].startswith(prefixo) and len(encontrados) < limite:
+				if tickers[i] not in encontrados:
+					encontrados.append(tickers[i])
+				i += 1
+		return [self._por_ticker[ticker] for ticker in encontrados]
@@ -0,0 +1,104 @@
+"""
+Métricas de execução das importações (tempo por etapa, bytes, linhas, memória).
+"""
+import time
+from contextlib import contextmanager
+from .utils import get_utc_timestamp
+
+# Etapas cronometradas de uma importação, na ordem em que ocorrem
+ETAPAS = ('download', 'extracao', 'parse', 'escrita', 'commit')
+
+
+def pico_rss_kb() -> int:
+	"""
+	Pico de memória residente (KB) do processo. Usa VmHWM no Linux, já que
+	ru_maxrss herda o pico do processo pai através do fork.
+	"""
+	try:
+		with open('/proc/self/status', 'r') as f:
+			for linha in f:
+				if linha.startswith('VmHWM:'):
+					return int(linha.split()[1])
+	except OSError:
+		pass
+	try:
+		import resource
+		return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+	except ImportError:
+		return 0
+
+
+class MetricasImportacao:
+	"""Acumula as métricas de uma importação (um tipo + ano)."""
+
+	def __init__(self, tipo: str, ano: int):
+		self.tipo = tipo
+		self.ano = ano
+		self.tempos = dict.fromkeys(ETAPAS, 0.0)
+		self.bytes_baixados = 0
+		self.linhas = 0
+		self.inseridos = 0
+		self.ignorados = 0
+		self.erros = 0
+		self.status = 'em_andamento'
+		self.erro = None
+		self.iniciado_em = get_utc_timestamp()
+		self.finalizado_em = None
+		self.duracao = 0.0
+		self.pico_memoria_kb = 0
+		# PerfilMemoria opcional (modo --profile-memory)
+		self.perfil = None
+		self._inicio = time.perf_counter()
+
+	def somar(self, etapa: str, inicio: float) -> None:
+		"""Soma à etapa o tempo decorrido desde `inicio` (time.perf_counter())."""
+		self.tempos[etapa] += time.perf_counter() - inicio
+
+	@contextmanager
+	def etapa(self, nome: str):
+		inicio = time.perf_counter()
+		try:
+			yield
+		finally:
+			self.somar(nome, inicio)
+
+	def marcar_memoria(self, etapa: str) -> None:
+		"""Fronteira de etapa para o perfil de memória (nada faz sem perfil)."""
+		if self.perfil is not None:
+			self.perfil.marcar(etapa)
+
+	def finalizar(self, erro: Exception | None = None) -> None:
+		self.status = 'erro' if erro else 'ok'
+		self.erro = str(erro) if erro else None
+		self.finalizado_em = get_utc_timestamp()
+		self.duracao = time.perf_counter() - self._inicio
+		self.pico_memoria_kb = pico_rss_kb()
+		if self.perfil is not None:
+			self.perfil.encerrar()
+			# o perfil zera o VmHWM a cada etapa; o pico do run é o maior deles
+			self.pico_memoria_kb = max(self.pico_memoria_kb, self.perfil.pico_rss_kb)
+
+	@property
+	def linhas_por_segundo(self) -> float:
+		processamento = self.tempos['parse'] + self.tempos['escrita'] + self.tempos['commit']
+		return self.linhas / processamento if processamento else 0.0
+
+	def como_dict(self) -> dict:
+		return {
+			'tipo': self.tipo,
+			'ano': self.ano,
+			'status': self.status,
+			'erro': self.erro,
+			'iniciado_em': self.iniciado_em,
+			'finalizado_em': self.finalizado_em,
+			'bytes_baixados': self.bytes_baixados,
+			'linhas': self.linhas,
+			'inseridos': self.inseridos,
+			'ignorados': self.ignorados,
+			'erros': self.erros,
+			**{f't_{etapa}': round(segundos, 3) for etapa, segundos in self.tempos.items()},
+			't_total': round(self.duracao, 3),
+			'linhas_por_segundo': round(self.linhas_por_segundo, 1),
+			'pico_memoria_kb': self.pico_memoria_kb,
+			'perfil_memoria': self.perfil.como_dict() if self.perfil is not None else None,
+		}
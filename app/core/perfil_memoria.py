@@ -0,0 +1,95 @@
+"""
+Perfil de memória das importações (modo --profile-memory da CLI).
+
+Tira snapshots do tracemalloc nas fronteiras de etapa (download, extração,
+parse e escrita de cada arquivo) e guarda, por etapa:
+- os locais (arquivo:linha) que mais cresceram desde a etapa anterior;
+- o pico de memória Python (tracemalloc) e o pico de RSS da etapa.
+
+O pico de RSS por etapa usa VmHWM, zerado a cada marca via
+/proc/self/clear_refs (Linux); fora do Linux vale o pico acumulado.
+O tracemalloc deixa a importação várias vezes mais lenta: use só para
+diagnóstico.
+"""
+import os
+import tracemalloc
+from typing import List
+from .metricas import pico_rss_kb
+
+FILTROS = (
+	tracemalloc.Filter(False, tracemalloc.__file__),
+	tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+	tracemalloc.Filter(False, '<frozen importlib._bootstrap_external>'),
+	tracemalloc.Filter(False, '<unknown>'),
+)
+
+
+def _zerar_pico_rss() -> bool:
+	try:
+		with open('/proc/self/clear_refs', 'w') as f:
+			f.write('5')
+		return True
+	except OSError:
+		return False
+
+
+def _local(frame) -> str:
+	nome = frame.filename
+	base = os.getcwd() + os.sep
+	if nome.startswith(base):
+		nome = nome[len(base):]
+	return f'{nome}:{frame.lineno}'
+
+
+class PerfilMemoria:
+	"""Snapshots do tracemalloc por etapa de uma importação (um tipo + ano)."""
+
+	def __init__(self, top: int = 5):
+		self.top = top
+		self.etapas: List[dict] = []
+		# não desliga o tracemalloc se outra pessoa o ligou
+		self._iniciou = not tracemalloc.is_tracing()
+		if self._iniciou:
+			tracemalloc.start()
+		self._anterior = self._snapshot()
+		tracemalloc.reset_peak()
+		self._zera_rss = _zerar_pico_rss()
+		self.pico_rss_kb = pico_rss_kb()
+
+	def marcar(self, etapa: str) -> None:
+		"""Fecha a etapa: registra picos e maiores crescimentos desde a marca anterior."""
+		if self._anterior is None:
+			return
+		atual, pico = tracemalloc.get_traced_memory()
+		rss = pico_rss_kb()
+		self.pico_rss_kb = max(self.pico_rss_kb, rss)
+
+		snapshot = self._snapshot()
+		diferencas = [d for d in snapshot.compare_to(self._anterior, 'lineno') if d.size_diff > 0]
+		diferencas.sort(key=lambda d: d.size_diff, reverse=True)
+		self.etapas.append({
+			'etapa': etapa,
+			'python_atual_kb': atual // 1024,
+			'python_pico_kb': pico // 1024,
+			'pico_rss_kb': rss,
+			'top': [
+				{'local': _local(d.traceback[0]), 'kb': round(d.size_diff / 1024, 1), 'blocos': d.count_diff}
+				for d in diferencas[:self.top]
+			],
+		})
+
+		self._anterior = snapshot
+		tracemalloc.reset_peak()
+		if self._zera_rss:
+			_zerar_pico_rss()
+
+	def encerrar(self) -> None:
+		self._anterior = None
+		if self._iniciou and tracemalloc.is_tracing():
+			tracemalloc.stop()
+
+	def como_dict(self) -> dict:
+		return {'pico_rss_kb': self.pico_rss_kb, 'etapas': self.etapas}
+
+	def _snapshot(self) -> tracemalloc.Snapshot:
+		return tracemalloc.take_snapshot().filter_traces(FILTROS)
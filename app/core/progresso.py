@@ -0,0 +1,82 @@
+"""
+Progresso das importações desacoplado da apresentação.
+
+Os serviços recebem um callback opcional (Callback) e contam o andamento
+com Progresso; o callback só é chamado em lotes, no máximo a cada
+`intervalo` segundos, com um EventoProgresso. A exibição (tqdm, JSON lines)
+fica nos adaptadores de app.ui.progresso.
+"""
+import time
+from typing import Callable, NamedTuple, Optional
+
+
+class EventoProgresso(NamedTuple):
+	etapa: str              # download, extracao, parse, escrita...
+	descricao: str          # texto exibido (ex.: "Importando DRE")
+	unidade: str
+	feitos: int
+	total: Optional[int]    # None quando desconhecido (ex.: leitura do CSV)
+	bytes_feitos: int
+	taxa: float             # itens/s desde o início da etapa
+	final: bool
+
+
+Callback = Callable[[EventoProgresso], None]
+
+
+class Progresso:
+	"""
+	Contador de uma etapa. avancar() custa uma soma e uma comparação; o
+	relógio só é consultado a cada `lote` itens e o callback só é chamado se
+	já passou `intervalo` desde o último evento (e sempre ao concluir).
+	Sem callback, nada é reportado.
+	"""
+
+	__slots__ = ('callback', 'etapa', 'descricao', 'unidade', 'total', 'feitos', 'bytes_feitos',
+				 'intervalo', 'lote', '_proxima_checagem', '_inicio', '_ultimo_evento')
+
+	def __init__(self, callback: Optional[Callback], etapa: str, descricao: str, total: Optional[int] = None,
+				 unidade: str = 'linhas', intervalo: float = 0.25, lote: int = 512):
+		self.callback = callback
+		self.etapa = etapa
+		self.descricao = descricao
+		self.unidade = unidade
+		self.total = total
+		self.feitos = 0
+		self.bytes_feitos = 0
+		self.intervalo = intervalo
+		self.lote = lote
+		# sem callback a checagem nunca dispara
+		self._proxima_checagem = lote if callback else float('inf')
+		self._inicio = self._ultimo_evento = time.perf_counter()
+
+	def __enter__(self):
+		if self.callback:
+			self._emitir(False)
+		return self
+
+	def __exit__(self, *exc):
+		self.concluir()
+
+	def avancar(self, n: int = 1, bytes_: int = 0) -> None:
+		self.feitos += n
+		self.bytes_feitos += bytes_
+		if self.feitos >= self._proxima_checagem:
+			self._proxima_checagem = self.feitos + self.lote
+			if time.perf_counter() - self._ultimo_evento >= self.intervalo:
+				self._emitir(False)
+
+	def concluir(self) -> None:
+		if self.callback:
+			self._emitir(True)
+			self.callback = None
+			self._proxima_checagem = float('inf')
+
+	def _emitir(self, final: bool) -> None:
+		agora = time.perf_counter()
+		decorrido = agora - self._inicio
+		self._ultimo_evento = agora
+		self.callback(EventoProgresso(
+			self.etapa, self.descricao, self.unidade, self.feitos, self.total, self.bytes_feitos,
+			self.feitos / decorrido if decorrido else 0.0, final,
+		))
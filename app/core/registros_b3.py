@@ -0,0 +1,51 @@
+"""
+Registros das linhas importadas dos relatórios da B3 (Área do Investidor).
+
+Mesma ideia de core.registros_cvm: a ordem dos campos é a das colunas da
+tabela, e o repositório monta o SQL a partir de _fields.
+"""
+from typing import NamedTuple, Optional
+
+
+class PosicaoB3(NamedTuple):
+	"""Linha da posição consolidada (tabela b3_posicao)."""
+	data_referencia: str
+	ticker: str
+	conta: str
+	categoria: str
+	produto: str
+	instituicao: str
+	isin: str
+	quantidade: str           # qty_str
+	preco_fechamento: str     # money_str
+	valor_atualizado: str     # money_str
+	arquivo: str
+	atualizado_em: str
+
+
+class MovimentacaoB3(NamedTuple):
+	"""Linha do extrato de movimentação (tabela b3_movimentacao)."""
+	fingerprint: str          # sha1 do conteúdo normalizado + ocorrência (ver B3MovimentacaoImportService)
+	data: str
+	entrada_saida: str
+	movimentacao: str
+	ticker: str
+	produto: str
+	instituicao: str
+	quantidade: str           # qty_str
+	preco_unitario: str       # money_str
+	valor_operacao: str       # money_str
+	arquivo: str
+
+
+class CotacaoDiaria(NamedTuple):
+	"""Linha do histórico de preços (tabela precos_historico)."""
+	ticker: str
+	data: str
+	abertura: Optional[int]   # preços em escala fixa (x 10**MONEY_SCALE)
+	maxima: Optional[int]
+	minima: Optional[int]
+	fechamento: int
+	volume: Optional[int]
+	arquivo: str
+	atualizado_em: str
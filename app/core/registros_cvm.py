@@ -0,0 +1,104 @@
+"""
+Registros compactos das linhas importadas dos demonstrativos CVM (ITR/DFP).
+
+NamedTuples em vez de dicts por linha: ~8 bytes por campo em vez de uma
+tabela hash de 17 chaves. A ordem dos campos é a das colunas do INSERT
+(o repositório monta o SQL a partir de _fields), então o registro vai
+direto para o executemany, sem reempacotar.
+"""
+from typing import NamedTuple, Optional
+
+
+class DocumentoItr(NamedTuple):
+	"""Linha de controle (itr_cia_aberta_AAAA.csv / dfp_cia_aberta_AAAA.csv)."""
+	cnpj: str
+	data_referencia: str
+	versao: Optional[int]
+	razao_social: str
+	codigo_cvm: str
+	categoria_documento: str
+	codigo_documento: Optional[str]           # ID_DOC inteiro, em texto (coluna TEXT)
+	data_recebimento: str
+	link_documento: str
+	criado_em: str
+
+
+class ComposicaoCapital(NamedTuple):
+	"""
+	Linha de composição do capital (criado_em fica com o DEFAULT da tabela).
+	Quantidades em qty_str (6 casas); vazias viram 0.
+	"""
+	cnpj: str
+	data_referencia: str
+	versao: Optional[int]
+	razao_social: str
+	qtde_acao_ordinaria: str
+	qtde_acao_preferencial: str
+	qtde_acao_total: str
+	qtde_acao_ordinaria_tesouraria: str
+	qtde_acao_preferencial_tesouraria: str
+	qtde_acao_total_tesouraria: str
+
+
+class ContaDemonstrativo(NamedTuple):
+	"""Conta de BPA, BPP ou DRE."""
+	cnpj: str
+	data_referencia: str
+	versao: Optional[int]
+	razao_social: str
+	codigo_cvm: str
+	grupo: str
+	moeda: str
+	escala_moeda: str
+	data_inicio_exercicio: str
+	data_fim_exercicio: str
+	codigo_conta: str
+	descricao_conta: str
+	valor_conta: str         # money_str (4 casas)
+	conta_fixa: int
+	criado_em: str
+
+
+# ESCALA_MOEDA do demonstrativo -> multiplicador para reais (ausente = 1).
+# Fonte única: o screener (Python) e as consultas em SQL
+# (demonstrativos_repo.sql_valor_reais) usam esta tabela.
+ESCALAS_MOEDA = {
+	'UNIDADE': 1,
+	'MIL': 1000,
+	'MILHAR': 1000,
+	'MILHAO': 1_000_000,
+	'MILHÃO': 1_000_000,
+	'MILHOES': 1_000_000,
+	'MILHÕES': 1_000_000,
+}
+
+
+def fator_escala(escala_moeda: str) -> int:
+	return ESCALAS_MOEDA.get(escala_moeda.upper(), 1)
+
+
+class FundoCvm(NamedTuple):
+	"""Fundo do cadastro de fundos da CVM (cad_fi.csv, tabela fi_cadastro)."""
+	cnpj: str
+	tipo_fundo: str
+	denominacao_social: str
+	codigo_cvm: str
+	data_registro: str
+	data_constituicao: str
+	data_cancelamento: str
+	situacao: str
+	data_inicio_situacao: str
+	classe: str
+	classe_anbima: str
+	condominio: str
+	fundo_cotas: int
+	fundo_exclusivo: int
+	publico_alvo: str
+	taxa_administracao: str
+	taxa_performance: str
+	patrimonio_liquido: Optional[str]   # money_str (4 casas); vazio = None
+	data_patrimonio_liquido: str
+	cnpj_administrador: str
+	administrador: str
+	gestor: str
+	atualizado_em: str
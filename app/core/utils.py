@@ -5,10 +5,14 @@ from .decimal_ctx import money, qty, D
 from datetime import datetime ,timezone
 import unicodedata
 
-class ValidationError(Exception): ...
+from .excecoes import ValidationError
+from .datas import parse_date, parse_dates
 
 load_dotenv()
 
+# Portal de dados abertos da CVM (sobrescrevível para espelhos/testes locais)
+CVM_DADOS_URL = os.getenv("DMARKI_CVM_DADOS_URL", "https://dados.cvm.gov.br/dados").rstrip("/")
+
 def parse_url(url_str: str) -> str:
     #ajustar se iniciar com / remover a barra do inicio
     if url_str.startswith('/'):
@@ -95,28 +99,6 @@ def parse_int(value_str: str) -> int:
 
 
 
-def parse_date(date_str: str) -> str:
-    """Converte data de dd/mm/aaaa para YYYY-MM-DD"""
-    if not date_str:
-        return ""
-    try:
-        # Tentar formato dd/mm/aaaa primeiro
-        if '/' in date_str:
-            parts = date_str.split('/')
-            if len(parts) == 3:
-                day, month, year = parts
-                return f"{year.zfill(4)}-{month.zfill(2)}-{day.zfill(2)}"
-        
-        # Se já estiver em formato ISO, retornar como está
-        if re.match(r'\d{4}-\d{2}-\d{2}', date_str):
-            return date_str
-            
-        # Tentar parse com datetime
-        dt = datetime.strptime(date_str, "%d/%m/%Y")
-        return dt.strftime("%Y-%m-%d")
-    except:
-        raise ValidationError(f"Data inválida: {date_str}. Use formato dd/mm/aaaa")
-
 def ensure_dirs():
     for d in ("./data", "./backup", "./export", "./imports"):
         os.makedirs(d, exist_ok=True)
@@ -151,25 +133,3 @@ def normalize_b3_decimal(value) -> str:
             return str(decimal_value)
         except:
             return '0'
-
-def parse_date(date_str: str) -> str:
-    """Converte data de dd/mm/aaaa para YYYY-MM-DD"""
-    if not date_str:
-        return ""
-    try:
-        # Tentar formato dd/mm/aaaa primeiro
-        if '/' in date_str:
-            parts = date_str.split('/')
-            if len(parts) == 3:
-                day, month, year = parts
-                return f"{year.zfill(4)}-{month.zfill(2)}-{day.zfill(2)}"
-        
-        # Se já estiver em formato ISO, retornar como está
-        if re.match(r'\d{4}-\d{2}-\d{2}', date_str):
-            return date_str
-            
-        # Tentar parse com datetime
-        dt = datetime.strptime(date_str, "%d/%m/%Y")
-        return dt.strftime("%Y-%m-%d")
-    except:
-        raise ValidationError(f"Data inválida: {date_str}. Use formato dd/mm/aaaa")
@@ -1,22 +1,83 @@
-from typing import Iterable, List, Dict, Any
+from typing import Iterator, List, Dict, Any, Sequence, Tuple
+from operator import itemgetter
 from openpyxl import load_workbook
 import warnings
+from .excecoes import ValidationError
 warnings.simplefilter("ignore", UserWarning)  # Suppress openpyxl warnings about data
 
+def _iter_ws_rows(ws, columns: Sequence[str] | None, optional_columns: Sequence[str],
+                  skip_empty: bool) -> Iterator[Any]:
+    rows = ws.iter_rows(values_only=True)
+    first = next(rows, None)
+    if first is None:
+        return
+    header = [str(h).strip() if h is not None else "" for h in first]
+
+    if columns is None:
+        for r in rows:
+            if skip_empty and all(v is None for v in r):
+                continue
+            yield dict(zip(header, r))
+        return
+
+    positions = {}
+    for i, name in enumerate(header):
+        positions.setdefault(name, i)
+    missing = [c for c in columns if c not in positions and c not in optional_columns]
+    if missing:
+        raise ValidationError(f"Colunas ausentes na planilha {ws.title}: {', '.join(missing)}")
+    # opcionais ausentes apontam para uma posição além do cabeçalho (lida como None)
+    indexes = [positions.get(c, len(header)) for c in columns]
+    get = itemgetter(*indexes) if len(indexes) > 1 else (lambda r, i=indexes[0]: (r[i],))
+    width = max(indexes) + 1
+    for r in rows:
+        if skip_empty and all(v is None for v in r):
+            continue
+        if len(r) < width:
+            # read_only pode cortar as células vazias do fim da linha
+            r = tuple(r) + (None,) * (width - len(r))
+        yield get(r)
+
+def iter_xlsx_rows(path: str, sheet_name: str | None = None, columns: Sequence[str] | None = None,
+                   skip_empty: bool = False, optional_columns: Sequence[str] = ()) -> Iterator[Any]:
+    """
+    Lê a planilha em streaming (read_only): uma linha por vez, sem carregar
+    a pasta inteira. A primeira linha é o cabeçalho.
+    - columns=None: cada linha vira um dict {cabeçalho: valor}
+    - columns=[...]: cada linha vira uma tupla só com essas colunas, na ordem
+      pedida; colunas ausentes levantam ValidationError antes da primeira linha,
+      exceto as de optional_columns, lidas como None
+    - skip_empty: pula linhas totalmente vazias (rodapés, linhas em branco)
+    A pasta é fechada ao fim da iteração ou quando o gerador é descartado.
+    """
+    wb = load_workbook(filename=path, read_only=True, data_only=True)
+    try:
+        ws = wb[sheet_name] if sheet_name else wb.active
+        yield from _iter_ws_rows(ws, columns, optional_columns, skip_empty)
+    finally:
+        wb.close()
+
+def iter_xlsx_sheets(path: str, columns: Sequence[str] | None = None, skip_empty: bool = False,
+                     optional_columns: Sequence[str] = ()) -> Iterator[Tuple[str, Iterator[Any]]]:
+    """
+    Como iter_xlsx_rows, para todas as abas abrindo a pasta uma vez só:
+    gera (nome da aba, linhas). As linhas de uma aba devem ser consumidas
+    antes de passar para a próxima; uma aba sem as colunas levanta
+    ValidationError na primeira leitura (o chamador pode pular a aba).
+    """
+    wb = load_workbook(filename=path, read_only=True, data_only=True)
+    try:
+        for ws in wb.worksheets:
+            yield ws.title, _iter_ws_rows(ws, columns, optional_columns, skip_empty)
+    finally:
+        wb.close()
+
 def read_xlsx_rows(path: str, sheet_name: str | None = None) -> List[Dict[str, Any]]:
-    wb = load_workbook(filename=path, data_only=True)
-    ws = wb[sheet_name] if sheet_name else wb.active
-    rows = list(ws.iter_rows(values_only=True))
-    if not rows: return []
-    header = [str(h).strip() if h is not None else "" for h in rows[0]]
-    data = []
-    for r in rows[1:]:
-        row_dict = {}
-        for k, v in zip(header, r):
-            row_dict[k] = v
-        data.append(row_dict)
-    return data
+    return list(iter_xlsx_rows(path, sheet_name))
 
 def list_sheets(path: str) -> list[str]:
     wb = load_workbook(filename=path, read_only=True)
-    return wb.sheetnames
+    try:
+        return wb.sheetnames
+    finally:
+        wb.close()
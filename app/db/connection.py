@@ -5,10 +5,16 @@ from dotenv import load_dotenv
 load_dotenv()
 
 DB_PATH = os.getenv("DMARKI_DB_PATH", "./data/dmarki.db")
+# Rastreio de SQL (consultas lentas + EXPLAIN QUERY PLAN + estatísticas), ver rastreio_sql
+SQL_TRACE = os.getenv("DMARKI_SQL_TRACE", "").strip().lower() in ("1", "true", "sim")
 
 def get_conn() -> sqlite3.Connection:
     os.makedirs(os.path.dirname(DB_PATH), exist_ok=True)
-    conn = sqlite3.connect(DB_PATH, check_same_thread=False)
+    if SQL_TRACE:
+        from .rastreio_sql import ConexaoRastreada
+        conn = sqlite3.connect(DB_PATH, check_same_thread=False, factory=ConexaoRastreada)
+    else:
+        conn = sqlite3.connect(DB_PATH, check_same_thread=False)
     conn.row_factory = sqlite3.Row
     conn.execute("PRAGMA foreign_keys = ON;")
     return conn
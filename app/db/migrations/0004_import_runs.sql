@@ -0,0 +1,30 @@
+-- Migration: histórico de execuções de importação
+-- Uma linha por importação (tipo + ano) com tempos por etapa, volume e memória
+
+PRAGMA foreign_keys = ON;
+
+CREATE TABLE IF NOT EXISTS import_runs (
+	id INTEGER PRIMARY KEY AUTOINCREMENT,
+	tipo TEXT NOT NULL,                 -- fca | itr | dfp
+	ano INTEGER NOT NULL,
+	status TEXT NOT NULL,               -- ok | erro
+	erro TEXT,
+	iniciado_em TEXT NOT NULL,
+	finalizado_em TEXT NOT NULL,
+	bytes_baixados INTEGER NOT NULL DEFAULT 0,
+	linhas INTEGER NOT NULL DEFAULT 0,
+	inseridos INTEGER NOT NULL DEFAULT 0,
+	ignorados INTEGER NOT NULL DEFAULT 0,
+	erros INTEGER NOT NULL DEFAULT 0,
+	t_download REAL NOT NULL DEFAULT 0,
+	t_extracao REAL NOT NULL DEFAULT 0,
+	t_parse REAL NOT NULL DEFAULT 0,
+	t_escrita REAL NOT NULL DEFAULT 0,
+	t_commit REAL NOT NULL DEFAULT 0,
+	t_total REAL NOT NULL DEFAULT 0,
+	linhas_por_segundo REAL NOT NULL DEFAULT 0,
+	pico_memoria_kb INTEGER NOT NULL DEFAULT 0,
+	criado_em TEXT NOT NULL DEFAULT (datetime('now'))
+);
+
+CREATE INDEX IF NOT EXISTS idx_import_runs_tipo_ano ON import_runs (tipo, ano, iniciado_em);
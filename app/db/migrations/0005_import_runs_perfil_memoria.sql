@@ -0,0 +1,4 @@
+-- Migration: perfil de memória das importações (modo --profile-memory)
+-- JSON com picos e maiores alocações por etapa; NULL quando o modo está desligado
+
+ALTER TABLE import_runs ADD COLUMN perfil_memoria TEXT;
@@ -0,0 +1,25 @@
+-- Migration: B3 - posição consolidada (Área do Investidor)
+-- Um snapshot por data de referência; cada linha é um ativo em uma conta.
+-- Valores em texto normalizado (qty_str/money_str, ver core.decimal_ctx)
+
+PRAGMA foreign_keys = ON;
+
+CREATE TABLE IF NOT EXISTS b3_posicao (
+	data_referencia TEXT NOT NULL,
+	ticker TEXT NOT NULL,
+	conta TEXT NOT NULL DEFAULT '',
+	categoria TEXT NOT NULL DEFAULT '',          -- aba da planilha (Acoes, ETF, Tesouro Direto...)
+	produto TEXT NOT NULL,
+	instituicao TEXT NOT NULL DEFAULT '',
+	isin TEXT NOT NULL DEFAULT '',
+	quantidade TEXT NOT NULL DEFAULT '0',
+	preco_fechamento TEXT NOT NULL DEFAULT '0',
+	valor_atualizado TEXT NOT NULL DEFAULT '0',
+	arquivo TEXT NOT NULL DEFAULT '',
+	criado_em TEXT NOT NULL DEFAULT (datetime('now')),
+	atualizado_em TEXT NOT NULL DEFAULT (datetime('now')),
+	PRIMARY KEY (data_referencia, ticker, conta)
+) WITHOUT ROWID;
+
+-- histórico de um ativo (evolução mês a mês)
+CREATE INDEX IF NOT EXISTS idx_b3_posicao_ticker ON b3_posicao (ticker, data_referencia);
@@ -0,0 +1,26 @@
+-- Migration: B3 - extrato de movimentação (Área do Investidor)
+-- Exportações com períodos sobrepostos: cada linha tem uma impressão digital
+-- do conteúdo (fingerprint, UNIQUE) e só as novas são gravadas.
+-- Valores em texto normalizado (qty_str/money_str, ver core.decimal_ctx)
+
+PRAGMA foreign_keys = ON;
+
+CREATE TABLE IF NOT EXISTS b3_movimentacao (
+	id INTEGER PRIMARY KEY AUTOINCREMENT,
+	fingerprint TEXT NOT NULL UNIQUE,
+	data TEXT NOT NULL,
+	entrada_saida TEXT NOT NULL DEFAULT '',      -- Credito / Debito
+	movimentacao TEXT NOT NULL,                  -- Transferência - Liquidação, Rendimento, Dividendo...
+	ticker TEXT NOT NULL,
+	produto TEXT NOT NULL,
+	instituicao TEXT NOT NULL DEFAULT '',
+	quantidade TEXT NOT NULL DEFAULT '0',
+	preco_unitario TEXT NOT NULL DEFAULT '0',
+	valor_operacao TEXT NOT NULL DEFAULT '0',
+	arquivo TEXT NOT NULL DEFAULT '',
+	criado_em TEXT NOT NULL DEFAULT (datetime('now'))
+);
+
+-- extrato de um ativo em ordem cronológica
+CREATE INDEX IF NOT EXISTS idx_b3_movimentacao_ticker ON b3_movimentacao (ticker, data);
+CREATE INDEX IF NOT EXISTS idx_b3_movimentacao_data ON b3_movimentacao (data);
@@ -0,0 +1,37 @@
+-- Migration: CVM - Cadastro de Fundos de Investimento (cad_fi.csv)
+-- Um fundo por CNPJ: o cadastro traz registros antigos/cancelados do mesmo
+-- CNPJ, e a importação grava só o mais recente (ver FiCadastroRepo)
+
+PRAGMA foreign_keys = ON;
+
+CREATE TABLE IF NOT EXISTS fi_cadastro (
+	cnpj TEXT NOT NULL UNIQUE,
+	tipo_fundo TEXT,
+	denominacao_social TEXT,
+	codigo_cvm TEXT,
+	data_registro TEXT,
+	data_constituicao TEXT,
+	data_cancelamento TEXT,
+	situacao TEXT,
+	data_inicio_situacao TEXT,
+	classe TEXT,
+	classe_anbima TEXT,
+	condominio TEXT,
+	fundo_cotas INTEGER NOT NULL DEFAULT 0,
+	fundo_exclusivo INTEGER NOT NULL DEFAULT 0,
+	publico_alvo TEXT,
+	taxa_administracao TEXT,
+	taxa_performance TEXT,
+	patrimonio_liquido TEXT,
+	data_patrimonio_liquido TEXT,
+	cnpj_administrador TEXT,
+	administrador TEXT,
+	gestor TEXT,
+	criado_em TEXT NOT NULL DEFAULT (datetime('now')),
+	atualizado_em TEXT NOT NULL DEFAULT (datetime('now'))
+);
+
+-- Índices para performance (CNPJ já é indexado pela UNIQUE)
+CREATE INDEX IF NOT EXISTS idx_fi_cadastro_situacao ON fi_cadastro (situacao);
+CREATE INDEX IF NOT EXISTS idx_fi_cadastro_classe ON fi_cadastro (classe, situacao);
+CREATE INDEX IF NOT EXISTS idx_fi_cadastro_codigo_cvm ON fi_cadastro (codigo_cvm);
@@ -0,0 +1,20 @@
+-- Migration: Cadastro de Ativos
+-- Liga o ticker negociado ao emissor (cnpj_emissor -> cia_aberta_fca_geral.cnpj,
+-- sem FK: o FCA pode ainda não ter sido importado)
+
+PRAGMA foreign_keys = ON;
+
+CREATE TABLE IF NOT EXISTS ativos (
+	id INTEGER PRIMARY KEY AUTOINCREMENT,
+	ticker TEXT NOT NULL UNIQUE,
+	nome TEXT NOT NULL,
+	tipo TEXT NOT NULL,                          -- ACAO, FII, ETF, BDR, TESOURO, FUNDO, OUTRO
+	isin TEXT,
+	cnpj_emissor TEXT,
+	criado_em TEXT NOT NULL DEFAULT (datetime('now')),
+	atualizado_em TEXT NOT NULL DEFAULT (datetime('now'))
+);
+
+-- Índices para performance
+CREATE INDEX IF NOT EXISTS idx_ativos_cnpj_emissor ON ativos (cnpj_emissor);
+CREATE INDEX IF NOT EXISTS idx_ativos_isin ON ativos (isin);
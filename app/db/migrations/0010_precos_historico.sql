@@ -0,0 +1,21 @@
+-- Migration: Histórico de preços (cotações diárias por ativo)
+-- Tabela agrupada por (ticker, data): WITHOUT ROWID, a chave primária é o
+-- próprio B-tree, então a série de um ativo num intervalo é uma única
+-- varredura contígua do índice, sem ida e volta a uma tabela de rowids.
+-- Preços em inteiros de escala fixa (x 10**4, MONEY_SCALE de core.decimal_ctx):
+-- a leitura vira array int64 sem conversão de texto.
+
+PRAGMA foreign_keys = ON;
+
+CREATE TABLE IF NOT EXISTS precos_historico (
+	ticker TEXT NOT NULL,
+	data TEXT NOT NULL,
+	abertura INTEGER,
+	maxima INTEGER,
+	minima INTEGER,
+	fechamento INTEGER NOT NULL,
+	volume INTEGER,                              -- quantidade negociada
+	arquivo TEXT NOT NULL DEFAULT '',
+	atualizado_em TEXT NOT NULL DEFAULT (datetime('now')),
+	PRIMARY KEY (ticker, data)
+) WITHOUT ROWID;
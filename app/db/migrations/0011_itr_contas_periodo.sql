@@ -0,0 +1,9 @@
+-- Migration: índices por período nos demonstrativos (ITR/DFP)
+-- A chave UNIQUE começa por cnpj (histórico de uma empresa); consultas de
+-- todas as empresas em uma data (screener) precisam de data + conta na frente.
+
+PRAGMA foreign_keys = ON;
+
+CREATE INDEX IF NOT EXISTS idx_cia_aberta_itr_bpa_periodo ON cia_aberta_itr_bpa (data_referencia, codigo_conta);
+CREATE INDEX IF NOT EXISTS idx_cia_aberta_itr_bpp_periodo ON cia_aberta_itr_bpp (data_referencia, codigo_conta);
+CREATE INDEX IF NOT EXISTS idx_cia_aberta_itr_dre_periodo ON cia_aberta_itr_dre (data_referencia, codigo_conta);
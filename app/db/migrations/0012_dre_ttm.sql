@@ -0,0 +1,27 @@
+-- Migration: DRE em doze meses (TTM) por empresa, conta e trimestre
+-- Derivada de cia_aberta_itr_dre (ITR + DFP) por TtmService; recalculada só
+-- para as empresas com linhas novas desde a última atualização.
+-- Valor em reais (escala da moeda já aplicada), texto money_str.
+
+PRAGMA foreign_keys = ON;
+
+CREATE TABLE IF NOT EXISTS cia_aberta_dre_ttm (
+	cnpj TEXT NOT NULL,
+	grupo TEXT NOT NULL,                         -- DF Consolidado / DF Individual
+	codigo_conta TEXT NOT NULL,
+	data_referencia TEXT NOT NULL,               -- fim do trimestre
+	descricao_conta TEXT NOT NULL,
+	valor TEXT NOT NULL,
+	atualizado_em TEXT NOT NULL DEFAULT (datetime('now')),
+	PRIMARY KEY (cnpj, grupo, codigo_conta, data_referencia)
+) WITHOUT ROWID;
+
+-- todas as empresas em um trimestre (screener, múltiplos)
+CREATE INDEX IF NOT EXISTS idx_cia_aberta_dre_ttm_periodo ON cia_aberta_dre_ttm (data_referencia, codigo_conta);
+
+-- marca d'água: maior id de cia_aberta_itr_dre já considerado
+CREATE TABLE IF NOT EXISTS cia_aberta_dre_ttm_controle (
+	id INTEGER PRIMARY KEY CHECK (id = 1),
+	ultimo_id_dre INTEGER NOT NULL DEFAULT 0,
+	atualizado_em TEXT NOT NULL DEFAULT (datetime('now'))
+);
@@ -0,0 +1,27 @@
+-- Migration: hierarquia dos códigos de conta (BPA/BPP/DRE)
+-- O próprio código é o caminho materializado ('1.01.02' é filho de '1.01'):
+-- X e seus descendentes são o intervalo [X, X || '/') na ordem BINARY (só
+-- há dígitos e pontos, e '/' vem entre '.' e '0'), uma busca de intervalo
+-- em qualquer índice que tenha codigo_conta depois das colunas de igualdade.
+-- Pai: tira o último segmento (rtrim dos dígitos e depois do ponto).
+
+PRAGMA foreign_keys = ON;
+
+CREATE TABLE IF NOT EXISTS plano_contas (
+	codigo_conta TEXT PRIMARY KEY,
+	codigo_pai TEXT,                             -- NULL nas raízes (1, 2, 3...)
+	nivel INTEGER NOT NULL                       -- 1 nas raízes
+) WITHOUT ROWID;
+
+CREATE INDEX IF NOT EXISTS idx_plano_contas_pai ON plano_contas (codigo_pai);
+
+-- contas já importadas
+INSERT OR IGNORE INTO plano_contas (codigo_conta, codigo_pai, nivel)
+SELECT codigo_conta,
+	NULLIF(rtrim(rtrim(codigo_conta, '0123456789'), '.'), ''),
+	length(codigo_conta) - length(replace(codigo_conta, '.', '')) + 1
+FROM (
+	SELECT codigo_conta FROM cia_aberta_itr_bpa
+	UNION SELECT codigo_conta FROM cia_aberta_itr_bpp
+	UNION SELECT codigo_conta FROM cia_aberta_itr_dre
+);
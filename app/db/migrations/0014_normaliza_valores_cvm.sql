@@ -0,0 +1,101 @@
+-- Migration: normaliza valores gravados antes do money_str/qty_str
+-- valor_conta vinha com o texto cru da CVM ('-3226842.0000000000') e as
+-- quantidades da composição do capital como inteiros ('12345'). As
+-- importações atuais gravam money_str (4 casas) e qty_str (6 casas), e as
+-- consultas (screener, TTM, árvore de contas, reapresentações) contam com
+-- esse formato. Reimportar não corrige: linhas já gravadas são puladas.
+--
+-- Conversão exata, como money_str: [-]dígitos[.dígitos] vira inteiro em
+-- 10**-4 (HALF_UP no 5º decimal) e volta para texto; -0 vira 0. Fora desse
+-- formato (raro), printf('%.4f') do valor numérico.
+
+PRAGMA foreign_keys = ON;
+
+CREATE TEMP TABLE _valores_conta (tabela TEXT NOT NULL, id INTEGER NOT NULL, valor TEXT NOT NULL);
+
+INSERT INTO temp._valores_conta (tabela, id, valor)
+WITH fora_do_formato AS (
+	-- só o que não tem exatamente 4 casas (as linhas já normalizadas ficam)
+	SELECT 'bpa' AS tabela, id, trim(valor_conta) AS texto FROM cia_aberta_itr_bpa
+	WHERE instr(valor_conta, '.') = 0 OR length(valor_conta) - instr(valor_conta, '.') <> 4
+	UNION ALL
+	SELECT 'bpp', id, trim(valor_conta) FROM cia_aberta_itr_bpp
+	WHERE instr(valor_conta, '.') = 0 OR length(valor_conta) - instr(valor_conta, '.') <> 4
+	UNION ALL
+	SELECT 'dre', id, trim(valor_conta) FROM cia_aberta_itr_dre
+	WHERE instr(valor_conta, '.') = 0 OR length(valor_conta) - instr(valor_conta, '.') <> 4
+),
+partes AS (
+	SELECT tabela, id, texto, substr(texto, 1, 1) = '-' AS negativo,
+		CASE WHEN substr(texto, 1, 1) = '-' THEN substr(texto, 2) ELSE texto END AS corpo
+	FROM fora_do_formato
+),
+digitos AS (
+	SELECT tabela, id, texto, negativo, corpo,
+		CASE WHEN instr(corpo, '.') THEN substr(corpo, 1, instr(corpo, '.') - 1) ELSE corpo END AS inteiro,
+		CASE WHEN instr(corpo, '.') THEN substr(corpo, instr(corpo, '.') + 1) ELSE '' END AS frac
+	FROM partes
+),
+escalados AS (
+	SELECT tabela, id, texto, negativo,
+		corpo <> '' AND corpo NOT GLOB '*[^0-9.]*' AND corpo NOT GLOB '*.*.*' AS no_formato,
+		CAST(inteiro || substr(frac || '0000', 1, 4) AS INTEGER) + (substr(frac, 5, 1) >= '5') AS n
+	FROM digitos
+)
+SELECT tabela, id,
+	CASE WHEN no_formato THEN
+		CASE WHEN negativo AND n > 0 THEN '-' ELSE '' END || (n / 10000) || '.' || printf('%04d', n % 10000)
+	ELSE
+		replace(printf('%.4f', CAST(replace(texto, ',', '.') AS REAL)), '-0.0000', '0.0000')
+	END
+FROM escalados;
+
+UPDATE cia_aberta_itr_bpa AS t SET valor_conta = v.valor
+FROM temp._valores_conta v WHERE v.tabela = 'bpa' AND v.id = t.id;
+UPDATE cia_aberta_itr_bpp AS t SET valor_conta = v.valor
+FROM temp._valores_conta v WHERE v.tabela = 'bpp' AND v.id = t.id;
+UPDATE cia_aberta_itr_dre AS t SET valor_conta = v.valor
+FROM temp._valores_conta v WHERE v.tabela = 'dre' AND v.id = t.id;
+
+DROP TABLE temp._valores_conta;
+
+-- Quantidades: eram inteiros (parse_int); qty_str tem 6 casas
+UPDATE cia_aberta_itr_composicao_capital SET qtde_acao_ordinaria = CASE
+	WHEN trim(qtde_acao_ordinaria, ' -') <> '' AND trim(qtde_acao_ordinaria, ' -') NOT GLOB '*[^0-9]*'
+	THEN CAST(qtde_acao_ordinaria AS INTEGER) || '.000000'
+	ELSE printf('%.6f', CAST(qtde_acao_ordinaria AS REAL)) END
+WHERE instr(qtde_acao_ordinaria, '.') = 0 OR length(qtde_acao_ordinaria) - instr(qtde_acao_ordinaria, '.') <> 6;
+
+UPDATE cia_aberta_itr_composicao_capital SET qtde_acao_preferencial = CASE
+	WHEN trim(qtde_acao_preferencial, ' -') <> '' AND trim(qtde_acao_preferencial, ' -') NOT GLOB '*[^0-9]*'
+	THEN CAST(qtde_acao_preferencial AS INTEGER) || '.000000'
+	ELSE printf('%.6f', CAST(qtde_acao_preferencial AS REAL)) END
+WHERE instr(qtde_acao_preferencial, '.') = 0 OR length(qtde_acao_preferencial) - instr(qtde_acao_preferencial, '.') <> 6;
+
+UPDATE cia_aberta_itr_composicao_capital SET qtde_acao_total = CASE
+	WHEN trim(qtde_acao_total, ' -') <> '' AND trim(qtde_acao_total, ' -') NOT GLOB '*[^0-9]*'
+	THEN CAST(qtde_acao_total AS INTEGER) || '.000000'
+	ELSE printf('%.6f', CAST(qtde_acao_total AS REAL)) END
+WHERE instr(qtde_acao_total, '.') = 0 OR length(qtde_acao_total) - instr(qtde_acao_total, '.') <> 6;
+
+UPDATE cia_aberta_itr_composicao_capital SET qtde_acao_ordinaria_tesouraria = CASE
+	WHEN trim(qtde_acao_ordinaria_tesouraria, ' -') <> '' AND trim(qtde_acao_ordinaria_tesouraria, ' -') NOT GLOB '*[^0-9]*'
+	THEN CAST(qtde_acao_ordinaria_tesouraria AS INTEGER) || '.000000'
+	ELSE printf('%.6f', CAST(qtde_acao_ordinaria_tesouraria AS REAL)) END
+WHERE instr(qtde_acao_ordinaria_tesouraria, '.') = 0 OR length(qtde_acao_ordinaria_tesouraria) - instr(qtde_acao_ordinaria_tesouraria, '.') <> 6;
+
+UPDATE cia_aberta_itr_composicao_capital SET qtde_acao_preferencial_tesouraria = CASE
+	WHEN trim(qtde_acao_preferencial_tesouraria, ' -') <> '' AND trim(qtde_acao_preferencial_tesouraria, ' -') NOT GLOB '*[^0-9]*'
+	THEN CAST(qtde_acao_preferencial_tesouraria AS INTEGER) || '.000000'
+	ELSE printf('%.6f', CAST(qtde_acao_preferencial_tesouraria AS REAL)) END
+WHERE instr(qtde_acao_preferencial_tesouraria, '.') = 0 OR length(qtde_acao_preferencial_tesouraria) - instr(qtde_acao_preferencial_tesouraria, '.') <> 6;
+
+UPDATE cia_aberta_itr_composicao_capital SET qtde_acao_total_tesouraria = CASE
+	WHEN trim(qtde_acao_total_tesouraria, ' -') <> '' AND trim(qtde_acao_total_tesouraria, ' -') NOT GLOB '*[^0-9]*'
+	THEN CAST(qtde_acao_total_tesouraria AS INTEGER) || '.000000'
+	ELSE printf('%.6f', CAST(qtde_acao_total_tesouraria AS REAL)) END
+WHERE instr(qtde_acao_total_tesouraria, '.') = 0 OR length(qtde_acao_total_tesouraria) - instr(qtde_acao_total_tesouraria, '.') <> 6;
+
+-- A DRE TTM foi calculada com os valores antigos: a próxima atualização
+-- recalcula todas as empresas
+UPDATE cia_aberta_dre_ttm_controle SET ultimo_id_dre = 0;
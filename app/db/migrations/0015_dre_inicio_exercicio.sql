@@ -0,0 +1,17 @@
+-- Migration: início do exercício das linhas de DRE antigas
+-- Antes da importação ler DT_INI_EXERC, a DRE gravava DT_FIM_EXERC também
+-- como início. No 1º trimestre e no anual (DFP) o período é o acumulado do
+-- ano, então o início é 01/01. No 2º e 3º trimestres a linha gravada pode
+-- ser a dos três meses ou a do acumulado: sem como saber, ficam como estão
+-- e o TTM as conta como documentos de início desconhecido (reimportar o ano
+-- não corrige: as linhas já gravadas são puladas).
+
+PRAGMA foreign_keys = ON;
+
+UPDATE cia_aberta_itr_dre
+SET data_inicio_exercicio = substr(data_fim_exercicio, 1, 4) || '-01-01'
+WHERE data_inicio_exercicio = data_fim_exercicio
+	AND substr(data_fim_exercicio, 6, 5) IN ('03-31', '12-31');
+
+-- o TTM desses documentos ficou vazio: a próxima atualização recalcula tudo
+UPDATE cia_aberta_dre_ttm_controle SET ultimo_id_dre = 0;
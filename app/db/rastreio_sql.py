@@ -0,0 +1,179 @@
+"""
+Rastreio opcional de SQL (ativado por DMARKI_SQL_TRACE=1, ver connection.get_conn).
+
+Cronometra cada execute/executemany/executescript das conexões criadas por
+get_conn e:
+- registra as instruções acima de DMARKI_SQL_SLOW_MS (padrão 50 ms) junto
+  com o EXPLAIN QUERY PLAN (uma vez por instrução);
+- agrega por instrução a contagem, tempo total/máximo e um histograma de
+  latência, impressos ao final do processo (atexit).
+
+Saída no stderr ou em DMARKI_SQL_TRACE_FILE. O tempo medido é o do
+execute (preparação + primeiro passo); o fetch das linhas não entra.
+"""
+import atexit
+import os
+import sqlite3
+import sys
+import threading
+import time
+
+LIMITE_LENTA_MS = float(os.getenv("DMARKI_SQL_SLOW_MS", "50"))
+ARQUIVO_SAIDA = os.getenv("DMARKI_SQL_TRACE_FILE", "")
+
+# limites superiores (ms) das faixas do histograma; a última é "acima de 2000"
+FAIXAS_MS = (1, 5, 25, 100, 500, 2000)
+ROTULOS_FAIXAS = tuple(f"<{limite}" for limite in FAIXAS_MS) + (f">={FAIXAS_MS[-1]}",)
+
+# só estas instruções aceitam EXPLAIN QUERY PLAN
+COMANDOS_COM_PLANO = ('SELECT', 'INSERT', 'UPDATE', 'DELETE', 'REPLACE', 'WITH')
+
+
+class EstatisticaSql:
+	__slots__ = ('chamadas', 'total_ms', 'max_ms', 'histograma')
+
+	def __init__(self):
+		self.chamadas = 0
+		self.total_ms = 0.0
+		self.max_ms = 0.0
+		self.histograma = [0] * (len(FAIXAS_MS) + 1)
+
+	def adicionar(self, ms: float) -> None:
+		self.chamadas += 1
+		self.total_ms += ms
+		if ms > self.max_ms:
+			self.max_ms = ms
+		for i, limite in enumerate(FAIXAS_MS):
+			if ms < limite:
+				self.histograma[i] += 1
+				return
+		self.histograma[-1] += 1
+
+
+_estatisticas: dict[str, EstatisticaSql] = {}
+_planos_registrados: set[str] = set()
+_lock = threading.Lock()
+_relatorio_agendado = False
+
+
+def _normalizar(sql: str) -> str:
+	return ' '.join(sql.split())
+
+
+def _escrever(texto: str) -> None:
+	if ARQUIVO_SAIDA:
+		with open(ARQUIVO_SAIDA, 'a', encoding='utf-8') as f:
+			f.write(texto + '\n')
+	else:
+		print(texto, file=sys.stderr)
+
+
+def _plano(conn: sqlite3.Connection, sql: str, parametros) -> list[str]:
+	comando = sql.lstrip().split(None, 1)[0].upper() if sql.strip() else ''
+	if comando not in COMANDOS_COM_PLANO:
+		return []
+	try:
+		# cursor base: o EXPLAIN não entra nas estatísticas
+		linhas = sqlite3.Cursor(conn).execute(f"EXPLAIN QUERY PLAN {sql}", parametros).fetchall()
+	except sqlite3.Error as e:
+		return [f"(plano indisponível: {e})"]
+	return [linha[-1] for linha in linhas]
+
+
+def _registrar(conn: sqlite3.Connection, sql: str, parametros, segundos: float) -> None:
+	ms = segundos * 1000
+	chave = _normalizar(sql)
+	with _lock:
+		estatistica = _estatisticas.get(chave)
+		if estatistica is None:
+			estatistica = _estatisticas[chave] = EstatisticaSql()
+		estatistica.adicionar(ms)
+		if ms < LIMITE_LENTA_MS:
+			return
+		primeira_vez = chave not in _planos_registrados
+		_planos_registrados.add(chave)
+
+	linhas = [f"[SQL lenta] {ms:.1f} ms: {chave[:300]}"]
+	if primeira_vez and parametros is not None:
+		linhas += [f"    plano: {detalhe}" for detalhe in _plano(conn, sql, parametros)]
+	_escrever('\n'.join(linhas))
+
+
+def relatorio(limite: int = 30) -> str:
+	"""Instruções ordenadas por tempo total, com contagem e histograma."""
+	with _lock:
+		itens = sorted(_estatisticas.items(), key=lambda item: item[1].total_ms, reverse=True)[:limite]
+	if not itens:
+		return "[SQL] nenhuma instrução executada"
+	linhas = [
+		"[SQL] estatísticas por instrução (tempo em ms)",
+		f"{'chamadas':>9} {'total':>10} {'médio':>8} {'máx':>8}  " + ' '.join(f"{r:>6}" for r in ROTULOS_FAIXAS) + "  instrução",
+	]
+	for sql, e in itens:
+		linhas.append(
+			f"{e.chamadas:>9} {e.total_ms:>10.1f} {e.total_ms / e.chamadas:>8.2f} {e.max_ms:>8.1f}  "
+			+ ' '.join(f"{n:>6}" for n in e.histograma) + f"  {sql[:120]}"
+		)
+	return '\n'.join(linhas)
+
+
+def _imprimir_relatorio() -> None:
+	_escrever(relatorio())
+
+
+def _agendar_relatorio() -> None:
+	global _relatorio_agendado
+	with _lock:
+		if _relatorio_agendado:
+			return
+		_relatorio_agendado = True
+	atexit.register(_imprimir_relatorio)
+
+
+class CursorRastreado(sqlite3.Cursor):
+
+	def execute(self, sql, parameters=()):
+		inicio = time.perf_counter()
+		try:
+			return super().execute(sql, parameters)
+		finally:
+			_registrar(self.connection, sql, parameters, time.perf_counter() - inicio)
+
+	def executemany(self, sql, seq_of_parameters):
+		inicio = time.perf_counter()
+		try:
+			return super().executemany(sql, seq_of_parameters)
+		finally:
+			# sem plano: os parâmetros (possivelmente um gerador) já foram consumidos
+			_registrar(self.connection, sql, None, time.perf_counter() - inicio)
+
+	def executescript(self, sql_script):
+		inicio = time.perf_counter()
+		try:
+			return super().executescript(sql_script)
+		finally:
+			_registrar(self.connection, sql_script, None, time.perf_counter() - inicio)
+
+
+class ConexaoRastreada(sqlite3.Connection):
+	"""
+	Conexão cujos cursores são rastreados. Os atalhos execute/executemany/
+	executescript da conexão são refeitos sobre self.cursor(), pois os
+	originais (em C) não passam pela fábrica de cursores.
+	"""
+
+	def __init__(self, *args, **kwargs):
+		super().__init__(*args, **kwargs)
+		_agendar_relatorio()
+
+	def cursor(self, factory=CursorRastreado):
+		return super().cursor(factory)
+
+	def execute(self, sql, parameters=()):
+		return self.cursor().execute(sql, parameters)
+
+	def executemany(self, sql, seq_of_parameters):
+		return self.cursor().executemany(sql, seq_of_parameters)
+
+	def executescript(self, sql_script):
+		return self.cursor().executescript(sql_script)
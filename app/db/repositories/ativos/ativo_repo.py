@@ -0,0 +1,52 @@
+from typing import Optional, List, Dict, Any
+from ...connection import get_conn
+
+
+class AtivoRepo:
+	"""Repository para a tabela ativos."""
+
+	def __init__(self, conn=None):
+		self.conn = conn or get_conn()
+
+	def listar_todos(self) -> List[Dict[str, Any]]:
+		"""Todos os ativos com a razão social do emissor (FCA), se importada."""
+		rows = self.conn.execute("""
+			SELECT a.id, a.ticker, a.nome, a.tipo, a.isin, a.cnpj_emissor, f.razao_social AS emissor
+			FROM ativos a
+			LEFT JOIN cia_aberta_fca_geral f ON f.cnpj = a.cnpj_emissor
+			ORDER BY a.ticker
+		""").fetchall()
+		return [dict(row) for row in rows]
+
+	def get_by_ticker(self, ticker: str) -> Optional[Dict[str, Any]]:
+		row = self.conn.execute("SELECT * FROM ativos WHERE ticker = ?", (ticker,)).fetchone()
+		return dict(row) if row else None
+
+	def listar_por_emissor(self, cnpj: str) -> List[Dict[str, Any]]:
+		"""Tickers de um emissor (ex.: PETR3 e PETR4)."""
+		rows = self.conn.execute("""
+			SELECT * FROM ativos WHERE cnpj_emissor = ? ORDER BY ticker
+		""", (cnpj,)).fetchall()
+		return [dict(row) for row in rows]
+
+	def emissor_existe(self, cnpj: str) -> bool:
+		row = self.conn.execute("SELECT 1 FROM cia_aberta_fca_geral WHERE cnpj = ?", (cnpj,)).fetchone()
+		return row is not None
+
+	def inserir(self, ticker: str, nome: str, tipo: str, isin: str | None, cnpj_emissor: str | None, agora: str) -> int:
+		cur = self.conn.execute("""
+			INSERT INTO ativos (ticker, nome, tipo, isin, cnpj_emissor, criado_em, atualizado_em)
+			VALUES (?, ?, ?, ?, ?, ?, ?)
+		""", (ticker, nome, tipo, isin, cnpj_emissor, agora, agora))
+		return cur.lastrowid
+
+	def atualizar(self, ticker: str, nome: str, tipo: str, isin: str | None, cnpj_emissor: str | None, agora: str) -> int:
+		cur = self.conn.execute("""
+			UPDATE ativos SET nome = ?, tipo = ?, isin = ?, cnpj_emissor = ?, atualizado_em = ?
+			WHERE ticker = ?
+		""", (nome, tipo, isin, cnpj_emissor, agora, ticker))
+		return cur.rowcount
+
+	def excluir(self, ticker: str) -> int:
+		cur = self.conn.execute("DELETE FROM ativos WHERE ticker = ?", (ticker,))
+		return cur.rowcount
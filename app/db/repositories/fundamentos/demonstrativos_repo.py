@@ -0,0 +1,257 @@
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+from ...connection import get_conn
+from ....core.registros_cvm import ESCALAS_MOEDA
+from .plano_contas_repo import SQL_NIVEL, limites_subarvore
+
+
+# Tabelas de contas dos demonstrativos (ITR e DFP gravam nas mesmas)
+TABELAS_CONTAS = ('cia_aberta_itr_bpa', 'cia_aberta_itr_bpp', 'cia_aberta_itr_dre')
+
+
+def sql_valor(alias: str = '') -> str:
+	"""
+	Expressão SQL de valor_conta x 10**4 (inteiro), na escala do documento;
+	`alias` é o prefixo da tabela ('t.'). No formato money_str (4 casas, o da
+	importação e o das linhas antigas depois da migração 0014) basta tirar o
+	ponto, exato em qualquer magnitude; fora dele, o valor numérico do texto.
+	"""
+	valor = f'{alias}valor_conta'
+	return f"""(CASE WHEN substr({valor}, -5, 1) = '.'
+		THEN CAST(REPLACE({valor}, '.', '') AS INTEGER)
+		ELSE CAST(ROUND(CAST({valor} AS REAL) * 10000) AS INTEGER) END)"""
+
+
+def sql_fator_escala(alias: str = '') -> str:
+	"""Expressão SQL do multiplicador de escala_moeda (core.registros_cvm.ESCALAS_MOEDA)."""
+	por_fator: Dict[int, List[str]] = {}
+	for escala, fator in ESCALAS_MOEDA.items():
+		if fator != 1:
+			por_fator.setdefault(fator, []).append(f"'{escala}'")
+	casos = ' '.join(
+		f"WHEN UPPER({alias}escala_moeda) IN ({', '.join(escalas)}) THEN {fator}" for fator, escalas in por_fator.items())
+	return f"CASE {casos} ELSE 1 END"
+
+
+def sql_valor_reais(alias: str = '') -> str:
+	"""sql_valor em reais: aplica a escala do documento (versões podem vir em escalas diferentes)."""
+	return f"{sql_valor(alias)} * {sql_fator_escala(alias)}"
+
+
+class DemonstrativosRepo:
+	"""
+	Consultas de leitura sobre as contas de BPA/BPP/DRE importadas (ITR/DFP),
+	para análise: várias empresas e contas de uma vez, sempre na última
+	versão entregue de cada documento.
+	"""
+
+	def __init__(self, conn=None):
+		self.conn = conn or get_conn()
+
+	def periodos(self) -> List[str]:
+		"""Datas de referência com DRE importada (mais recente primeiro)."""
+		rows = self.conn.execute("""
+			SELECT DISTINCT data_referencia FROM cia_aberta_itr_dre ORDER BY data_referencia DESC
+		""").fetchall()
+		return [row[0] for row in rows]
+
+	def valores_periodo(self, periodo: str, codigos: Sequence[str]) -> List[Tuple[str, str, str, str, str, str]]:
+		"""
+		(cnpj, razao_social, grupo, codigo_conta, valor_conta, escala_moeda) de
+		todas as empresas na data `periodo`, só das contas em `codigos`.
+
+		Uma busca no índice (data_referencia, codigo_conta) por tabela. A
+		versão é a última do documento (cnpj, data), não a última de cada
+		conta: uma conta que saiu (ou mudou de grupo) na reapresentação não
+		traz o valor da versão antiga. O MAX(versao) é uma busca no prefixo
+		do índice UNIQUE (cnpj, data_referencia, versao).
+		"""
+		marcadores = ', '.join('?' for _ in codigos)
+		consulta = ' UNION ALL '.join(f"""
+			SELECT t.cnpj, t.razao_social, t.grupo, t.codigo_conta, t.valor_conta, t.escala_moeda
+			FROM {tabela} t
+			WHERE t.data_referencia = ? AND t.codigo_conta IN ({marcadores})
+				AND t.versao = (
+					SELECT MAX(v.versao) FROM {tabela} v
+					WHERE v.cnpj = t.cnpj AND v.data_referencia = t.data_referencia
+				)
+		""" for tabela in TABELAS_CONTAS)
+		params = [periodo, *codigos] * len(TABELAS_CONTAS)
+		cur = self.conn.cursor()
+		# tuplas puras: o resultado vai direto para o pivot
+		cur.row_factory = None
+		return cur.execute(consulta, params).fetchall()
+
+	def _tabela(self, tabela: str) -> str:
+		if tabela not in TABELAS_CONTAS:
+			raise ValueError(f"Tabela de contas inválida: {tabela}")
+		return tabela
+
+	def ultima_versao(self, tabela: str, cnpj: str, data_referencia: str) -> Optional[int]:
+		"""Versão mais recente do documento (prefixo do índice UNIQUE)."""
+		row = self.conn.execute(f"""
+			SELECT MAX(versao) FROM {self._tabela(tabela)} WHERE cnpj = ? AND data_referencia = ?
+		""", (cnpj, data_referencia)).fetchone()
+		return row[0]
+
+	def grupos(self, tabela: str, cnpj: str, data_referencia: str, versao: int) -> List[str]:
+		rows = self.conn.execute(f"""
+			SELECT DISTINCT grupo FROM {self._tabela(tabela)}
+			WHERE cnpj = ? AND data_referencia = ? AND versao = ? ORDER BY grupo
+		""", (cnpj, data_referencia, versao)).fetchall()
+		return [row[0] for row in rows]
+
+	def subarvore(self, tabela: str, cnpj: str, data_referencia: str, versao: int, grupo: str,
+				  codigo: str) -> List[Tuple[str, int, str, int, str]]:
+		"""
+		(codigo_conta, nivel, descricao_conta, valor, escala_moeda) de `codigo`
+		e descendentes num documento, em ordem de código. valor x 10**4
+		(inteiro), na escala do documento.
+
+		O índice UNIQUE termina em codigo_conta: com o documento fixo, a
+		subárvore é uma busca de intervalo (limites_subarvore), sem LIKE.
+		"""
+		inicio, fim = limites_subarvore(codigo)
+		cur = self.conn.cursor()
+		cur.row_factory = None
+		return cur.execute(f"""
+			SELECT codigo_conta, {SQL_NIVEL}, descricao_conta, {sql_valor()}, escala_moeda
+			FROM {self._tabela(tabela)}
+			WHERE cnpj = ? AND data_referencia = ? AND versao = ? AND grupo = ?
+				AND codigo_conta >= ? AND codigo_conta < ?
+			ORDER BY codigo_conta
+		""", (cnpj, data_referencia, versao, grupo, inicio, fim)).fetchall()
+
+	def divergencias_rollup(self, tabela: str, cnpj: str, data_referencia: str, versao: int, grupo: str,
+							tolerancia: int = 0) -> List[Tuple[str, int, int, int]]:
+		"""
+		(codigo_pai, valor_pai, soma_filhos, filhos) das contas de um documento
+		cujo valor difere da soma dos filhos diretos em mais de `tolerancia`
+		(valores x 10**4, inteiros). O pai de cada conta vem de plano_contas:
+		o documento é lido uma vez (busca de intervalo no índice UNIQUE) e
+		cada pai é uma busca pontual no mesmo índice.
+		"""
+		tabela = self._tabela(tabela)
+		documento = (cnpj, data_referencia, versao, grupo)
+		cur = self.conn.cursor()
+		cur.row_factory = None
+		return cur.execute(f"""
+			SELECT pai.codigo_conta, {sql_valor('pai.')} AS valor_pai, SUM({sql_valor('filho.')}) AS soma, COUNT(*)
+			FROM {tabela} filho
+			JOIN plano_contas pc ON pc.codigo_conta = filho.codigo_conta
+			JOIN {tabela} pai
+				ON pai.cnpj = ? AND pai.data_referencia = ? AND pai.versao = ? AND pai.grupo = ?
+				AND pai.codigo_conta = pc.codigo_pai
+			WHERE filho.cnpj = ? AND filho.data_referencia = ? AND filho.versao = ? AND filho.grupo = ?
+			GROUP BY pai.codigo_conta
+			HAVING abs(valor_pai - soma) > ?
+			ORDER BY pai.codigo_conta
+		""", (*documento, *documento, tolerancia)).fetchall()
+
+	def versoes(self, cnpj: str, data_referencia: str) -> List[int]:
+		"""Versões do documento com contas gravadas, em ordem."""
+		consulta = ' UNION '.join(f"""
+			SELECT versao FROM {tabela} WHERE cnpj = ? AND data_referencia = ?
+		""" for tabela in TABELAS_CONTAS)
+		rows = self.conn.execute(f"{consulta} ORDER BY versao", (cnpj, data_referencia) * len(TABELAS_CONTAS)).fetchall()
+		return [row[0] for row in rows]
+
+	def razao_social(self, cnpj: str, data_referencia: str) -> str:
+		"""Razão social informada na última versão do documento ('' se não houver)."""
+		row = self.conn.execute(f"""
+			SELECT razao_social FROM {TABELAS_CONTAS[0]}
+			WHERE cnpj = ? AND data_referencia = ? ORDER BY versao DESC LIMIT 1
+		""", (cnpj, data_referencia)).fetchone()
+		return row[0] if row else ''
+
+	def contas_versao(self, tabela: str, cnpj: str, data_referencia: str, versao: int,
+					  grupo: str) -> List[Tuple[str, str, int]]:
+		"""
+		(codigo_conta, descricao_conta, valor) de uma versão do documento, em
+		ordem de código (a do índice UNIQUE, sem ordenação à parte). valor em
+		reais x 10**4 (inteiro).
+		"""
+		cur = self.conn.cursor()
+		cur.row_factory = None
+		return cur.execute(f"""
+			SELECT codigo_conta, descricao_conta, {sql_valor_reais()}
+			FROM {self._tabela(tabela)}
+			WHERE cnpj = ? AND data_referencia = ? AND versao = ? AND grupo = ?
+			ORDER BY codigo_conta
+		""", (cnpj, data_referencia, versao, grupo)).fetchall()
+
+	def preparar_reapresentacoes(self, ano: int) -> int:
+		"""
+		Documentos com data de referência no ano entregues em mais de uma
+		versão vão para a tabela temporária reapresentacoes, com a última
+		versão e a anterior a ela. O catálogo é cia_aberta_itr_controle (um
+		registro por documento e versão, ITR e DFP), bem menor que as tabelas
+		de contas. Retorna quantos documentos.
+		"""
+		self.conn.execute("""
+			CREATE TEMP TABLE IF NOT EXISTS reapresentacoes (
+				cnpj TEXT NOT NULL, data_referencia TEXT NOT NULL, razao_social TEXT NOT NULL,
+				versao_anterior INTEGER NOT NULL, versao INTEGER NOT NULL,
+				PRIMARY KEY (cnpj, data_referencia)
+			) WITHOUT ROWID
+		""")
+		self.conn.execute("DELETE FROM temp.reapresentacoes")
+		cur = self.conn.execute("""
+			INSERT INTO temp.reapresentacoes
+			SELECT d.cnpj, d.data_referencia, d.razao_social,
+				(SELECT MAX(c.versao) FROM cia_aberta_itr_controle c
+				 WHERE c.cnpj = d.cnpj AND c.data_referencia = d.data_referencia AND c.versao < d.versao),
+				d.versao
+			FROM (
+				SELECT cnpj, data_referencia, razao_social, MAX(versao) AS versao
+				FROM cia_aberta_itr_controle
+				WHERE data_referencia >= ? AND data_referencia < ?
+				GROUP BY cnpj, data_referencia
+				HAVING MIN(versao) < MAX(versao)
+			) d
+		""", (f'{ano}-01-01', f'{ano + 1}-01-01'))
+		return cur.rowcount or 0
+
+	def listar_reapresentacoes(self) -> List[Tuple[str, str, str, int, int]]:
+		"""(cnpj, data_referencia, razao_social, versao_anterior, versao) da tabela temporária."""
+		rows = self.conn.execute("""
+			SELECT cnpj, data_referencia, razao_social, versao_anterior, versao
+			FROM temp.reapresentacoes ORDER BY cnpj, data_referencia
+		""").fetchall()
+		return [tuple(row) for row in rows]
+
+	def iter_contas_reapresentadas(self, tabela: str) -> Iterator[Tuple[str, str, int, str, str, str, int]]:
+		"""
+		(cnpj, data_referencia, versao, grupo, codigo_conta, descricao_conta,
+		valor) das duas versões de cada documento da tabela temporária, em
+		ordem de (cnpj, data, versão, grupo, conta): a ordem do índice UNIQUE,
+		então cada versão já vem ordenada por (grupo, conta) para o
+		merge-join. Uma busca no índice por documento e versão (CROSS JOIN
+		fixa a temporária por fora). valor em reais x 10**4.
+
+		Contas de mesmo valor em reais na outra versão (busca pontual no mesmo
+		índice; o número, não o texto, então escala e casas decimais podem
+		diferir) ficam no SQLite: numa reapresentação quase tudo se repete, e
+		só o que mudou, entrou ou saiu chega ao Python.
+		"""
+		tabela = self._tabela(tabela)
+		cur = self.conn.cursor()
+		cur.row_factory = None
+		return iter(cur.execute(f"""
+			SELECT r.cnpj, r.data_referencia, t.versao, t.grupo, t.codigo_conta, t.descricao_conta,
+				{sql_valor_reais('t.')}
+			FROM temp.reapresentacoes r
+			CROSS JOIN {tabela} t
+				ON t.cnpj = r.cnpj AND t.data_referencia = r.data_referencia
+				AND t.versao IN (r.versao_anterior, r.versao)
+			WHERE NOT EXISTS (
+				SELECT 1 FROM {tabela} o
+				WHERE o.cnpj = t.cnpj AND o.data_referencia = t.data_referencia
+					-- a outra versão do par
+					AND o.versao = r.versao_anterior + r.versao - t.versao
+					AND o.grupo = t.grupo AND o.codigo_conta = t.codigo_conta
+					-- texto e escala iguais (quase sempre) dispensam a conversão
+					AND ((o.valor_conta = t.valor_conta AND o.escala_moeda = t.escala_moeda)
+						OR {sql_valor_reais('o.')} = {sql_valor_reais('t.')})
+			)
+			ORDER BY r.cnpj, r.data_referencia, t.versao, t.grupo, t.codigo_conta
+		"""))
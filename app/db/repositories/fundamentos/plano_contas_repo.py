@@ -0,0 +1,61 @@
+from typing import List, Tuple
+from ...connection import get_conn
+
+
+# pai e nível direto do código (ver migration 0013_plano_contas)
+SQL_PAI = "NULLIF(rtrim(rtrim(codigo_conta, '0123456789'), '.'), '')"
+SQL_NIVEL = "length(codigo_conta) - length(replace(codigo_conta, '.', '')) + 1"
+
+
+def limites_subarvore(codigo: str) -> Tuple[str, str]:
+	"""
+	Intervalo [início, fim) de `codigo` e seus descendentes na ordem BINARY:
+	'1.01' -> ('1.01', '1.01/'). Códigos só têm dígitos e pontos, e '/' vem
+	logo depois de '.' (e antes dos dígitos): entram '1.01' e '1.01.*', não
+	'1.010' nem '1.02'.
+	"""
+	return codigo, f'{codigo}/'
+
+
+class PlanoContasRepo:
+	"""
+	Repository para plano_contas (hierarquia dos códigos de conta).
+
+	O código é o caminho materializado: subárvore é busca de intervalo na
+	chave primária (limites_subarvore), filhos diretos usam o índice de
+	codigo_pai. Sem LIKE.
+	"""
+
+	def __init__(self, conn=None):
+		self.conn = conn or get_conn()
+
+	def registrar_periodo(self, tabela: str, ano: int) -> int:
+		"""
+		Grava as contas novas que aparecem em `tabela` no ano (varre só o
+		índice (data_referencia, codigo_conta)). Retorna quantas entraram.
+		"""
+		cur = self.conn.execute(f"""
+			INSERT OR IGNORE INTO plano_contas (codigo_conta, codigo_pai, nivel)
+			SELECT codigo_conta, {SQL_PAI}, {SQL_NIVEL}
+			FROM (
+				SELECT DISTINCT codigo_conta FROM {tabela}
+				WHERE data_referencia >= ? AND data_referencia < ?
+			)
+		""", (f'{ano}-01-01', f'{ano + 1}-01-01'))
+		return cur.rowcount or 0
+
+	def subarvore(self, codigo: str) -> List[Tuple[str, str, int]]:
+		"""(codigo_conta, codigo_pai, nivel) de `codigo` e descendentes, em ordem de código."""
+		rows = self.conn.execute("""
+			SELECT codigo_conta, codigo_pai, nivel FROM plano_contas
+			WHERE codigo_conta >= ? AND codigo_conta < ?
+			ORDER BY codigo_conta
+		""", limites_subarvore(codigo)).fetchall()
+		return [tuple(row) for row in rows]
+
+	def filhos(self, codigo: str) -> List[str]:
+		"""Códigos dos filhos diretos, em ordem."""
+		rows = self.conn.execute("""
+			SELECT codigo_conta FROM plano_contas WHERE codigo_pai = ? ORDER BY codigo_conta
+		""", (codigo,)).fetchall()
+		return [row[0] for row in rows]
@@ -0,0 +1,114 @@
+from typing import Iterable, Iterator, List, Optional, Tuple
+from ...connection import get_conn
+from .demonstrativos_repo import sql_valor_reais
+
+
+CAMPOS = ('cnpj', 'grupo', 'codigo_conta', 'data_referencia', 'descricao_conta', 'valor', 'atualizado_em')
+
+
+class TtmRepo:
+	"""
+	Repository para cia_aberta_dre_ttm e sua marca d'água.
+
+	As empresas a recalcular (e os exercícios afetados) ficam numa tabela
+	temporária (ttm_empresas): a leitura da DRE e a troca das linhas TTM
+	são junções com ela, sem uma consulta por empresa.
+	"""
+
+	def __init__(self, conn=None):
+		self.conn = conn or get_conn()
+
+	def ultimo_id_processado(self) -> int:
+		row = self.conn.execute("SELECT ultimo_id_dre FROM cia_aberta_dre_ttm_controle WHERE id = 1").fetchone()
+		return row[0] if row else 0
+
+	def marcar_processado(self, ultimo_id: int, atualizado_em: str) -> None:
+		self.conn.execute("""
+			INSERT INTO cia_aberta_dre_ttm_controle (id, ultimo_id_dre, atualizado_em) VALUES (1, ?, ?)
+			ON CONFLICT (id) DO UPDATE SET ultimo_id_dre = excluded.ultimo_id_dre, atualizado_em = excluded.atualizado_em
+		""", (ultimo_id, atualizado_em))
+
+	def max_id_dre(self) -> int:
+		return self.conn.execute("SELECT COALESCE(MAX(id), 0) FROM cia_aberta_itr_dre").fetchone()[0]
+
+	def preparar_empresas(self, desde_id: int, ate_id: int) -> int:
+		"""
+		Empresas com linhas de DRE de id em (desde_id, ate_id] (busca no rowid)
+		vão para a tabela temporária, com os exercícios a recalcular: do
+		primeiro ano com linha nova ao ano seguinte ao último (o TTM de um
+		ano usa o anterior). Retorna quantas empresas.
+		"""
+		self.conn.execute("""
+			CREATE TEMP TABLE IF NOT EXISTS ttm_empresas (
+				cnpj TEXT PRIMARY KEY, ano_inicio INTEGER NOT NULL, ano_fim INTEGER NOT NULL
+			) WITHOUT ROWID
+		""")
+		self.conn.execute("DELETE FROM temp.ttm_empresas")
+		cur = self.conn.execute("""
+			INSERT INTO temp.ttm_empresas
+			SELECT cnpj, MIN(CAST(substr(data_referencia, 1, 4) AS INTEGER)),
+				MAX(CAST(substr(data_referencia, 1, 4) AS INTEGER)) + 1
+			FROM cia_aberta_itr_dre WHERE id > ? AND id <= ?
+			GROUP BY cnpj
+		""", (desde_id, ate_id))
+		return cur.rowcount or 0
+
+	def iter_dre_empresas(self) -> Iterator[Tuple[str, int, int, str, str, str, int, str, str, int]]:
+		"""
+		(cnpj, ano_inicio, ano_fim, grupo, codigo_conta, data_referencia, versao,
+		data_inicio_exercicio, descricao_conta, valor) das empresas da tabela
+		temporária, do ano anterior a ano_inicio até ano_fim, em ordem de
+		(cnpj, data, versão): a ordem do índice UNIQUE, sem ordenação à parte
+		(CROSS JOIN fixa a temporária por fora, uma busca de intervalo por
+		empresa em vez de varrer a DRE). Vêm todas as versões: numa mesma
+		data, as linhas da última versão do documento são as últimas.
+
+		valor em reais x 10**4 (inteiro), por sql_valor_reais (a conversão e a
+		escala das outras consultas de demonstrativos).
+		"""
+		cur = self.conn.cursor()
+		cur.row_factory = None
+		return iter(cur.execute(f"""
+			SELECT e.cnpj, e.ano_inicio, e.ano_fim, d.grupo, d.codigo_conta, d.data_referencia, d.versao,
+				d.data_inicio_exercicio, d.descricao_conta, {sql_valor_reais('d.')}
+			FROM temp.ttm_empresas e
+			CROSS JOIN cia_aberta_itr_dre d
+				ON d.cnpj = e.cnpj
+				AND d.data_referencia >= (e.ano_inicio - 1) || '-01-01'
+				AND d.data_referencia < (e.ano_fim + 1) || '-01-01'
+			ORDER BY e.cnpj, d.data_referencia, d.versao
+		"""))
+
+	def substituir(self, registros: Iterable[tuple]) -> int:
+		"""
+		Apaga as linhas TTM das empresas da tabela temporária nos anos
+		ano_inicio..ano_fim e grava `registros` (tuplas na ordem de CAMPOS;
+		pode ser um gerador).
+		"""
+		# uma busca pelo prefixo cnpj da chave primária por empresa
+		self.conn.executemany("""
+			DELETE FROM cia_aberta_dre_ttm
+			WHERE cnpj = ? AND data_referencia >= ? || '-01-01' AND data_referencia < ? || '-01-01'
+		""", self.conn.execute("SELECT cnpj, ano_inicio, ano_fim + 1 FROM temp.ttm_empresas").fetchall())
+		cur = self.conn.executemany(f"""
+			INSERT INTO cia_aberta_dre_ttm ({', '.join(CAMPOS)})
+			VALUES ({', '.join('?' for _ in CAMPOS)})
+		""", registros)
+		return cur.rowcount or 0
+
+	def serie(self, cnpj: str, codigos: Iterable[str], grupo: Optional[str] = None) -> List[Tuple[str, str, str, str, str]]:
+		"""(grupo, codigo_conta, descricao_conta, data_referencia, valor) de uma empresa, em ordem de data."""
+		codigos = tuple(codigos)
+		where_grupo = "AND grupo = ?" if grupo else ""
+		rows = self.conn.execute(f"""
+			SELECT grupo, codigo_conta, descricao_conta, data_referencia, valor
+			FROM cia_aberta_dre_ttm
+			WHERE cnpj = ? AND codigo_conta IN ({', '.join('?' for _ in codigos)}) {where_grupo}
+			ORDER BY grupo, data_referencia, codigo_conta
+		""", (cnpj, *codigos, *((grupo,) if grupo else ()))).fetchall()
+		return [tuple(row) for row in rows]
+
+	def contar(self) -> Tuple[int, int]:
+		"""(empresas, linhas) na tabela TTM."""
+		row = self.conn.execute("SELECT COUNT(DISTINCT cnpj), COUNT(*) FROM cia_aberta_dre_ttm").fetchone()
+		return row[0], row[1]
@@ -0,0 +1,65 @@
+from typing import Iterable, List, Optional, Tuple
+from ...connection import get_conn
+from ....core.registros_b3 import MovimentacaoB3
+
+
+CAMPOS = MovimentacaoB3._fields
+
+
+class B3MovimentacaoRepo:
+	"""
+	Repository para a tabela b3_movimentacao.
+
+	A deduplicação é pelo índice UNIQUE de fingerprint: uma linha já
+	importada custa só a busca no índice (ON CONFLICT DO NOTHING), então
+	reimportar um histórico sobreposto grava apenas as linhas novas.
+	"""
+
+	def __init__(self, conn=None):
+		self.conn = conn or get_conn()
+		self._sql_insert = f"""
+			INSERT INTO b3_movimentacao ({', '.join(CAMPOS)})
+			VALUES ({', '.join('?' for _ in CAMPOS)})
+			ON CONFLICT (fingerprint) DO NOTHING
+		"""
+
+	def inserir_novos(self, registros: Iterable[MovimentacaoB3]) -> int:
+		"""
+		Grava os registros cujo fingerprint ainda não existe (pode ser um
+		gerador: é consumido em streaming). Retorna quantos foram inseridos.
+		"""
+		cur = self.conn.executemany(self._sql_insert, registros)
+		return cur.rowcount or 0
+
+	def periodo(self) -> Optional[Tuple[str, str, int]]:
+		"""(primeira data, última data, total de movimentações) ou None se vazia."""
+		row = self.conn.execute("SELECT MIN(data), MAX(data), COUNT(*) FROM b3_movimentacao").fetchone()
+		return tuple(row) if row[2] else None
+
+	def listar_para_avaliacao(self, ate: str | None = None) -> List[Tuple[str, ...]]:
+		"""
+		(ticker, data, entrada_saida, movimentacao, quantidade, preco_unitario,
+		valor_operacao) em ordem de ticker e data (ver CarteiraService). No
+		mesmo dia, entradas antes das saídas (day trade: compra, depois venda).
+
+		Quantidade e valores saem como inteiros em escala fixa (x 10**6 e
+		x 10**4): as colunas são qty_str/money_str, com as casas completas,
+		então basta tirar o ponto, e o SQLite converte sem passar por Python.
+		"""
+		where_clause = "WHERE data <= ?" if ate else ""
+		rows = self.conn.execute(f"""
+			SELECT ticker, data, entrada_saida, movimentacao,
+				CAST(REPLACE(quantidade, '.', '') AS INTEGER),
+				CAST(REPLACE(preco_unitario, '.', '') AS INTEGER),
+				CAST(REPLACE(valor_operacao, '.', '') AS INTEGER)
+			FROM b3_movimentacao
+			{where_clause}
+			ORDER BY ticker, data, entrada_saida = 'Debito', id
+		""", (ate,) if ate else ()).fetchall()
+		return [tuple(row) for row in rows]
+
+	def listar_por_ticker(self, ticker: str) -> List:
+		rows = self.conn.execute("""
+			SELECT * FROM b3_movimentacao WHERE ticker = ? ORDER BY data, id
+		""", (ticker.upper(),)).fetchall()
+		return rows
@@ -0,0 +1,99 @@
+from typing import Dict, Iterable, List, Tuple
+from ...connection import get_conn
+from ....core.registros_b3 import PosicaoB3
+
+
+CHAVE = ('data_referencia', 'ticker', 'conta')
+CAMPOS = PosicaoB3._fields
+# uma linha só é atualizada se um destes mudar (arquivo/atualizado_em não contam)
+CAMPOS_VALOR = ('categoria', 'produto', 'instituicao', 'isin', 'quantidade', 'preco_fechamento', 'valor_atualizado')
+
+
+class B3PosicaoRepo:
+	"""
+	Repository para a tabela b3_posicao.
+
+	A carga é em conjunto: as linhas vão para uma tabela temporária
+	(b3_posicao_stage, via executemany) e entram na definitiva com um único
+	INSERT ... SELECT ... ON CONFLICT DO UPDATE, que só reescreve as linhas
+	que mudaram. Cada arquivo é o snapshot completo da data: as linhas já
+	gravadas da data que não vieram nele (posição vendida ou corrigida) são
+	apagadas.
+	"""
+
+	def __init__(self, conn=None):
+		self.conn = conn or get_conn()
+
+	def preparar_staging(self) -> None:
+		self.conn.execute(f"""
+			CREATE TEMP TABLE IF NOT EXISTS b3_posicao_stage (
+				{', '.join(CAMPOS)},
+				PRIMARY KEY ({', '.join(CHAVE)})
+			) WITHOUT ROWID
+		""")
+		self.conn.execute("DELETE FROM temp.b3_posicao_stage")
+
+	def carregar_staging(self, registros: Iterable[PosicaoB3]) -> int:
+		"""
+		Grava os registros (pode ser um gerador: é consumido em streaming) na
+		tabela temporária. Chave repetida: a última linha prevalece.
+		"""
+		cur = self.conn.executemany(f"""
+			INSERT OR REPLACE INTO temp.b3_posicao_stage ({', '.join(CAMPOS)})
+			VALUES ({', '.join('?' for _ in CAMPOS)})
+		""", registros)
+		return cur.rowcount or 0
+
+	def aplicar_staging(self, substituir: bool = True) -> Tuple[int, int, int, int]:
+		"""
+		Aplica a tabela temporária em b3_posicao e a esvazia.
+		Retorna (inseridos, atualizados, ignorados, removidos), onde removidos
+		são linhas das datas do arquivo que não estão mais nele (só com
+		substituir; False soma à posição já gravada, p.ex. o segundo arquivo
+		de uma mesma data).
+		"""
+		removidos = 0
+		if substituir:
+			# busca no prefixo data_referencia da chave primária por data
+			removidos = self.conn.execute(f"""
+				DELETE FROM b3_posicao
+				WHERE data_referencia IN (SELECT DISTINCT data_referencia FROM temp.b3_posicao_stage)
+					AND ({', '.join(CHAVE)}) NOT IN (SELECT {', '.join(CHAVE)} FROM temp.b3_posicao_stage)
+			""").rowcount
+
+		atuais = ', '.join(f"p.{c}" for c in CAMPOS_VALOR)
+		novos = ', '.join(f"s.{c}" for c in CAMPOS_VALOR)
+		total, existentes, alterados = self.conn.execute(f"""
+			SELECT COUNT(*), COUNT(p.ticker), COALESCE(SUM(p.ticker IS NOT NULL AND ({atuais}) IS NOT ({novos})), 0)
+			FROM temp.b3_posicao_stage s
+			LEFT JOIN b3_posicao p USING ({', '.join(CHAVE)})
+		""").fetchone()
+
+		self.conn.execute(f"""
+			INSERT INTO b3_posicao ({', '.join(CAMPOS)})
+			SELECT {', '.join(CAMPOS)} FROM temp.b3_posicao_stage WHERE true
+			ON CONFLICT ({', '.join(CHAVE)}) DO UPDATE SET
+				{', '.join(f"{c} = excluded.{c}" for c in CAMPOS if c not in CHAVE)}
+			WHERE ({', '.join(f"b3_posicao.{c}" for c in CAMPOS_VALOR)})
+				IS NOT ({', '.join(f"excluded.{c}" for c in CAMPOS_VALOR)})
+		""")
+		self.conn.execute("DELETE FROM temp.b3_posicao_stage")
+		return total - existentes, alterados, existentes - alterados, removidos
+
+	def listar_datas(self) -> List[str]:
+		"""Datas de referência já importadas (mais recente primeiro)."""
+		rows = self.conn.execute("""
+			SELECT DISTINCT data_referencia FROM b3_posicao ORDER BY data_referencia DESC
+		""").fetchall()
+		return [row[0] for row in rows]
+
+	def ultimos_precos(self, ate: str | None = None) -> Dict[str, str]:
+		"""{ticker: preço de fechamento da posição mais recente (até a data `ate`)}."""
+		where_clause = "WHERE data_referencia <= ?" if ate else ""
+		rows = self.conn.execute(f"""
+			SELECT ticker, preco_fechamento, MAX(data_referencia)
+			FROM b3_posicao
+			{where_clause}
+			GROUP BY ticker
+		""", (ate,) if ate else ()).fetchall()
+		return {row[0]: row[1] for row in rows if row[1] and row[1] != '0.0000'}
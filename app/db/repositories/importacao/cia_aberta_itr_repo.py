@@ -1,107 +1,74 @@
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Iterator, NamedTuple, Sequence
 from ...connection import get_conn
 
 
+# Colunas das constraints UNIQUE de cada tabela (mesma ordem da migration)
+CHAVES_UNICAS = {
+    'cia_aberta_itr_bpa': ('cnpj', 'data_referencia', 'versao', 'grupo', 'codigo_conta'),
+    'cia_aberta_itr_bpp': ('cnpj', 'data_referencia', 'versao', 'grupo', 'codigo_conta'),
+    'cia_aberta_itr_dre': ('cnpj', 'data_referencia', 'versao', 'grupo', 'codigo_conta'),
+    'cia_aberta_itr_composicao_capital': ('cnpj', 'data_referencia', 'versao'),
+    'cia_aberta_itr_controle': ('cnpj', 'data_referencia', 'versao', 'codigo_documento'),
+}
+
+
 class CiaAbertaItrRepo:
     """Repository para as tabelas de Itr."""
     
     def __init__(self, conn=None):
         self.conn = conn or get_conn()
+        # INSERT por (tabela, campos do registro)
+        self._sql_cache: Dict[tuple, str] = {}
     
-    def insert_itr_controle(self, **kwargs) -> tuple[int, str]:
+    def inserir_lote(self, table_name: str, registros: Sequence[NamedTuple]) -> int:
         """
-		Retorna (affected_rows, action) onde action = 'inserted'|'updated'|'ignored'
-		"""
-        cur = self.conn.cursor()
-		
-        try:
-            cur.execute("""
-				INSERT OR IGNORE INTO cia_aberta_itr_controle (
-					cnpj, data_referencia, versao, razao_social, codigo_cvm,
-					categoria_documento, codigo_documento, data_recebimento,
-					link_documento, criado_em
-				) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-			""", (
-				kwargs['cnpj'], kwargs['data_referencia'], kwargs['versao'],
-				kwargs.get('razao_social'), kwargs.get('codigo_cvm'),
-				kwargs.get('categoria_documento'), kwargs.get('codigo_documento'),
-				kwargs.get('data_recebimento'), kwargs.get('link_documento'),
-				kwargs['criado_em']
-			))
-            return (cur.rowcount or 0), ('inserted' if cur.rowcount == 1 else 'ignored')
-        
-        except Exception as e:
-			
-            raise e
-    
-    def insert_itr_composicao_capital(self, **kwargs) -> tuple[int, str]:
+        INSERT OR IGNORE de um lote de registros (ver core.registros_cvm), com as
+        colunas tiradas de _fields. Retorna quantas linhas foram inseridas (as
+        demais já existiam). Roda num SAVEPOINT: se uma linha falhar, nada do
+        lote fica gravado e a exceção é propagada.
         """
-		Retorna (affected_rows, action) onde action = 'inserted'|'updated'|'ignored'
-		"""
+        if not registros:
+            return 0
+        sql = self._sql_insert(table_name, registros[0]._fields)
         cur = self.conn.cursor()
-		
+        if not self.conn.in_transaction:
+            cur.execute("BEGIN")
+        cur.execute("SAVEPOINT lote_itr")
         try:
-            cur.execute("""
-                INSERT OR IGNORE INTO cia_aberta_itr_composicao_capital (
-                    cnpj, data_referencia, versao, razao_social,
-                    qtde_acao_ordinaria, qtde_acao_preferencial, qtde_acao_total,
-                    qtde_acao_ordinaria_tesouraria, qtde_acao_preferencial_tesouraria, qtde_acao_total_tesouraria
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
-                kwargs['cnpj'],
-                kwargs['data_referencia'],
-                kwargs['versao'],
-                kwargs['razao_social'],
-                kwargs['qtde_acao_ordinaria'],
-                kwargs['qtde_acao_preferencial'],
-                kwargs['qtde_acao_total'],
-                kwargs['qtde_acao_ordinaria_tesouraria'],
-                kwargs['qtde_acao_preferencial_tesouraria'],
-                kwargs['qtde_acao_total_tesouraria']
-            ))
-            return (cur.rowcount or 0), ('inserted' if cur.rowcount == 1 else 'ignored')
-        
-        except Exception as e:
-            raise e
+            cur.executemany(sql, registros)
+            inseridos = cur.rowcount or 0
+        except Exception:
+            cur.execute("ROLLBACK TO lote_itr")
+            cur.execute("RELEASE lote_itr")
+            raise
+        cur.execute("RELEASE lote_itr")
+        return inseridos
 
-    def insert_itr_dre_bal(self, table_name: str, **kwargs) -> tuple[int, str]:
+    def _sql_insert(self, table_name: str, campos: tuple) -> str:
+        chave = (table_name, campos)
+        sql = self._sql_cache.get(chave)
+        if sql is None:
+            sql = self._sql_cache[chave] = f"""
+                INSERT OR IGNORE INTO {table_name} ({', '.join(campos)})
+                VALUES ({', '.join('?' for _ in campos)})
+            """
+        return sql
+
+    def iter_chaves_existentes(self, table_name: str, ano: int) -> Iterator[tuple]:
+        """
+        Itera as chaves únicas (tuplas, ver CHAVES_UNICAS) já gravadas na tabela
+        para o ano de referência informado.
         """
-		Retorna (affected_rows, action) onde action = 'inserted'|'updated'|'ignored'
-		"""
+        colunas = ', '.join(CHAVES_UNICAS[table_name])
         cur = self.conn.cursor()
+        # tuplas puras (sqlite3.Row tem hash diferente de tuple)
+        cur.row_factory = None
+        cur.execute(f"""
+            SELECT {colunas} FROM {table_name}
+            WHERE data_referencia >= ? AND data_referencia < ?
+        """, (f'{ano}-01-01', f'{ano + 1}-01-01'))
+        return iter(cur)
 
-        try:
-            cur.execute(f"""
-                INSERT OR IGNORE INTO {table_name} (
-                    cnpj, data_referencia, versao, razao_social,
-                    codigo_cvm, grupo, moeda, escala_moeda,
-                    data_inicio_exercicio, data_fim_exercicio,
-                    codigo_conta, descricao_conta, valor_conta,
-                    conta_fixa, criado_em
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
-                kwargs['cnpj'],
-                kwargs['data_referencia'],
-                kwargs['versao'],
-                kwargs['razao_social'],
-                kwargs['codigo_cvm'],
-                kwargs['grupo'],
-                kwargs['moeda'],
-                kwargs['escala_moeda'],
-                kwargs['data_inicio_exercicio'],
-                kwargs['data_fim_exercicio'],
-                kwargs['codigo_conta'],
-                kwargs['descricao_conta'],
-                kwargs['valor_conta'],
-                kwargs['conta_fixa'],
-                kwargs['criado_em']
-            ))
-            return (cur.rowcount or 0), ('inserted' if cur.rowcount == 1 else 'ignored')
-
-        except Exception as e:
-            
-            raise e
-        
 #         WITH ult AS (
 #     /* pega a última versão disponível por CNPJ + data + grupo */
 #     SELECT 
@@ -0,0 +1,110 @@
+from typing import Optional, List, Dict, Any, Iterable, Tuple
+from ...connection import get_conn
+from ....core.registros_cvm import FundoCvm
+
+
+CAMPOS = FundoCvm._fields
+# uma linha só é atualizada se um destes mudar (atualizado_em não conta)
+CAMPOS_VALOR = tuple(c for c in CAMPOS if c not in ('cnpj', 'atualizado_em'))
+
+
+class FiCadastroRepo:
+	"""
+	Repository para a tabela fi_cadastro (cadastro de fundos da CVM).
+
+	A carga é em conjunto: o CSV inteiro vai para uma tabela temporária
+	(fi_cadastro_stage, via executemany), um ROW_NUMBER por CNPJ escolhe o
+	registro vigente de cada fundo e um único INSERT ... SELECT ... ON
+	CONFLICT DO UPDATE grava só os fundos novos ou alterados.
+	"""
+
+	def __init__(self, conn=None):
+		self.conn = conn or get_conn()
+
+	def preparar_staging(self) -> None:
+		self.conn.execute(f"CREATE TEMP TABLE IF NOT EXISTS fi_cadastro_stage ({', '.join(CAMPOS)})")
+		self.conn.execute("DELETE FROM temp.fi_cadastro_stage")
+
+	def carregar_staging(self, registros: Iterable[FundoCvm]) -> int:
+		"""Grava os registros (pode ser um gerador: é consumido em streaming) na tabela temporária."""
+		cur = self.conn.executemany(f"""
+			INSERT INTO temp.fi_cadastro_stage ({', '.join(CAMPOS)})
+			VALUES ({', '.join('?' for _ in CAMPOS)})
+		""", registros)
+		return cur.rowcount or 0
+
+	def aplicar_staging(self) -> Tuple[int, int, int, int]:
+		"""
+		Aplica a tabela temporária em fi_cadastro e a esvazia.
+		Retorna (inseridos, atualizados, ignorados, substituidos), onde
+		substituidos são registros antigos de um CNPJ que aparece de novo no
+		arquivo (só o vigente é gravado).
+		"""
+		# registro vigente por CNPJ: não cancelado, depois o de registro mais
+		# recente, depois a última linha do arquivo
+		substituidos = self.conn.execute("""
+			DELETE FROM temp.fi_cadastro_stage WHERE rowid IN (
+				SELECT rowid FROM (
+					SELECT rowid, ROW_NUMBER() OVER (
+						PARTITION BY cnpj
+						ORDER BY data_cancelamento IS NOT NULL AND data_cancelamento <> '',
+							data_registro DESC, data_inicio_situacao DESC, rowid DESC
+					) AS ordem
+					FROM temp.fi_cadastro_stage
+				) WHERE ordem > 1
+			)
+		""").rowcount
+
+		atuais = ', '.join(f"f.{c}" for c in CAMPOS_VALOR)
+		novos = ', '.join(f"s.{c}" for c in CAMPOS_VALOR)
+		total, existentes, alterados = self.conn.execute(f"""
+			SELECT COUNT(*), COUNT(f.cnpj), COALESCE(SUM(f.cnpj IS NOT NULL AND ({atuais}) IS NOT ({novos})), 0)
+			FROM temp.fi_cadastro_stage s
+			LEFT JOIN fi_cadastro f ON f.cnpj = s.cnpj
+		""").fetchone()
+
+		self.conn.execute(f"""
+			INSERT INTO fi_cadastro ({', '.join(CAMPOS)})
+			SELECT {', '.join(CAMPOS)} FROM temp.fi_cadastro_stage WHERE true
+			ON CONFLICT (cnpj) DO UPDATE SET
+				{', '.join(f"{c} = excluded.{c}" for c in CAMPOS if c != 'cnpj')}
+			WHERE ({', '.join(f"fi_cadastro.{c}" for c in CAMPOS_VALOR)})
+				IS NOT ({', '.join(f"excluded.{c}" for c in CAMPOS_VALOR)})
+		""")
+		self.conn.execute("DELETE FROM temp.fi_cadastro_stage")
+		return total - existentes, alterados, existentes - alterados, substituidos
+
+	def get_by_cnpj(self, cnpj: str) -> Optional[Dict[str, Any]]:
+		"""Busca fundo por CNPJ."""
+		row = self.conn.execute("SELECT * FROM fi_cadastro WHERE cnpj = ?", (cnpj,)).fetchone()
+		return dict(row) if row else None
+
+	def count_all(self) -> int:
+		"""Conta total de fundos."""
+		result = self.conn.execute("SELECT COUNT(*) as count FROM fi_cadastro").fetchone()
+		return result['count']
+
+	def contar_por_situacao(self) -> List[Tuple[str, int]]:
+		"""(situação, quantidade) de fundos, da maior para a menor."""
+		rows = self.conn.execute("""
+			SELECT situacao, COUNT(*) FROM fi_cadastro GROUP BY situacao ORDER BY 2 DESC
+		""").fetchall()
+		return [tuple(row) for row in rows]
+
+	def listar_por_classe(self, classe: str, situacao: str | None = 'EM FUNCIONAMENTO NORMAL',
+						  offset: int = 0, limit: int = 20) -> List[Dict[str, Any]]:
+		"""Fundos de uma classe (e situação; None = todas), pelo índice (classe, situacao)."""
+		where_clause = "WHERE classe = ?"
+		params: list = [classe]
+		if situacao:
+			where_clause += " AND situacao = ?"
+			params.append(situacao)
+		params.extend([limit, offset])
+		rows = self.conn.execute(f"""
+			SELECT cnpj, denominacao_social, classe, situacao, patrimonio_liquido, administrador
+			FROM fi_cadastro
+			{where_clause}
+			ORDER BY denominacao_social
+			LIMIT ? OFFSET ?
+		""", params).fetchall()
+		return [dict(row) for row in rows]
@@ -0,0 +1,49 @@
+import json
+from typing import List, Dict, Any, Sequence
+from ...connection import get_conn
+
+
+COLUNAS = (
+	'tipo', 'ano', 'status', 'erro', 'iniciado_em', 'finalizado_em', 'bytes_baixados',
+	'linhas', 'inseridos', 'ignorados', 'erros', 't_download', 't_extracao', 't_parse',
+	't_escrita', 't_commit', 't_total', 'linhas_por_segundo', 'pico_memoria_kb',
+	'perfil_memoria',
+)
+
+
+class ImportRunRepo:
+	"""Repository para a tabela import_runs (histórico das importações)."""
+
+	def __init__(self, conn=None):
+		self.conn = conn or get_conn()
+
+	def insert(self, **kwargs) -> int:
+		"""Grava uma execução e retorna o id (perfil_memoria é gravado como JSON)."""
+		if kwargs.get('perfil_memoria') is not None:
+			kwargs['perfil_memoria'] = json.dumps(kwargs['perfil_memoria'], ensure_ascii=False)
+		cur = self.conn.cursor()
+		cur.execute(f"""
+			INSERT INTO import_runs ({', '.join(COLUNAS)})
+			VALUES ({', '.join('?' for _ in COLUNAS)})
+		""", tuple(kwargs.get(c) for c in COLUNAS))
+		return cur.lastrowid
+
+	def ultima_execucao(self, tipos: Sequence[str]) -> int:
+		"""id da importação mais recente dos tipos (0 se nenhuma): muda a cada nova carga."""
+		row = self.conn.execute(f"""
+			SELECT COALESCE(MAX(id), 0) FROM import_runs WHERE tipo IN ({', '.join('?' for _ in tipos)})
+		""", tuple(tipos)).fetchone()
+		return row[0]
+
+	def listar_recentes(self, tipo: str | None = None, limit: int = 20) -> List[Dict[str, Any]]:
+		"""Últimas execuções (mais recentes primeiro), opcionalmente por tipo."""
+		where_clause = "WHERE tipo = ?" if tipo else ""
+		params = [tipo] if tipo else []
+		params.append(limit)
+		rows = self.conn.execute(f"""
+			SELECT * FROM import_runs
+			{where_clause}
+			ORDER BY id DESC
+			LIMIT ?
+		""", params).fetchall()
+		return [dict(row) for row in rows]
@@ -0,0 +1,90 @@
+from typing import Iterable, List, Optional, Tuple
+from ...connection import get_conn
+from ....core.registros_b3 import CotacaoDiaria
+
+
+CHAVE = ('ticker', 'data')
+CAMPOS = CotacaoDiaria._fields
+# uma cotação só é atualizada se um destes mudar (arquivo/atualizado_em não contam)
+CAMPOS_VALOR = ('abertura', 'maxima', 'minima', 'fechamento', 'volume')
+
+
+class PrecosHistoricoRepo:
+	"""
+	Repository para a tabela precos_historico.
+
+	Carga em conjunto como em B3PosicaoRepo (tabela temporária + um
+	INSERT ... SELECT ... ON CONFLICT DO UPDATE). A leitura de uma série é
+	uma varredura de intervalo na chave primária (ticker, data).
+	"""
+
+	def __init__(self, conn=None):
+		self.conn = conn or get_conn()
+
+	def preparar_staging(self) -> None:
+		self.conn.execute(f"""
+			CREATE TEMP TABLE IF NOT EXISTS precos_historico_stage (
+				{', '.join(CAMPOS)},
+				PRIMARY KEY ({', '.join(CHAVE)})
+			) WITHOUT ROWID
+		""")
+		self.conn.execute("DELETE FROM temp.precos_historico_stage")
+
+	def carregar_staging(self, registros: Iterable[CotacaoDiaria]) -> int:
+		"""
+		Grava os registros (pode ser um gerador: é consumido em streaming) na
+		tabela temporária. Chave repetida: a última linha prevalece.
+		"""
+		cur = self.conn.executemany(f"""
+			INSERT OR REPLACE INTO temp.precos_historico_stage ({', '.join(CAMPOS)})
+			VALUES ({', '.join('?' for _ in CAMPOS)})
+		""", registros)
+		return cur.rowcount or 0
+
+	def tickers_staging(self) -> List[str]:
+		"""Tickers presentes na tabela temporária (antes de aplicar_staging)."""
+		rows = self.conn.execute("SELECT DISTINCT ticker FROM temp.precos_historico_stage").fetchall()
+		return [row[0] for row in rows]
+
+	def aplicar_staging(self) -> Tuple[int, int, int]:
+		"""
+		Aplica a tabela temporária em precos_historico e a esvazia.
+		Retorna (inseridos, atualizados, ignorados).
+		"""
+		atuais = ', '.join(f"p.{c}" for c in CAMPOS_VALOR)
+		novos = ', '.join(f"s.{c}" for c in CAMPOS_VALOR)
+		total, existentes, alterados = self.conn.execute(f"""
+			SELECT COUNT(*), COUNT(p.fechamento), COALESCE(SUM(p.fechamento IS NOT NULL AND ({atuais}) IS NOT ({novos})), 0)
+			FROM temp.precos_historico_stage s
+			LEFT JOIN precos_historico p USING ({', '.join(CHAVE)})
+		""").fetchone()
+
+		self.conn.execute(f"""
+			INSERT INTO precos_historico ({', '.join(CAMPOS)})
+			SELECT {', '.join(CAMPOS)} FROM temp.precos_historico_stage WHERE true
+			ON CONFLICT ({', '.join(CHAVE)}) DO UPDATE SET
+				{', '.join(f"{c} = excluded.{c}" for c in CAMPOS if c not in CHAVE)}
+			WHERE ({', '.join(f"precos_historico.{c}" for c in CAMPOS_VALOR)})
+				IS NOT ({', '.join(f"excluded.{c}" for c in CAMPOS_VALOR)})
+		""")
+		self.conn.execute("DELETE FROM temp.precos_historico_stage")
+		return total - existentes, alterados, existentes - alterados
+
+	def serie(self, ticker: str, inicio: str | None = None, fim: str | None = None) -> List[Tuple[str, int]]:
+		"""
+		(data, fechamento) de um ticker em ordem de data, entre `inicio` e
+		`fim` inclusive (aaaa-mm-dd; None = sem limite).
+		"""
+		rows = self.conn.execute("""
+			SELECT data, fechamento FROM precos_historico
+			WHERE ticker = ? AND data >= ? AND data <= ?
+			ORDER BY data
+		""", (ticker.upper(), inicio or '', fim or '9999-12-31')).fetchall()
+		return [tuple(row) for row in rows]
+
+	def resumo(self) -> Optional[Tuple[int, int, str, str]]:
+		"""(tickers, cotações, primeira data, última data) ou None se vazia."""
+		row = self.conn.execute("""
+			SELECT COUNT(DISTINCT ticker), COUNT(*), MIN(data), MAX(data) FROM precos_historico
+		""").fetchone()
+		return tuple(row) if row[1] else None
@@ -0,0 +1,127 @@
+"""
+Cadastro de Ativos: ticker, nome, tipo, ISIN e CNPJ do emissor (liga o
+ticker à empresa de cia_aberta_fca_geral).
+
+Consultas por ticker e o autocomplete usam um índice em memória
+(core.indice_ativos), carregado na primeira consulta e compartilhado pelo
+processo. Toda escrita feita por este serviço descarta o índice; a
+próxima consulta o reconstrói a partir do banco.
+"""
+import re
+from typing import Any, Dict, List, Optional
+from ..db.repositories.ativos.ativo_repo import AtivoRepo
+from ..core.indice_ativos import IndicePrefixo
+from ..core.utils import normalize_cnpj, valid_cnpj, get_utc_timestamp, ValidationError
+
+TIPOS_ATIVO = ('ACAO', 'FII', 'ETF', 'BDR', 'TESOURO', 'FUNDO', 'OUTRO')
+
+TICKER_VALIDO = re.compile(r'[A-Z0-9]{4,12}')
+ISIN_VALIDO = re.compile(r'[A-Z]{2}[A-Z0-9]{9}[0-9]')
+
+# índice do processo (None = ainda não carregado ou invalidado)
+_indice: Optional[IndicePrefixo[Dict[str, Any]]] = None
+
+
+def invalidar_indice() -> None:
+	"""Descarta o índice em memória (chamado a cada escrita no cadastro)."""
+	global _indice
+	_indice = None
+
+
+class AtivoService:
+	"""Serviço do cadastro de ativos."""
+
+	def __init__(self, conn=None):
+		self.repo = AtivoRepo(conn)
+
+	def indice(self) -> IndicePrefixo[Dict[str, Any]]:
+		"""Índice de tickers/nomes; carregado do banco no primeiro uso."""
+		global _indice
+		if _indice is None:
+			_indice = IndicePrefixo((a['ticker'], a['nome'], a) for a in self.repo.listar_todos())
+		return _indice
+
+	def resolver(self, ticker: str) -> Optional[Dict[str, Any]]:
+		"""Ativo do ticker (com a razão social do emissor), ou None."""
+		return self.indice().exato(ticker)
+
+	def buscar(self, prefixo: str, limite: int = 10) -> List[Dict[str, Any]]:
+		"""Autocomplete: ativos cujo ticker ou palavra do nome começa com o prefixo."""
+		return self.indice().buscar(prefixo, limite)
+
+	def listar(self) -> List[Dict[str, Any]]:
+		return self.repo.listar_todos()
+
+	def emissor_importado(self, cnpj: str) -> bool:
+		"""True se o CNPJ está no cadastro de empresas (FCA) importado."""
+		return self.repo.emissor_existe(normalize_cnpj(cnpj))
+
+	def cadastrar(self, ticker: str, nome: str, tipo: str, isin: str = '', cnpj_emissor: str = '') -> int:
+		"""
+		Cadastra um ativo.
+
+		Raises:
+			ValidationError: Para dados inválidos ou ticker já cadastrado
+		"""
+		ticker, nome, tipo, isin, cnpj_emissor = self._validar(ticker, nome, tipo, isin, cnpj_emissor)
+		if self.repo.get_by_ticker(ticker):
+			raise ValidationError(f"Ticker já cadastrado: {ticker}")
+		try:
+			ativo_id = self.repo.inserir(ticker, nome, tipo, isin, cnpj_emissor, get_utc_timestamp())
+			self.repo.conn.commit()
+		finally:
+			invalidar_indice()
+		return ativo_id
+
+	def atualizar(self, ticker: str, nome: str, tipo: str, isin: str = '', cnpj_emissor: str = '') -> None:
+		"""
+		Atualiza nome, tipo, ISIN e emissor de um ativo.
+
+		Raises:
+			ValidationError: Para dados inválidos ou ticker não cadastrado
+		"""
+		ticker, nome, tipo, isin, cnpj_emissor = self._validar(ticker, nome, tipo, isin, cnpj_emissor)
+		try:
+			if not self.repo.atualizar(ticker, nome, tipo, isin, cnpj_emissor, get_utc_timestamp()):
+				raise ValidationError(f"Ticker não cadastrado: {ticker}")
+			self.repo.conn.commit()
+		finally:
+			invalidar_indice()
+
+	def remover(self, ticker: str) -> None:
+		"""
+		Remove um ativo.
+
+		Raises:
+			ValidationError: Para ticker não cadastrado
+		"""
+		ticker = ticker.strip().upper()
+		try:
+			if not self.repo.excluir(ticker):
+				raise ValidationError(f"Ticker não cadastrado: {ticker}")
+			self.repo.conn.commit()
+		finally:
+			invalidar_indice()
+
+	def _validar(self, ticker: str, nome: str, tipo: str, isin: str, cnpj_emissor: str) -> tuple:
+		"""Normaliza e valida os campos; retorna (ticker, nome, tipo, isin, cnpj_emissor)."""
+		ticker = ticker.strip().upper()
+		if not TICKER_VALIDO.fullmatch(ticker):
+			raise ValidationError(f"Ticker inválido: {ticker or '(vazio)'}")
+
+		nome = nome.strip()
+		if not nome:
+			raise ValidationError("Nome do ativo vazio")
+
+		tipo = tipo.strip().upper()
+		if tipo not in TIPOS_ATIVO:
+			raise ValidationError(f"Tipo inválido: {tipo}. Use {', '.join(TIPOS_ATIVO)}")
+
+		isin = isin.strip().upper()
+		if isin and not ISIN_VALIDO.fullmatch(isin):
+			raise ValidationError(f"ISIN inválido: {isin}")
+
+		cnpj = normalize_cnpj(cnpj_emissor.strip()) if cnpj_emissor.strip() else ''
+		if cnpj and not valid_cnpj(cnpj):
+			raise ValidationError(f"CNPJ inválido: {cnpj_emissor}")
+		return ticker, nome, tipo, isin or None, cnpj or None
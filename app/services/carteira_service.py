@@ -0,0 +1,204 @@
+"""
+Avaliação da carteira a partir da movimentação da B3 (b3_movimentacao).
+
+Para cada ativo: posição, custo médio, lucro realizado (vendas contra o
+custo médio), proventos, valor de mercado (último preço de fechamento da
+posição consolidada, b3_posicao), lucro não realizado e alocação.
+
+Tudo em inteiros de escala fixa (core.decimal_ctx: MONEY_SCALE/QTY_SCALE),
+sem um Decimal por linha: o repositório já entrega quantidade e valores
+como inteiros escalados (a conversão do texto é feita no SQLite), que
+viram arrays int64 (numpy) de uma vez, e a classificação e os proventos são vetoriais (somas
+por ativo com np.add.reduceat sobre os grupos contíguos do ORDER BY). Só
+a recorrência da posição e do custo médio, em que cada venda depende do
+custo no momento, percorre as negociações, com inteiros Python. Decimal
+só aparece no resultado, para exibição (core.formatters).
+"""
+from decimal import Decimal
+from operator import ne
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+import numpy as np
+
+from ..db.connection import get_conn
+from ..db.repositories.importacao.b3_movimentacao_repo import B3MovimentacaoRepo
+from ..db.repositories.importacao.b3_posicao_repo import B3PosicaoRepo
+from ..core.decimal_ctx import MONEY_SCALE, QTY_SCALE, from_scaled, to_scaled
+from ..core.indice_ativos import normalizar_busca
+
+# Classificação das movimentações (pelo texto normalizado de 'Movimentação')
+NEGOCIACAO, PROVENTO, EVENTO, IGNORADA = 1, 2, 3, 0
+
+TIPOS_MOVIMENTACAO = {
+	'TRANSFERENCIA - LIQUIDACAO': NEGOCIACAO,
+	'COMPRA': NEGOCIACAO,
+	'VENDA': NEGOCIACAO,
+	'COMPRA / VENDA': NEGOCIACAO,
+	'DIVIDENDO': PROVENTO,
+	'JUROS SOBRE CAPITAL PROPRIO': PROVENTO,
+	'RENDIMENTO': PROVENTO,
+	'REEMBOLSO': PROVENTO,
+	'LEILAO DE FRACAO': PROVENTO,
+	# mudam a quantidade sem mudar o custo total (nas saídas também: o custo
+	# do grupamento ou da fração baixada fica com as ações que restam)
+	'BONIFICACAO EM ATIVOS': EVENTO,
+	'DESDOBRO': EVENTO,
+	'GRUPAMENTO': EVENTO,
+	'FRACAO EM ATIVOS': EVENTO,
+}
+
+UNIDADE_QTY = 10 ** QTY_SCALE
+
+
+class Movimento(NamedTuple):
+	"""
+	Colunas de b3_movimentacao usadas na avaliação (ordem do SELECT), com os
+	valores já em escala fixa (ver B3MovimentacaoRepo.listar_para_avaliacao).
+	"""
+	ticker: str
+	data: str
+	entrada_saida: str
+	movimentacao: str
+	quantidade: int           # x 10**QTY_SCALE
+	preco_unitario: int       # x 10**MONEY_SCALE
+	valor_operacao: int       # x 10**MONEY_SCALE
+
+
+class PosicaoCarteira(NamedTuple):
+	ticker: str
+	quantidade: Decimal
+	custo_medio: Optional[Decimal]
+	custo_total: Decimal
+	preco: Optional[Decimal]               # último fechamento conhecido (None = sem cotação)
+	valor_mercado: Optional[Decimal]
+	lucro_nao_realizado: Optional[Decimal]
+	lucro_nao_realizado_pct: Optional[Decimal]
+	lucro_realizado: Decimal
+	proventos: Decimal
+	alocacao_pct: Optional[Decimal]
+
+
+def _div_half_up(a: int, b: int) -> int:
+	"""a / b arredondado HALF_UP (para longe do zero no empate), b > 0."""
+	q = (2 * abs(a) + b) // (2 * b)
+	return q if a >= 0 else -q
+
+
+def _classificar(movimentacoes: Sequence[str]) -> np.ndarray:
+	"""Código de TIPOS_MOVIMENTACAO de cada linha (cada texto distinto é normalizado uma vez)."""
+	codigos = {texto: TIPOS_MOVIMENTACAO.get(normalizar_busca(texto), IGNORADA) for texto in set(movimentacoes)}
+	return np.fromiter(map(codigos.__getitem__, movimentacoes), dtype=np.int8, count=len(movimentacoes))
+
+
+def avaliar_movimentos(movimentos: Sequence[Movimento], precos: Dict[str, str]) -> List[PosicaoCarteira]:
+	"""
+	Avalia a carteira. `movimentos` em ordem de ticker e data (agrupados por
+	ticker); `precos` é {ticker: último preço em texto decimal}. Ativos
+	zerados sem lucro realizado nem proventos não entram no resultado.
+	"""
+	if not movimentos:
+		return []
+	tickers, _, entradas, movimentacoes, quantidades, precos_unit, valores = zip(*movimentos)
+
+	qtd = np.array(quantidades, dtype=np.int64)
+	valor = np.array(valores, dtype=np.int64)
+	tipo = _classificar(movimentacoes)
+	sinal = np.fromiter((-1 if e == 'Debito' else 1 for e in entradas), dtype=np.int64, count=len(entradas))
+
+	# grupos contíguos por ticker (ORDER BY ticker): onde o ticker muda
+	inicios = np.flatnonzero(np.fromiter(map(ne, tickers, (None,) + tickers[:-1]), dtype=bool, count=len(tickers)))
+	ticker_grupo = [tickers[i] for i in inicios.tolist()]
+
+	proventos = np.add.reduceat(np.where(tipo == PROVENTO, valor * sinal, 0), inicios)
+	muda_posicao = (tipo == NEGOCIACAO) | (tipo == EVENTO)
+
+	# posição e custo médio: só as negociações e eventos, em ordem, com inteiros Python
+	indices = np.flatnonzero(muda_posicao)
+	grupo_de = np.searchsorted(inicios, indices, side='right') - 1
+	custo = [0] * len(inicios)
+	posicao = [0] * len(inicios)
+	realizado = [0] * len(inicios)
+	for i, g, q, s, v, t in zip(indices.tolist(), grupo_de.tolist(), qtd[indices].tolist(),
+								sinal[indices].tolist(), valor[indices].tolist(), tipo[indices].tolist()):
+		if t == NEGOCIACAO and not v:
+			# sem 'Valor da Operação': quantidade x preço unitário
+			v = _div_half_up(q * precos_unit[i], UNIDADE_QTY)
+		if s > 0:
+			if t == NEGOCIACAO:
+				custo[g] += v
+			posicao[g] += q
+			continue
+		if t == EVENTO:
+			posicao[g] -= q
+			continue
+		# venda: baixa o custo proporcional à quantidade
+		if posicao[g] > 0:
+			baixado = _div_half_up(custo[g] * min(q, posicao[g]), posicao[g])
+		else:
+			baixado = 0
+		custo[g] -= baixado
+		posicao[g] -= q
+		realizado[g] += v - baixado
+		if posicao[g] <= 0:
+			custo[g] = 0
+
+	# valor de mercado por ativo; a alocação precisa do total antes
+	mercado: List[Optional[int]] = []
+	for g, ticker in enumerate(ticker_grupo):
+		preco = precos.get(ticker)
+		pos = posicao[g]
+		mercado.append(None if preco is None else _div_half_up(pos * to_scaled(preco, MONEY_SCALE), UNIDADE_QTY))
+	total_mercado = sum(m for m in mercado if m and m > 0)
+
+	resultado = []
+	for g, ticker in enumerate(ticker_grupo):
+		pos = posicao[g]
+		if not pos and not realizado[g] and not proventos[g]:
+			continue
+		preco = precos.get(ticker)
+		m = mercado[g]
+		nao_realizado = None if m is None else m - custo[g]
+		resultado.append(PosicaoCarteira(
+			ticker=ticker,
+			quantidade=from_scaled(pos, QTY_SCALE),
+			custo_medio=from_scaled(_div_half_up(custo[g] * UNIDADE_QTY, pos), MONEY_SCALE) if pos > 0 else None,
+			custo_total=from_scaled(custo[g], MONEY_SCALE),
+			preco=from_scaled(to_scaled(preco, MONEY_SCALE), MONEY_SCALE) if preco is not None else None,
+			valor_mercado=from_scaled(m, MONEY_SCALE) if m is not None else None,
+			lucro_nao_realizado=from_scaled(nao_realizado, MONEY_SCALE) if nao_realizado is not None else None,
+			lucro_nao_realizado_pct=_percentual(nao_realizado, custo[g]),
+			lucro_realizado=from_scaled(realizado[g], MONEY_SCALE),
+			proventos=from_scaled(int(proventos[g]), MONEY_SCALE),
+			alocacao_pct=_percentual(m, total_mercado) if m and m > 0 else None,
+		))
+	return resultado
+
+
+def _percentual(parte: Optional[int], todo: int) -> Optional[Decimal]:
+	"""parte / todo em %, com 2 casas (None se não há base)."""
+	if parte is None or todo <= 0:
+		return None
+	return from_scaled(_div_half_up(parte * 10000, todo), 2)
+
+
+def totais(posicoes: Sequence[PosicaoCarteira]) -> Tuple[Decimal, Decimal, Decimal, Decimal, Decimal]:
+	"""(custo total, valor de mercado, lucro não realizado, lucro realizado, proventos)."""
+	custo = sum((p.custo_total for p in posicoes), Decimal(0))
+	mercado = sum((p.valor_mercado for p in posicoes if p.valor_mercado is not None), Decimal(0))
+	nao_realizado = sum((p.lucro_nao_realizado for p in posicoes if p.lucro_nao_realizado is not None), Decimal(0))
+	realizado = sum((p.lucro_realizado for p in posicoes), Decimal(0))
+	proventos = sum((p.proventos for p in posicoes), Decimal(0))
+	return custo, mercado, nao_realizado, realizado, proventos
+
+
+class CarteiraService:
+	"""Avaliação da carteira com os dados importados da B3."""
+
+	def __init__(self, conn=None):
+		conn = conn or get_conn()
+		self.movimentacao_repo = B3MovimentacaoRepo(conn)
+		self.posicao_repo = B3PosicaoRepo(conn)
+
+	def avaliar(self, ate: str | None = None) -> List[PosicaoCarteira]:
+		"""Carteira avaliada com as movimentações até a data `ate` (aaaa-mm-dd; None = todas)."""
+		movimentos = [Movimento(*row) for row in self.movimentacao_repo.listar_para_avaliacao(ate)]
+		return avaliar_movimentos(movimentos, self.posicao_repo.ultimos_precos(ate))
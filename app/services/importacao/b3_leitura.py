@@ -0,0 +1,107 @@
+"""
+Leitura dos relatórios exportados da Área do Investidor B3 (posição e
+movimentação): XLSX, uma ou mais abas, ou CSV com ';' ou ',' em utf-8 ou
+latin1. Gera só as colunas pedidas, por posição (core.xlsx /
+core.csv_projetado), e normaliza células e números no formato da B3.
+"""
+import codecs
+import csv
+import os
+import re
+from datetime import datetime
+from typing import Iterator, List, Sequence, Tuple
+
+from ...core.utils import normalize_b3_decimal, ValidationError
+from ...core.xlsx import iter_xlsx_sheets
+from ...core.csv_projetado import LeitorCsvProjetado
+
+EXTENSOES = ('.xlsx', '.csv')
+
+# '1.500,25', '28.5', '-', '1e-05' (células numéricas do XLSX)
+NUMERO_B3 = re.compile(r'-|[-+]?[\d.,]+(?:[eE][-+]?\d+)?')
+
+
+def listar_arquivos(caminhos: Sequence[str]) -> List[str]:
+	"""Arquivos .xlsx/.csv dos caminhos (pastas são expandidas, em ordem de nome)."""
+	arquivos = []
+	for caminho in caminhos:
+		if os.path.isdir(caminho):
+			arquivos += sorted(
+				os.path.join(caminho, nome) for nome in os.listdir(caminho)
+				if nome.lower().endswith(EXTENSOES) and not nome.startswith('~$')
+			)
+		elif os.path.isfile(caminho):
+			arquivos.append(caminho)
+		else:
+			raise ValidationError(f"Arquivo ou pasta não encontrado: {caminho}")
+	if not arquivos:
+		raise ValidationError("Nenhum arquivo .xlsx/.csv encontrado")
+	return arquivos
+
+
+def iter_linhas(caminho: str, colunas: Sequence[str], opcionais: Sequence[str] = ()) -> Iterator[Tuple[str, int, tuple]]:
+	"""
+	(aba, número da linha, valores de `colunas`) de cada linha não vazia.
+	No XLSX, abas sem as colunas obrigatórias (resumos, totais) são puladas;
+	no CSV a aba é ''.
+	"""
+	if caminho.lower().endswith('.csv'):
+		yield from _linhas_csv(caminho, colunas, opcionais)
+		return
+	for aba, linhas in iter_xlsx_sheets(caminho, colunas, skip_empty=True, optional_columns=opcionais):
+		try:
+			for row_num, valores in enumerate(linhas, start=2):
+				yield aba, row_num, valores
+		except ValidationError:
+			continue
+
+
+def _linhas_csv(caminho: str, colunas: Sequence[str], opcionais: Sequence[str]) -> Iterator[Tuple[str, int, tuple]]:
+	arquivo = os.path.basename(caminho)
+	with open(caminho, 'r', encoding=encoding(caminho), newline='') as f:
+		cabecalho = f.readline()
+		f.seek(0)
+		delimitador = ';' if cabecalho.count(';') >= cabecalho.count(',') else ','
+		leitor = LeitorCsvProjetado(f, colunas, arquivo, opcionais=opcionais,
+									delimiter=delimitador, quoting=csv.QUOTE_MINIMAL)
+		for row_num, valores in enumerate(leitor, start=2):
+			if valores is None:
+				raise ValidationError(f"{arquivo} - linha {row_num}: {leitor.mensagem_linha_incompleta}")
+			if any(valores):
+				yield '', row_num, valores
+
+
+def encoding(caminho: str) -> str:
+	"""utf-8 (com ou sem BOM) se o arquivo inteiro decodifica; senão latin1."""
+	decodificador = codecs.getincrementaldecoder('utf-8')()
+	with open(caminho, 'rb') as f:
+		try:
+			for bloco in iter(lambda: f.read(1 << 16), b''):
+				decodificador.decode(bloco)
+			decodificador.decode(b'', final=True)
+		except UnicodeDecodeError:
+			return 'latin1'
+	return 'utf-8-sig'
+
+
+def texto(valor) -> str:
+	"""Célula -> texto: None vira '', 12345.0 vira '12345', datas viram aaaa-mm-dd."""
+	if valor is None:
+		return ''
+	if isinstance(valor, float) and valor.is_integer():
+		return str(int(valor))
+	if isinstance(valor, datetime):
+		return valor.strftime('%Y-%m-%d')
+	return str(valor).strip()
+
+
+def numero(valor: str, campo: str) -> str:
+	"""normalize_b3_decimal, mas texto que não é número é erro (e não zero)."""
+	if valor and not NUMERO_B3.fullmatch(valor):
+		raise ValidationError(f"{campo} inválido(a): {valor}")
+	return normalize_b3_decimal(valor)
+
+
+def ticker_do_produto(produto: str) -> str:
+	"""'PETR4 - PETROLEO BRASILEIRO S.A.' -> 'PETR4'; Tesouro/renda fixa: o próprio produto."""
+	return produto.split(' - ')[0].strip().upper()
@@ -0,0 +1,185 @@
+"""
+Serviço para importação do extrato de movimentação da B3 (Área do Investidor).
+Menu Importação → 5. [B3] Movimentação
+
+O portal exporta a movimentação por período, e o usuário costuma baixar
+períodos sobrepostos (o ano inteiro de novo, os últimos 12 meses...). Cada
+linha recebe uma impressão digital (sha1) do seu conteúdo normalizado; a
+tabela tem fingerprint UNIQUE e só as impressões novas são gravadas, então
+reimportar anos de histórico só escreve o que mudou.
+
+Duas linhas idênticas no mesmo arquivo são movimentações distintas (dois
+créditos iguais no mesmo dia): o número da ocorrência entra na impressão,
+e a mesma linha repetida em outro arquivo sobreposto gera as mesmas
+impressões.
+"""
+import hashlib
+import os
+import time
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+from ...db.repositories.importacao.b3_movimentacao_repo import B3MovimentacaoRepo
+from ...db.repositories.importacao.import_run_repo import ImportRunRepo
+from ...core.utils import parse_date, ValidationError
+from ...core.decimal_ctx import money_str, qty_str
+from ...core.registros_b3 import MovimentacaoB3
+from ...core.metricas import MetricasImportacao
+from ...core.progresso import Progresso, Callback
+from ...core.perfil_memoria import PerfilMemoria
+from ...core.erros_importacao import ColetorErros
+from .b3_leitura import iter_linhas, listar_arquivos, numero, texto, ticker_do_produto
+
+# Colunas lidas do extrato, na ordem de _normalizar
+COLUNAS = (
+	'Entrada/Saída', 'Data', 'Movimentação', 'Produto', 'Instituição',
+	'Quantidade', 'Preço unitário', 'Valor da Operação',
+)
+OPCIONAIS = ('Instituição', 'Preço unitário', 'Valor da Operação')
+
+# separador dos campos na impressão digital (não aparece nos valores)
+SEPARADOR = '\x1f'
+
+
+class B3MovimentacaoImportService:
+	"""Importa extratos de movimentação da B3 para b3_movimentacao."""
+
+	def __init__(self, progresso: Callback | None = None, perfil_memoria: bool = False):
+		self.repo = B3MovimentacaoRepo()
+		# callback de progresso (ver app.ui.progresso); None = sem progresso
+		self.progresso = progresso
+		# snapshots do tracemalloc por etapa (lento; só para diagnóstico)
+		self.perfil_memoria = perfil_memoria
+		self.run_repo = ImportRunRepo(self.repo.conn)
+		# métricas e erros da última execução
+		self.metricas: MetricasImportacao | None = None
+		self.erros: ColetorErros | None = None
+
+	def importar(self, caminhos: Sequence[str]) -> List[list]:
+		"""
+		Importa extratos de movimentação (ou pastas com eles).
+
+		Returns:
+			Resumo por arquivo: [arquivo, total, inseridos, atualizados, ignorados, erros, segundos, linhas/s]
+			(atualizados é sempre 0: movimentações não mudam, só aparecem)
+
+		Raises:
+			ValidationError: nenhum arquivo encontrado
+		"""
+		arquivos = listar_arquivos(caminhos)
+
+		ano = datetime.now().year
+		metricas = self.metricas = MetricasImportacao('b3_movimentacao', ano)
+		if self.perfil_memoria:
+			metricas.perfil = PerfilMemoria()
+		coletor = self.erros = ColetorErros('b3_movimentacao', ano)
+
+		resumo = []
+		erro = None
+		try:
+			for caminho in arquivos:
+				inicio = time.perf_counter()
+				total, inseridos, erros = self._importar_arquivo(caminho)
+				segundos = time.perf_counter() - inicio
+				linhas_s = round((total + erros) / segundos) if segundos else 0
+				resumo.append([os.path.basename(caminho), total, inseridos, 0, total - inseridos, erros, round(segundos, 2), linhas_s])
+
+				metricas.linhas += total + erros
+				metricas.inseridos += inseridos
+				metricas.ignorados += total - inseridos
+				metricas.erros += erros
+			return resumo
+		except Exception as e:
+			erro = e
+			self.repo.conn.rollback()
+			raise
+		finally:
+			coletor.fechar()
+			metricas.finalizar(erro)
+			self.run_repo.insert(**metricas.como_dict())
+			self.repo.conn.commit()
+
+	def periodo(self) -> Optional[Tuple[str, str, int]]:
+		"""(primeira data, última data, total de movimentações) gravadas, ou None se não houver."""
+		return self.repo.periodo()
+
+	def _importar_arquivo(self, caminho: str) -> Tuple[int, int, int]:
+		"""Grava as movimentações novas do arquivo. Retorna (total, inseridos, erros)."""
+		metricas = self.metricas
+		arquivo = os.path.basename(caminho)
+		contagem = {'linhas': 0, 'erros': 0}
+
+		# leitura e gravação acontecem juntas (o gerador é consumido pelo executemany):
+		# o tempo conta como leitura, como na posição
+		inicio = time.perf_counter()
+		leitura = Progresso(self.progresso, 'parse', f'Lendo {arquivo}', unidade='movimentações')
+		inseridos = self.repo.inserir_novos(self._registros(caminho, contagem, leitura))
+		leitura.concluir()
+		metricas.somar('parse', inicio)
+		metricas.marcar_memoria(f'parse {arquivo}')
+
+		inicio = time.perf_counter()
+		self.repo.conn.commit()
+		metricas.somar('commit', inicio)
+		return contagem['linhas'], inseridos, contagem['erros']
+
+	def _registros(self, caminho: str, contagem: Dict[str, int], leitura: Progresso) -> Iterator[MovimentacaoB3]:
+		"""Gera os registros válidos do arquivo; linhas inválidas vão para o coletor de erros."""
+		arquivo = os.path.basename(caminho)
+		# ocorrências de cada conteúdo no arquivo (linhas idênticas legítimas)
+		ocorrencias: Dict[str, int] = {}
+		for _, row_num, valores in iter_linhas(caminho, COLUNAS, OPCIONAIS):
+			leitura.avancar()
+			try:
+				campos = self._normalizar(valores)
+			except Exception as e:
+				contagem['erros'] += 1
+				self.erros.registrar_excecao(e, arquivo, row_num, ';'.join('' if v is None else str(v) for v in valores))
+				continue
+			if campos is None:
+				continue
+
+			conteudo = SEPARADOR.join(campos)
+			ocorrencia = ocorrencias.get(conteudo, 0)
+			ocorrencias[conteudo] = ocorrencia + 1
+			fingerprint = hashlib.sha1(f'{conteudo}{SEPARADOR}{ocorrencia}'.encode('utf-8')).hexdigest()
+
+			data, entrada_saida, movimentacao, produto, instituicao, quantidade, preco, valor = campos
+			contagem['linhas'] += 1
+			yield MovimentacaoB3(
+				fingerprint=fingerprint,
+				data=data,
+				entrada_saida=entrada_saida,
+				movimentacao=movimentacao,
+				ticker=ticker_do_produto(produto),
+				produto=produto,
+				instituicao=instituicao,
+				quantidade=quantidade,
+				preco_unitario=preco,
+				valor_operacao=valor,
+				arquivo=arquivo,
+			)
+
+	def _normalizar(self, valores: tuple) -> Tuple[str, ...] | None:
+		"""
+		Campos da movimentação já normalizados (a impressão digital não pode
+		depender de XLSX vs CSV, '1.000,5' vs 1000.5...), ou None para linhas
+		de rodapé.
+		"""
+		entrada_saida, data, movimentacao, produto, instituicao, quantidade, preco, valor = (texto(v) for v in valores)
+		if not produto:
+			return None
+		if not data:
+			raise ValidationError("Data da movimentação vazia")
+		if not movimentacao:
+			raise ValidationError("Tipo de movimentação vazio")
+		return (
+			parse_date(data),
+			entrada_saida,
+			movimentacao,
+			produto,
+			instituicao,
+			qty_str(numero(quantidade, 'Quantidade')),
+			money_str(numero(preco, 'Preço unitário')),
+			money_str(numero(valor, 'Valor da operação')),
+		)
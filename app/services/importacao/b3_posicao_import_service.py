@@ -0,0 +1,196 @@
+"""
+Serviço para importação da posição consolidada da B3 (Área do Investidor).
+Menu Importação → 4. [B3] Posição consolidada
+
+Aceita o relatório de posição exportado pelo portal (XLSX, uma aba por
+categoria: Acoes, BDR, ETF, Fundo de Investimento, Tesouro Direto...) ou
+a mesma tabela em CSV, um arquivo por data. Vários arquivos (ou uma pasta
+com anos de posições mensais) são importados de uma vez.
+
+Cada arquivo é lido em streaming (core.xlsx / core.csv_projetado), vai
+para uma tabela temporária e entra em b3_posicao com um upsert em
+conjunto (ver B3PosicaoRepo), sem um comando SQL por linha. O arquivo é a
+posição completa da data: o que já estava gravado na data e não veio nele
+é apagado (vários arquivos da mesma data na execução se somam).
+"""
+import os
+import re
+import time
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+from ...db.repositories.importacao.b3_posicao_repo import B3PosicaoRepo
+from ...db.repositories.importacao.import_run_repo import ImportRunRepo
+from ...core.utils import parse_date, get_utc_timestamp, ValidationError
+from ...core.decimal_ctx import money_str, qty_str
+from ...core.registros_b3 import PosicaoB3
+from ...core.metricas import MetricasImportacao
+from ...core.progresso import Progresso, Callback
+from ...core.perfil_memoria import PerfilMemoria
+from ...core.erros_importacao import ColetorErros
+from .b3_leitura import iter_linhas, listar_arquivos, numero, texto, ticker_do_produto
+
+# Colunas lidas do relatório, na ordem de _montar_registro
+COLUNAS = (
+	'Produto', 'Conta', 'Código de Negociação', 'Instituição', 'Código ISIN / Distribuição',
+	'Quantidade', 'Preço de Fechamento', 'Valor Atualizado',
+)
+OBRIGATORIAS = ('Produto', 'Quantidade')
+OPCIONAIS = tuple(c for c in COLUNAS if c not in OBRIGATORIAS)
+
+# posicao-2024-01-31-10-15-00.xlsx -> 2024-01-31
+DATA_NO_NOME = re.compile(r'(\d{4})-(\d{2})-(\d{2})')
+
+
+class B3PosicaoImportService:
+	"""Importa relatórios de posição consolidada da B3 para b3_posicao."""
+
+	def __init__(self, progresso: Callback | None = None, perfil_memoria: bool = False):
+		self.repo = B3PosicaoRepo()
+		# callback de progresso (ver app.ui.progresso); None = sem progresso
+		self.progresso = progresso
+		# snapshots do tracemalloc por etapa (lento; só para diagnóstico)
+		self.perfil_memoria = perfil_memoria
+		self.run_repo = ImportRunRepo(self.repo.conn)
+		# métricas e erros da última execução
+		self.metricas: MetricasImportacao | None = None
+		self.erros: ColetorErros | None = None
+
+	def importar(self, caminhos: Sequence[str], data_referencia: str | None = None) -> List[list]:
+		"""
+		Importa arquivos de posição (ou pastas com eles).
+
+		Args:
+			caminhos: arquivos .xlsx/.csv ou pastas
+			data_referencia: data da posição (dd/mm/aaaa ou aaaa-mm-dd); se
+				omitida, vem do nome de cada arquivo (posicao-aaaa-mm-dd-...)
+
+		Returns:
+			Resumo por arquivo: [arquivo, total, inseridos, atualizados, ignorados, removidos, erros, segundos, linhas/s]
+			(removidos: posições já gravadas da data que não estão no arquivo)
+
+		Raises:
+			ValidationError: nenhum arquivo encontrado ou data indefinida
+		"""
+		arquivos = listar_arquivos(caminhos)
+		data_fixa = parse_date(data_referencia.strip()) if data_referencia else None
+		datas = {arquivo: data_fixa or self._data_do_nome(arquivo) for arquivo in arquivos}
+
+		# ano da execução no histórico: o da posição mais recente
+		ano = max(int(data[:4]) for data in datas.values())
+		metricas = self.metricas = MetricasImportacao('b3_posicao', ano)
+		if self.perfil_memoria:
+			metricas.perfil = PerfilMemoria()
+		coletor = self.erros = ColetorErros('b3_posicao', ano)
+
+		resumo = []
+		erro = None
+		try:
+			self.repo.preparar_staging()
+			aplicadas = set()
+			for caminho in arquivos:
+				inicio = time.perf_counter()
+				substituir = datas[caminho] not in aplicadas
+				aplicadas.add(datas[caminho])
+				total, inseridos, atualizados, ignorados, removidos, erros = self._importar_arquivo(
+					caminho, datas[caminho], substituir)
+				segundos = time.perf_counter() - inicio
+				linhas_s = round((total + erros) / segundos) if segundos else 0
+				resumo.append([os.path.basename(caminho), total, inseridos, atualizados, ignorados, removidos, erros,
+							   round(segundos, 2), linhas_s])
+
+				metricas.linhas += total + erros
+				metricas.inseridos += inseridos + atualizados
+				metricas.ignorados += ignorados
+				metricas.erros += erros
+			return resumo
+		except Exception as e:
+			erro = e
+			self.repo.conn.rollback()
+			raise
+		finally:
+			coletor.fechar()
+			metricas.finalizar(erro)
+			self.run_repo.insert(**metricas.como_dict())
+			self.repo.conn.commit()
+
+	def datas_importadas(self) -> List[str]:
+		"""Datas de referência já importadas (mais recente primeiro)."""
+		return self.repo.listar_datas()
+
+	def _data_do_nome(self, caminho: str) -> str:
+		encontrada = DATA_NO_NOME.search(os.path.basename(caminho))
+		if not encontrada:
+			raise ValidationError(
+				f"Data da posição não encontrada no nome de {os.path.basename(caminho)}: "
+				"informe a data de referência"
+			)
+		return '-'.join(encontrada.groups())
+
+	def _importar_arquivo(self, caminho: str, data_referencia: str,
+						  substituir: bool = True) -> Tuple[int, int, int, int, int, int]:
+		"""
+		Lê um arquivo para a tabela temporária e aplica o upsert (com
+		substituir, a posição da data passa a ser a do arquivo).
+		Retorna (total, ins, atu, ign, rem, erros).
+		"""
+		metricas = self.metricas
+		arquivo = os.path.basename(caminho)
+		contagem = {'linhas': 0, 'erros': 0}
+
+		inicio = time.perf_counter()
+		leitura = Progresso(self.progresso, 'parse', f'Lendo {arquivo}', unidade='posições')
+		# leitura e carga na temporária acontecem juntas (o gerador é consumido pelo executemany)
+		self.repo.carregar_staging(self._registros(caminho, data_referencia, contagem, leitura))
+		leitura.concluir()
+		metricas.somar('parse', inicio)
+		metricas.marcar_memoria(f'parse {arquivo}')
+
+		inicio = time.perf_counter()
+		inseridos, atualizados, ignorados, removidos = self.repo.aplicar_staging(substituir)
+		metricas.somar('escrita', inicio)
+
+		inicio = time.perf_counter()
+		self.repo.conn.commit()
+		metricas.somar('commit', inicio)
+		metricas.marcar_memoria(f'escrita {arquivo}')
+		return contagem['linhas'], inseridos, atualizados, ignorados, removidos, contagem['erros']
+
+	def _registros(self, caminho: str, data_referencia: str, contagem: Dict[str, int],
+				   leitura: Progresso) -> Iterator[PosicaoB3]:
+		"""Gera os registros válidos do arquivo; linhas inválidas vão para o coletor de erros."""
+		arquivo = os.path.basename(caminho)
+		atualizado_em = get_utc_timestamp()
+		for categoria, row_num, valores in iter_linhas(caminho, COLUNAS, OPCIONAIS):
+			leitura.avancar()
+			try:
+				registro = self._montar_registro(valores, data_referencia, categoria, arquivo, atualizado_em)
+			except Exception as e:
+				contagem['erros'] += 1
+				self.erros.registrar_excecao(e, arquivo, row_num, ';'.join('' if v is None else str(v) for v in valores))
+				continue
+			if registro is not None:
+				contagem['linhas'] += 1
+				yield registro
+
+	def _montar_registro(self, valores: tuple, data_referencia: str, categoria: str,
+						 arquivo: str, atualizado_em: str) -> Optional[PosicaoB3]:
+		"""PosicaoB3 normalizada, ou None para linhas de total/rodapé."""
+		produto, conta, codigo, instituicao, isin, quantidade, preco, valor = (texto(v) for v in valores)
+		if not produto or produto.lower().startswith('total'):
+			return None
+
+		return PosicaoB3(
+			data_referencia=data_referencia,
+			ticker=codigo.upper() or ticker_do_produto(produto),
+			conta=conta,
+			categoria=categoria,
+			produto=produto,
+			instituicao=instituicao,
+			isin=isin,
+			quantidade=qty_str(numero(quantidade, 'Quantidade')),
+			preco_fechamento=money_str(numero(preco, 'Preço de fechamento')),
+			valor_atualizado=money_str(numero(valor, 'Valor atualizado')),
+			arquivo=arquivo,
+			atualizado_em=atualizado_em,
+		)
+
@@ -0,0 +1,100 @@
+"""
+Specs dos membros dos ZIPs de ITR e DFP da CVM (mesmo layout nos dois).
+
+Ambos gravam nas tabelas cia_aberta_itr_*; só o prefixo dos arquivos
+(itr_/dfp_) e a pasta no portal mudam (ver ItrImportService/DfpImportService).
+"""
+from ...core.decimal_ctx import money_str, qty_str
+from ...core.registros_cvm import DocumentoItr, ComposicaoCapital, ContaDemonstrativo
+from .engine import (
+	Campo, TabelaSpec, cnpj, data, flag_sim, inteiro, inteiro_texto, obrigatorio, texto, texto_repetido,
+)
+
+# Só a última versão de cada exercício é gravada (a anterior vem no arquivo seguinte)
+SOMENTE_ULTIMO = ('ORDEM_EXERC', 'ÚLTIMO')
+
+CHAVE_CONTAS = ('cnpj', 'data_referencia', 'versao', 'grupo', 'codigo_conta')
+
+razao_social = obrigatorio("Razão social vazia")
+
+
+def grupo_dfp(valor: str) -> str:
+	"""'DF Consolidado - Balanço Patrimonial Ativo' -> 'DF Consolidado'"""
+	return texto_repetido(valor.split('-')[0])
+
+
+def _campos_contas(coluna_inicio: str) -> tuple:
+	return (
+		Campo('CNPJ_CIA', cnpj),
+		Campo('DT_REFER', data),
+		Campo('VERSAO', inteiro),
+		Campo('DENOM_CIA', razao_social),
+		Campo('CD_CVM', texto_repetido),
+		Campo('GRUPO_DFP', grupo_dfp),
+		Campo('MOEDA', texto_repetido),
+		Campo('ESCALA_MOEDA', texto_repetido),
+		Campo(coluna_inicio, data),
+		Campo('DT_FIM_EXERC', data),
+		Campo('CD_CONTA', texto_repetido),
+		Campo('DS_CONTA', texto_repetido),
+		Campo('VL_CONTA', money_str),
+		Campo('ST_CONTA_FIXA', flag_sim),
+	)
+
+
+# Balanços são posições: não têm DT_INI_EXERC, o início é a própria data fim
+CAMPOS_BALANCO = _campos_contas('DT_FIM_EXERC')
+CAMPOS_DRE = _campos_contas('DT_INI_EXERC')
+
+SPECS = (
+	TabelaSpec(
+		membro='bpa', tabela='cia_aberta_itr_bpa', registro=ContaDemonstrativo,
+		campos=CAMPOS_BALANCO, chave=CHAVE_CONTAS, filtro=SOMENTE_ULTIMO, hierarquia=True,
+		titulo='Balanço Patrimonial Ativo', rotulo_erro='Balanço Patrimonial documento',
+	),
+	TabelaSpec(
+		membro='bpp', tabela='cia_aberta_itr_bpp', registro=ContaDemonstrativo,
+		campos=CAMPOS_BALANCO, chave=CHAVE_CONTAS, filtro=SOMENTE_ULTIMO, hierarquia=True,
+		titulo='Balanço Patrimonial Passivo', rotulo_erro='Balanço Patrimonial documento',
+	),
+	TabelaSpec(
+		membro='dre', tabela='cia_aberta_itr_dre', registro=ContaDemonstrativo,
+		campos=CAMPOS_DRE, chave=CHAVE_CONTAS, filtro=SOMENTE_ULTIMO, hierarquia=True,
+		titulo='Demonstração do Resultado', rotulo_erro='Demonstrativo de Resultado',
+	),
+	TabelaSpec(
+		membro='composicao_capital', tabela='cia_aberta_itr_composicao_capital', registro=ComposicaoCapital,
+		campos=(
+			Campo('CNPJ_CIA', cnpj),
+			Campo('DT_REFER', data),
+			Campo('VERSAO', inteiro),
+			Campo('DENOM_CIA', razao_social),
+			Campo('QT_ACAO_ORDIN_CAP_INTEGR', qty_str),
+			Campo('QT_ACAO_PREF_CAP_INTEGR', qty_str),
+			Campo('QT_ACAO_TOTAL_CAP_INTEGR', qty_str),
+			Campo('QT_ACAO_ORDIN_TESOURO', qty_str),
+			Campo('QT_ACAO_PREF_TESOURO', qty_str),
+			Campo('QT_ACAO_TOTAL_TESOURO', qty_str),
+		),
+		chave=('cnpj', 'data_referencia', 'versao'),
+		titulo='Composição de Capital', rotulo_erro='Composição de Capital documento',
+	),
+	# controle: itr_cia_aberta_{ano}.csv (um documento por linha)
+	TabelaSpec(
+		membro='{ano}', tabela='cia_aberta_itr_controle', registro=DocumentoItr,
+		campos=(
+			Campo('CNPJ_CIA', cnpj),
+			Campo('DT_REFER', data),
+			Campo('VERSAO', inteiro),
+			Campo('DENOM_CIA', razao_social),
+			Campo('CD_CVM', texto_repetido),
+			Campo('CATEG_DOC', texto_repetido),
+			Campo('ID_DOC', inteiro_texto),
+			Campo('DT_RECEB', data),
+			Campo('LINK_DOC', texto),
+		),
+		chave=('cnpj', 'data_referencia', 'versao', 'codigo_documento'),
+		consolidar_por=('codigo_documento',),
+		titulo='Documentos', rotulo_erro='documento', unidade='documentos',
+	),
+)
@@ -0,0 +1,421 @@
+"""
+Motor de importação dos arquivos ZIP de dados abertos da CVM.
+
+Cada membro do ZIP (um CSV) é descrito por um TabelaSpec: prefixo do nome
+do arquivo, tabela de destino, registro (NamedTuple de core.registros_cvm),
+colunas do CSV com seus conversores/validadores, filtro de linha e chave
+de deduplicação. O motor faz o resto para todos os membros do mesmo jeito:
+download e extração, leitura projetada (core.csv_projetado: só as colunas
+do spec, por posição), descarte das chaves já gravadas, gravação em
+lotes, métricas, progresso e erros.
+
+Os serviços (ITR, DFP) só declaram TIPO, PASTA e SPECS.
+"""
+import os
+import shutil
+import sys
+import tempfile
+import time
+import zipfile
+from array import array
+from datetime import datetime
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+import requests
+
+from ...db.repositories.importacao.cia_aberta_itr_repo import CiaAbertaItrRepo
+from ...db.repositories.importacao.import_run_repo import ImportRunRepo
+from ...db.repositories.fundamentos.plano_contas_repo import PlanoContasRepo
+from ...core.utils import normalize_cnpj, valid_cnpj, parse_date, parse_int, get_utc_timestamp, ValidationError, CVM_DADOS_URL
+from ...core.chaves import ChaveSet
+from ...core.csv_projetado import LeitorCsvProjetado, itemgetter_tupla
+from ...core.metricas import MetricasImportacao
+from ...core.progresso import Progresso, Callback
+from ...core.perfil_memoria import PerfilMemoria
+from ...core.erros_importacao import ColetorErros, LinhasLidas, FALHA_INSERT
+
+# Registros por executemany (cada lote roda num SAVEPOINT)
+TAMANHO_LOTE = 1000
+
+intern = sys.intern
+
+Conversor = Callable[[str], Any]
+
+
+#* Conversores/validadores de coluna (recebem o texto cru do CSV)
+
+def texto(valor: str) -> str:
+	return valor.strip()
+
+
+def texto_repetido(valor: str) -> str:
+	"""Texto que se repete em muitas linhas (grupo, moeda, conta...): internado."""
+	return intern(valor.strip())
+
+
+def cnpj(valor: str) -> str:
+	"""CNPJ obrigatório e válido, normalizado (só dígitos)."""
+	cnpj_raw = valor.strip()
+	if not cnpj_raw:
+		raise ValidationError("CNPJ vazio")
+	normalizado = normalize_cnpj(cnpj_raw)
+	if not valid_cnpj(normalizado):
+		raise ValidationError(f"CNPJ inválido: {cnpj_raw}")
+	return intern(normalizado)
+
+
+def obrigatorio(mensagem: str) -> Conversor:
+	"""Texto obrigatório: vazio levanta ValidationError(mensagem)."""
+	def converter(valor: str) -> str:
+		valor = valor.strip()
+		if not valor:
+			raise ValidationError(mensagem)
+		return intern(valor)
+	return converter
+
+
+def data(valor: str) -> str:
+	return parse_date(valor.strip())
+
+
+def inteiro(valor: str) -> Optional[int]:
+	return parse_int(valor)
+
+
+def inteiro_texto(valor: str) -> Optional[str]:
+	"""Inteiro gravado em coluna TEXT (ex.: ID_DOC): '0012' -> '12'."""
+	numero = parse_int(valor)
+	return None if numero is None else str(numero)
+
+
+def flag_sim(valor: str) -> int:
+	"""'S' -> 1, qualquer outra coisa -> 0."""
+	return 1 if valor.strip() == 'S' else 0
+
+
+class Campo(NamedTuple):
+	coluna: str             # coluna do CSV
+	conversor: Conversor    # texto cru -> valor do registro (pode levantar ValidationError)
+
+
+class TabelaSpec(NamedTuple):
+	membro: str                         # nome do CSV após '{tipo}_cia_aberta_' ('{ano}' é substituído)
+	tabela: str
+	registro: type                      # NamedTuple; criado_em, se existir, é o último campo
+	campos: Tuple[Campo, ...]           # na ordem dos campos do registro (sem criado_em)
+	chave: Tuple[str, ...]              # campos da UNIQUE da tabela (descarte do que já existe)
+	titulo: str                         # "Balanço Patrimonial" (mensagens e progresso)
+	rotulo_erro: str                    # "Balanço Patrimonial documento" (erros de insert)
+	unidade: str = 'linhas'
+	filtro: Optional[Tuple[str, str]] = None   # (coluna, valor): só grava as linhas com esse valor
+	consolidar_por: Tuple[str, ...] = ()       # se informado, a última linha com esses campos prevalece
+	hierarquia: bool = False                   # registra os códigos de conta novos em plano_contas
+
+	def colunas(self) -> Tuple[str, ...]:
+		"""Colunas lidas do CSV: as dos campos e, por último, a do filtro."""
+		colunas = tuple(campo.coluna for campo in self.campos)
+		return colunas + (self.filtro[0],) if self.filtro else colunas
+
+	def seletor(self, nomes: Tuple[str, ...]) -> Callable[[tuple], tuple]:
+		"""Extrai do registro os campos informados, como tupla."""
+		return itemgetter_tupla(self.registro._fields.index(nome) for nome in nomes)
+
+
+class CvmZipImportService:
+	"""
+	Importação de um ZIP anual da CVM ({PASTA}/DADOS/{tipo}_cia_aberta_{ano}.zip)
+	guiada por SPECS. Subclasses definem TIPO, PASTA e SPECS.
+	"""
+
+	TIPO = ''
+	PASTA = ''
+	SPECS: Tuple[TabelaSpec, ...] = ()
+
+	def __init__(self, progresso: Callback | None = None, perfil_memoria: bool = False):
+		self.repo = CiaAbertaItrRepo()
+		# callback de progresso (ver app.ui.progresso); None = sem progresso
+		self.progresso = progresso
+		# snapshots do tracemalloc por etapa (lento; só para diagnóstico)
+		self.perfil_memoria = perfil_memoria
+		self.run_repo = ImportRunRepo(self.repo.conn)
+		# métricas da última execução de cada ano
+		self.metricas: Dict[int, MetricasImportacao] = {}
+		# erros (contagem, amostra e arquivo de rejeitados) de cada ano
+		self.erros: Dict[int, ColetorErros] = {}
+
+	def importar_por_ano(self, ano: int) -> List[list]:
+		"""
+		Importa os arquivos de um ano específico.
+		Retorna resumo por arquivo (ver importar_arquivos)
+		"""
+		# Download e extração
+		try:
+			csv_paths = self.baixar(ano)
+		except Exception as e:
+			self.registrar_falha(ano, e)
+			raise
+		return self.importar_arquivos(ano, csv_paths)
+
+	def baixar(self, ano: int) -> List[str]:
+		"""
+		Valida o ano, baixa e extrai os CSVs (não acessa o banco).
+		Permite baixar vários anos em paralelo antes de importar.
+		"""
+		metricas = self.metricas[ano] = MetricasImportacao(self.TIPO, ano)
+		if self.perfil_memoria:
+			metricas.perfil = PerfilMemoria()
+
+		# Validar ano
+		current_year = datetime.now().year
+		if ano <= 2010:
+			raise ValidationError("Ano deve ser maior que 2010")
+		if ano > current_year:
+			raise ValidationError(f"Ano deve ser menor ou igual ao ano corrente ({current_year})")
+
+		return self._download_and_extract(ano)
+
+	def importar_arquivos(self, ano: int, csv_paths: List[str]) -> List[list]:
+		"""
+		Processa os CSVs extraídos por baixar() e remove os temporários.
+		Grava a execução no histórico (import_runs), com sucesso ou erro.
+		Retorna resumo: [arquivo, total, inseridos, atualizados, ignorados, erros, segundos, linhas/s]
+		"""
+		metricas = self.metricas.setdefault(ano, MetricasImportacao(self.TIPO, ano))
+		coletor = self.erros[ano] = ColetorErros(self.TIPO, ano)
+		resumo = []
+		erro = None
+		try:
+			for csv_path in csv_paths:
+				file_name = os.path.basename(csv_path).lower()
+				spec = self._spec_do_arquivo(file_name, ano)
+				if spec is None:
+					continue
+
+				inicio = time.perf_counter()
+				total_registros, inseridos, atualizados, ignorados, erros = self._processar_csv(spec, csv_path, ano)
+				segundos = time.perf_counter() - inicio
+				linhas_s = round((total_registros + erros) / segundos) if segundos else 0
+				resumo.append([file_name, total_registros, inseridos, atualizados, ignorados, erros, round(segundos, 2), linhas_s])
+
+				metricas.linhas += total_registros + erros
+				metricas.inseridos += inseridos
+				metricas.ignorados += ignorados
+				metricas.erros += erros
+
+			return resumo
+		except Exception as e:
+			erro = e
+			raise
+		finally:
+			coletor.fechar()
+			self._registrar_execucao(metricas, erro)
+			# Limpeza obrigatória
+			for csv_path in csv_paths:
+				self._cleanup_temp_files(csv_path)
+				break
+
+	def registrar_falha(self, ano: int, erro: Exception) -> None:
+		"""Grava no histórico uma execução que falhou antes do processamento."""
+		self._registrar_execucao(self.metricas.setdefault(ano, MetricasImportacao(self.TIPO, ano)), erro)
+
+	def _registrar_execucao(self, metricas: MetricasImportacao, erro: Exception | None) -> None:
+		metricas.finalizar(erro)
+		self.run_repo.insert(**metricas.como_dict())
+		self.repo.conn.commit()
+
+	def _spec_do_arquivo(self, file_name: str, ano: int) -> Optional[TabelaSpec]:
+		for spec in self.SPECS:
+			if file_name.startswith(f"{self.TIPO}_cia_aberta_{spec.membro.format(ano=ano)}"):
+				return spec
+		return None
+
+	def _download_and_extract(self, ano: int) -> List[str]:
+		"""
+		Baixa ZIP da CVM e extrai todos os arquivos CSV.
+
+		Returns:
+			Lista de paths para os arquivos CSV extraídos
+
+		Raises:
+			ValidationError: Para problemas de download/extração
+		"""
+		nome_zip = f'{self.TIPO}_cia_aberta_{ano}.zip'
+		url = f'{CVM_DADOS_URL}/CIA_ABERTA/DOC/{self.PASTA}/DADOS/{nome_zip}'
+		metricas = self.metricas[ano]
+
+		# Criar diretório temporário
+		temp_dir = tempfile.mkdtemp()
+		zip_path = os.path.join(temp_dir, nome_zip)
+
+		try:
+			# Download do ZIP
+			print(f'Baixando arquivo de {ano}...')
+			with metricas.etapa('download'), Progresso(self.progresso, 'download', f'Baixando {ano}', total=1, unidade='arquivos') as baixado:
+				response = requests.get(url, timeout=30)
+				baixado.avancar(1, len(response.content))
+			metricas.marcar_memoria('download')
+
+			if response.status_code == 404:
+				raise ValidationError(f'Arquivo não encontrado na CVM para o ano {ano}')
+			elif response.status_code != 200:
+				raise ValidationError(f'Erro no download: HTTP {response.status_code}')
+
+			# Salvar ZIP
+			metricas.bytes_baixados = len(response.content)
+			with open(zip_path, 'wb') as f:
+				f.write(response.content)
+
+			# Extrair ZIP
+			print('Extraindo arquivos CSV...')
+			csv_paths = []
+			with metricas.etapa('extracao'), zipfile.ZipFile(zip_path, 'r') as zip_ref:
+				csv_files = [name for name in zip_ref.namelist() if name.lower().endswith('.csv')]
+				if not csv_files:
+					raise ValidationError('Nenhum arquivo CSV encontrado no ZIP')
+				for csv_file in csv_files:
+					zip_ref.extract(csv_file, temp_dir)
+					csv_paths.append(os.path.join(temp_dir, csv_file))
+
+			metricas.marcar_memoria('extracao')
+			return csv_paths
+
+		except Exception as e:
+			# Limpar diretório em caso de erro
+			try:
+				shutil.rmtree(temp_dir)
+			except:
+				pass
+
+			if isinstance(e, ValidationError):
+				raise
+			else:
+				raise ValidationError(f"Erro no download/extração: {str(e)}")
+
+	def _processar_csv(self, spec: TabelaSpec, csv_path: str, ano: int) -> Tuple[int, int, int, int, int]:
+		"""
+		Lê o CSV de um membro, descarta filtrados e já gravados e persiste o
+		restante em lotes. Retorna (total, inseridos, atualizados, ignorados, erros).
+		"""
+		inseridos = atualizados = ignorados = erros = 0
+		coletor = self.erros[ano]
+		metricas = self.metricas[ano]
+		arquivo = os.path.basename(csv_path)
+		rotulo = self.TIPO.upper()
+
+		print(f"Analisando arquivo ({spec.titulo})...")
+
+		inicio = time.perf_counter()
+		existentes = self._carregar_chaves(spec.tabela, ano)
+		criado_em = get_utc_timestamp()
+		com_carimbo = spec.registro._fields[-1] == 'criado_em'
+		novo = spec.registro._make
+		registros = []
+		linhas = array('l')
+		# consolidar_por: chave -> posição em registros/linhas (a última linha prevalece)
+		posicoes = {}
+
+		conversores = tuple(campo.conversor for campo in spec.campos)
+		filtro = spec.filtro[1] if spec.filtro else None
+		chave_de = spec.seletor(spec.chave)
+		consolidar = spec.seletor(spec.consolidar_por) if spec.consolidar_por else None
+
+		with open(csv_path, 'r', encoding='latin1') as f, Progresso(self.progresso, 'parse', f'Lendo {arquivo}') as leitura:
+			fonte = LinhasLidas(f)
+			# colunas ausentes abortam o arquivo aqui, antes da primeira linha
+			leitor = LeitorCsvProjetado(fonte, spec.colunas(), arquivo)
+			leitura.avancar(1, len(fonte.ultima))
+
+			for row_num, valores in enumerate(leitor, start=2):
+				leitura.avancar(1, len(fonte.ultima))
+				try:
+					if valores is None:
+						raise ValidationError(leitor.mensagem_linha_incompleta)
+					# filtro é a última coluna projetada
+					if filtro is not None and valores[-1].strip() != filtro:
+						continue
+
+					campos = [converter(valor) for converter, valor in zip(conversores, valores)]
+					if com_carimbo:
+						campos.append(criado_em)
+					registro = novo(campos)
+
+					# Já gravado (no banco ou antes neste arquivo): não envia ao banco
+					chave = chave_de(registro)
+					if chave in existentes:
+						ignorados += 1
+						continue
+
+					if consolidar is not None:
+						consolidado = consolidar(registro)
+						posicao = posicoes.get(consolidado)
+						if posicao is not None:
+							registros[posicao] = registro
+							linhas[posicao] = row_num
+							continue
+						posicoes[consolidado] = len(registros)
+					else:
+						existentes.add(chave)
+
+					registros.append(registro)
+					linhas.append(row_num)
+
+				except Exception as e:
+					erros += 1
+					coletor.registrar_excecao(e, arquivo, row_num, fonte.ultima)
+
+		metricas.somar('parse', inicio)
+		metricas.marcar_memoria(f'parse {arquivo}')
+
+		# Processamento das linhas consolidadas
+		total_registros = len(registros) + ignorados
+		print(f"Processando {len(registros)} {spec.titulo} {rotulo}s...")
+
+		inicio = time.perf_counter()
+		with Progresso(self.progresso, 'escrita', f"Importando {spec.titulo}", total=len(registros), unidade=spec.unidade) as pbar:
+			inseridos, falhas = self._gravar_lotes(spec.tabela, registros, linhas, coletor, arquivo, pbar, f"{rotulo} - {spec.rotulo_erro}")
+		ignorados += len(registros) - inseridos - falhas
+		erros += falhas
+		if spec.hierarquia and inseridos:
+			PlanoContasRepo(self.repo.conn).registrar_periodo(spec.tabela, ano)
+		metricas.somar('escrita', inicio)
+
+		inicio = time.perf_counter()
+		self.repo.conn.commit()
+		metricas.somar('commit', inicio)
+		metricas.marcar_memoria(f'escrita {arquivo}')
+		return total_registros, inseridos, atualizados, ignorados, erros
+
+	def _gravar_lotes(self, table_name: str, registros: list, linhas: array, coletor: ColetorErros,
+					  arquivo: str, pbar: Progresso, rotulo_erro: str) -> Tuple[int, int]:
+		"""
+		Grava os registros em lotes de TAMANHO_LOTE. Se um lote falhar, ele é
+		refeito linha a linha para registrar só as linhas problemáticas.
+		Retorna (inseridos, erros).
+		"""
+		inseridos = erros = 0
+		for i in range(0, len(registros), TAMANHO_LOTE):
+			lote = registros[i:i + TAMANHO_LOTE]
+			try:
+				inseridos += self.repo.inserir_lote(table_name, lote)
+			except Exception:
+				for registro, row_num in zip(lote, linhas[i:i + TAMANHO_LOTE]):
+					try:
+						inseridos += self.repo.inserir_lote(table_name, (registro,))
+					except Exception as e:
+						erros += 1
+						coletor.registrar(FALHA_INSERT, arquivo, row_num, f"{rotulo_erro} {row_num}: Erro no insert - {str(e)}", ';'.join(map(str, registro)))
+			pbar.avancar(len(lote))
+		return inseridos, erros
+
+	def _carregar_chaves(self, table_name: str, ano: int) -> ChaveSet:
+		"""Carrega as chaves únicas já gravadas na tabela para o ano."""
+		return ChaveSet(self.repo.iter_chaves_existentes(table_name, ano))
+
+	def _cleanup_temp_files(self, csv_path: str):
+		"""Remove arquivos temporários."""
+		try:
+			temp_dir = os.path.dirname(csv_path)
+			if temp_dir and os.path.exists(temp_dir):
+				shutil.rmtree(temp_dir)
+		except Exception:
+			# Ignorar erros de limpeza
+			pass
@@ -3,23 +3,46 @@ Serviço para importação de dados do Formulário Cadastral (FCA) da CVM.
 Segue as regras de negócio definidas no EPIC.
 """
 import os
-import csv
 import zipfile
 import requests
 import tempfile
 import shutil
+import time
 from datetime import datetime
 from typing import Tuple, Dict, List, Any
-from tqdm import tqdm
 from ...db.repositories.importacao.cia_aberta_fca_repo import CiaAbertaFcaRepo
-from ...core.utils import normalize_cnpj, valid_cnpj,parse_date,parse_int,validate_url,get_utc_timestamp,parse_url, ValidationError
+from ...db.repositories.importacao.import_run_repo import ImportRunRepo
+from ...core.utils import normalize_cnpj, valid_cnpj,parse_date,parse_int,validate_url,get_utc_timestamp,parse_url, ValidationError, CVM_DADOS_URL
+from ...core.metricas import MetricasImportacao
+from ...core.progresso import Progresso, Callback
+from ...core.perfil_memoria import PerfilMemoria
+from ...core.erros_importacao import ColetorErros, LinhasLidas, FALHA_INSERT
+from ...core.csv_projetado import LeitorCsvProjetado
+
+# Colunas do fca_cia_aberta_geral_{ano}.csv usadas, na ordem de _extract_and_validate_row
+COLUNAS_FCA = (
+	'CNPJ_Companhia', 'Data_Referencia', 'ID_Documento', 'Nome_Empresarial', 'Data_Constituicao',
+	'Codigo_CVM', 'Data_Registro_CVM', 'Categoria_Registro_CVM', 'Situacao_Registro_CVM', 'Pais_Origem',
+	'Pais_Custodia_Valores_Mobiliarios', 'Setor_Atividade', 'Descricao_Atividade', 'Situacao_Emissor',
+	'Especie_Controle_Acionario', 'Dia_Encerramento_Exercicio_Social', 'Mes_Encerramento_Exercicio_Social',
+	'Pagina_Web',
+)
 
 
 class FcaImportService:
 	"""Serviço de importação de dados FCA da CVM."""
 	
-	def __init__(self):
+	def __init__(self, progresso: Callback | None = None, perfil_memoria: bool = False):
 		self.repo = CiaAbertaFcaRepo()
+		# callback de progresso (ver app.ui.progresso); None = sem progresso
+		self.progresso = progresso
+		# snapshots do tracemalloc por etapa (lento; só para diagnóstico)
+		self.perfil_memoria = perfil_memoria
+		self.run_repo = ImportRunRepo(self.repo.conn)
+		# métricas da última execução de cada ano
+		self.metricas: Dict[int, MetricasImportacao] = {}
+		# erros (contagem, amostra e arquivo de rejeitados) de cada ano
+		self.erros: Dict[int, ColetorErros] = {}
 	
 	def importar_fca_por_ano(self, ano: int) -> Tuple[int, int, int, int, List[str]]:
 		"""
@@ -34,21 +57,66 @@ class FcaImportService:
 		Raises:
 			ValidationError: Para ano inválido ou problemas de validação
 		"""
+		# Download e extração
+		try:
+			csv_path = self.baixar(ano)
+		except Exception as e:
+			self.registrar_falha(ano, e)
+			raise
+		return self.importar_arquivo(ano, csv_path)
+
+	def baixar(self, ano: int) -> str:
+		"""
+		Valida o ano, baixa e extrai o CSV (não acessa o banco).
+		Permite baixar vários anos em paralelo antes de importar.
+		"""
+		metricas = self.metricas[ano] = MetricasImportacao('fca', ano)
+		if self.perfil_memoria:
+			metricas.perfil = PerfilMemoria()
+
 		# Validar ano
 		current_year = datetime.now().year
 		if ano <= 2010:
 			raise ValidationError("Ano deve ser maior que 2010")
 		if ano > current_year:
 			raise ValidationError(f"Ano deve ser menor ou igual ao ano corrente ({current_year})")
-		
-		# Download e extração
-		csv_path = self._download_and_extract(ano)
-		
+
+		return self._download_and_extract(ano)
+
+	def importar_arquivo(self, ano: int, csv_path: str) -> Tuple[int, int, int, int, List[str]]:
+		"""
+		Processa o CSV extraído por baixar() e remove os temporários.
+		Grava a execução no histórico (import_runs), com sucesso ou erro.
+		Retorna (inseridos, atualizados, ignorados, erros, lista_erros), onde
+		lista_erros é a amostra das últimas mensagens (ver self.erros[ano]).
+		"""
+		metricas = self.metricas.setdefault(ano, MetricasImportacao('fca', ano))
+		coletor = self.erros[ano] = ColetorErros('fca', ano)
+		erro = None
 		try:
-			return self._processar_csv(csv_path, ano)
+			inseridos, atualizados, ignorados, erros, lista_erros = self._processar_csv(csv_path, ano)
+			metricas.linhas = inseridos + atualizados + ignorados + erros
+			metricas.inseridos = inseridos + atualizados
+			metricas.ignorados = ignorados
+			metricas.erros = erros
+			return inseridos, atualizados, ignorados, erros, lista_erros
+		except Exception as e:
+			erro = e
+			raise
 		finally:
+			coletor.fechar()
+			self._registrar_execucao(metricas, erro)
 			# Limpeza obrigatória
 			self._cleanup_temp_files(csv_path)
+
+	def registrar_falha(self, ano: int, erro: Exception) -> None:
+		"""Grava no histórico uma execução que falhou antes do processamento."""
+		self._registrar_execucao(self.metricas.setdefault(ano, MetricasImportacao('fca', ano)), erro)
+
+	def _registrar_execucao(self, metricas: MetricasImportacao, erro: Exception | None) -> None:
+		metricas.finalizar(erro)
+		self.run_repo.insert(**metricas.como_dict())
+		self.repo.conn.commit()
 	
 	def _download_and_extract(self, ano: int) -> str:
 		"""
@@ -60,18 +128,22 @@ class FcaImportService:
 		Raises:
 			ValidationError: Para problemas de download/extração
 		"""
-		url = f"https://dados.cvm.gov.br/dados/CIA_ABERTA/DOC/FCA/DADOS/fca_cia_aberta_{ano}.zip"
+		url = f"{CVM_DADOS_URL}/CIA_ABERTA/DOC/FCA/DADOS/fca_cia_aberta_{ano}.zip"
 		
 		# Criar diretório temporário
 		temp_dir = tempfile.mkdtemp()
 		zip_path = os.path.join(temp_dir, f"fca_cia_aberta_{ano}.zip")
 		csv_filename = f"fca_cia_aberta_geral_{ano}.csv"
 		csv_path = os.path.join(temp_dir, csv_filename)
+		metricas = self.metricas[ano]
 		
 		try:
 			# Download do ZIP
 			print(f"Baixando arquivo de {ano}...")
-			response = requests.get(url, timeout=30)
+			with metricas.etapa('download'), Progresso(self.progresso, 'download', f'Baixando {ano}', total=1, unidade='arquivos') as baixado:
+				response = requests.get(url, timeout=30)
+				baixado.avancar(1, len(response.content))
+			metricas.marcar_memoria('download')
 			
 			if response.status_code == 404:
 				raise ValidationError(f"Arquivo não encontrado na CVM para o ano {ano}")
@@ -79,12 +151,13 @@ class FcaImportService:
 				raise ValidationError(f"Erro no download: HTTP {response.status_code}")
 			
 			# Salvar ZIP
+			metricas.bytes_baixados = len(response.content)
 			with open(zip_path, 'wb') as f:
 				f.write(response.content)
 			
 			# Extrair ZIP
 			print("Extraindo arquivo...")
-			with zipfile.ZipFile(zip_path, 'r') as zip_ref:
+			with metricas.etapa('extracao'), zipfile.ZipFile(zip_path, 'r') as zip_ref:
 				# Verificar se CSV existe no ZIP
 				if csv_filename not in zip_ref.namelist():
 					raise ValidationError(f"Arquivo {csv_filename} não encontrado no ZIP")
@@ -92,6 +165,7 @@ class FcaImportService:
 				# Extrair apenas o CSV necessário
 				zip_ref.extract(csv_filename, temp_dir)
 			
+			metricas.marcar_memoria('extracao')
 			return csv_path
 			
 		except Exception as e:
@@ -114,7 +188,10 @@ class FcaImportService:
 			Tuple[inseridos, atualizados, ignorados, erros, lista_erros]
 		"""
 		inseridos = atualizados = ignorados = erros = 0
-		lista_erros = []
+		coletor = self.erros[ano]
+		arquivo = os.path.basename(csv_path)
+		metricas = self.metricas[ano]
+		inicio = time.perf_counter()
 		
 		# Contar linhas para progress bar
 		print("Analisando arquivo...")
@@ -126,10 +203,16 @@ class FcaImportService:
 		consolidated_data = {}
 		
 		with open(csv_path, 'r', encoding='latin1') as f:
-			reader = csv.DictReader(f, delimiter=';', quoting=csv.QUOTE_NONE, escapechar='\\')
+			fonte = LinhasLidas(f)
+			leitura = Progresso(self.progresso, 'parse', f'Lendo {arquivo}')
+			# só as colunas usadas (o FCA tem muitas outras); ausentes abortam aqui
+			leitor = LeitorCsvProjetado(fonte, COLUNAS_FCA, arquivo)
 			
-			for row_num, row in enumerate(reader, start=2):  # linha 2 = primeira linha de dados
+			for row_num, row in enumerate(leitor, start=2):  # linha 2 = primeira linha de dados
+				leitura.avancar(1, len(fonte.ultima))
 				try:
+					if row is None:
+						raise ValidationError(leitor.mensagem_linha_incompleta)
 					# Extrair e validar dados básicos
 					data = self._extract_and_validate_row(row, row_num)
 					if data is None:
@@ -145,16 +228,22 @@ class FcaImportService:
 				
 				except Exception as e:
 					erros += 1
-					lista_erros.append(f"Linha {row_num}: {str(e)}")
+					coletor.registrar_excecao(e, arquivo, row_num, fonte.ultima)
 		
+		leitura.concluir()
+		metricas.somar('parse', inicio)
+		metricas.marcar_memoria(f'parse {arquivo}')
+
 		# Processamento das linhas consolidadas
 		print(f"Processando {len(consolidated_data)} empresas únicas...")
 		
-		with tqdm(total=len(consolidated_data), desc="Importando empresas", unit="empresas") as pbar:
+		with Progresso(self.progresso, 'escrita', "Importando empresas", total=len(consolidated_data), unidade="empresas") as pbar:
 			for cnpj, data in consolidated_data.items():
 				try:
 					# Upsert na base
+					inicio = time.perf_counter()
 					_, action = self.repo.upsert_by_cnpj(**data)
+					metricas.somar('escrita', inicio)
 					
 					if action == 'inserted':
 						inseridos += 1
@@ -163,19 +252,22 @@ class FcaImportService:
 					else:  # ignored
 						ignorados += 1
 
+					inicio = time.perf_counter()
 					self.repo.conn.commit()
+					metricas.somar('commit', inicio)
 
 				except Exception as e:
 					erros += 1
-					lista_erros.append(f"CNPJ {cnpj}: Erro no upsert - {str(e)}")
+					coletor.registrar(FALHA_INSERT, arquivo, '', f"CNPJ {cnpj}: Erro no upsert - {str(e)}", ';'.join(str(v) for v in data.values()))
 				
-				pbar.update(1)
+				pbar.avancar()
 		
-		return inseridos, atualizados, ignorados, erros, lista_erros
+		metricas.marcar_memoria(f'escrita {arquivo}')
+		return inseridos, atualizados, ignorados, erros, list(coletor.amostras)
 	
-	def _extract_and_validate_row(self, row: Dict[str, str], row_num: int) -> Dict[str, Any]:
+	def _extract_and_validate_row(self, row: tuple, row_num: int) -> Dict[str, Any]:
 		"""
-		Extrai e valida dados de uma linha do CSV.
+		Extrai e valida dados de uma linha do CSV (tupla na ordem de COLUNAS_FCA).
 		
 		Returns:
 			Dict com dados normalizados ou None se linha inválida
@@ -183,8 +275,13 @@ class FcaImportService:
 		Raises:
 			ValidationError: Para erros de validação
 		"""
+		(cnpj_raw, data_referencia, documento_id, razao_social, data_constituicao, codigo_cvm,
+		 data_registro_cvm, categoria_registro, situacao_registro_cvm, pais_origem, pais_custodia,
+		 setor_atividade, descricao_atividade, situacao_emissor, controle_acionario,
+		 dia_encerramento, mes_encerramento, pagina_web) = row
+
 		# CNPJ obrigatório e válido
-		cnpj_raw = row.get('CNPJ_Companhia', '').strip()
+		cnpj_raw = cnpj_raw.strip()
 		if not cnpj_raw:
 			raise ValidationError("CNPJ vazio")
 		
@@ -193,12 +290,12 @@ class FcaImportService:
 			raise ValidationError(f"CNPJ inválido: {cnpj_raw}")
 		
 		# Razão social obrigatória
-		razao_social = row.get('Nome_Empresarial', '').strip()
+		razao_social = razao_social.strip()
 		if not razao_social:
 			raise ValidationError("Razão social vazia")
 		
 		# Validar URL se fornecida
-		pagina_web = parse_url(row.get('Pagina_Web', '').strip())
+		pagina_web = parse_url(pagina_web.strip())
 		if pagina_web and not validate_url(pagina_web):
 			raise ValidationError(f"URL inválida: {pagina_web}")
 		
@@ -207,22 +304,22 @@ class FcaImportService:
 		
 		data = {
 			'cnpj': cnpj,
-			'data_referencia': parse_date(row.get('Data_Referencia', '')),
-			'documento_id': parse_int(row.get('ID_Documento', '')),
+			'data_referencia': parse_date(data_referencia),
+			'documento_id': parse_int(documento_id),
 			'razao_social': razao_social,
-			'data_constituicao': parse_date(row.get('Data_Constituicao', '')),
-			'codigo_cvm': row.get('Codigo_CVM', '').strip(),
-			'data_registro_cvm': parse_date(row.get('Data_Registro_CVM', '')),
-			'categoria_registro': row.get('Categoria_Registro_CVM', '').strip(),
-			'situacao_registro_cvm': row.get('Situacao_Registro_CVM', '').strip(),
-			'pais_origem': row.get('Pais_Origem', '').strip(),
-			'pais_custodia_valores_mobiliarios': row.get('Pais_Custodia_Valores_Mobiliarios', '').strip(),
-			'setor_atividade': row.get('Setor_Atividade', '').strip(),
-			'descricao_atividade': row.get('Descricao_Atividade', '').strip(),
-			'situacao_emissor': row.get('Situacao_Emissor', '').strip(),
-			'controle_acionario': row.get('Especie_Controle_Acionario', '').strip(),
-			'dia_encerramento_exercicio_social': parse_int(row.get('Dia_Encerramento_Exercicio_Social', '')),
-			'mes_encerramento_exercicio_social': parse_int(row.get('Mes_Encerramento_Exercicio_Social', '')),
+			'data_constituicao': parse_date(data_constituicao),
+			'codigo_cvm': codigo_cvm.strip(),
+			'data_registro_cvm': parse_date(data_registro_cvm),
+			'categoria_registro': categoria_registro.strip(),
+			'situacao_registro_cvm': situacao_registro_cvm.strip(),
+			'pais_origem': pais_origem.strip(),
+			'pais_custodia_valores_mobiliarios': pais_custodia.strip(),
+			'setor_atividade': setor_atividade.strip(),
+			'descricao_atividade': descricao_atividade.strip(),
+			'situacao_emissor': situacao_emissor.strip(),
+			'controle_acionario': controle_acionario.strip(),
+			'dia_encerramento_exercicio_social': parse_int(dia_encerramento),
+			'mes_encerramento_exercicio_social': parse_int(mes_encerramento),
 			'pagina_web': pagina_web,
 			'criado_em': now_utc,
 			'atualizado_em': now_utc
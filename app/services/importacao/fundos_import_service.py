@@ -0,0 +1,264 @@
+"""
+Serviço para importação do Cadastro de Fundos de Investimento da CVM.
+Menu Importação → 6. [CVM] Cadastro de Fundos e Empresas
+
+O cadastro é um único CSV (FI/CAD/DADOS/cad_fi.csv, latin1, ';') com
+dezenas de milhares de fundos e ~40 colunas, reescrito pela CVM a cada
+dia. A importação é sempre uma carga completa, em memória limitada:
+- o download vai em blocos direto para o disco (sem o arquivo inteiro na memória)
+- a leitura é projetada (core.csv_projetado: só as colunas usadas) e
+  alimenta um executemany numa tabela temporária, linha a linha
+- a escolha do registro vigente de cada CNPJ e o upsert são SQL em
+  conjunto (ver FiCadastroRepo)
+"""
+import os
+import requests
+import tempfile
+import shutil
+import time
+from datetime import datetime
+from typing import Tuple, Dict, Iterator, List
+from ...db.repositories.importacao.fi_cadastro_repo import FiCadastroRepo
+from ...db.repositories.importacao.import_run_repo import ImportRunRepo
+from ...core.utils import normalize_cnpj, get_utc_timestamp, ValidationError, CVM_DADOS_URL
+from ...core.decimal_ctx import money_str
+from ...core.registros_cvm import FundoCvm
+from ...core.metricas import MetricasImportacao
+from ...core.progresso import Progresso, Callback
+from ...core.perfil_memoria import PerfilMemoria
+from ...core.erros_importacao import ColetorErros, LinhasLidas
+from ...core.csv_projetado import LeitorCsvProjetado
+from .engine import Campo, cnpj, data, flag_sim, obrigatorio, texto, texto_repetido
+
+CSV_FILENAME = 'cad_fi.csv'
+
+# Bloco do download em streaming
+TAMANHO_BLOCO = 1 << 20
+
+
+def decimal_opcional(valor: str) -> str | None:
+	"""'1234.56' -> money_str; vazio -> None."""
+	valor = valor.strip()
+	return money_str(valor.replace(',', '.')) if valor else None
+
+
+def cnpj_opcional(valor: str) -> str:
+	"""CNPJ de administrador/gestor: só normalizado (pode faltar)."""
+	valor = valor.strip()
+	return normalize_cnpj(valor) if valor else ''
+
+
+# Colunas do cad_fi.csv usadas, na ordem dos campos de FundoCvm (sem atualizado_em)
+CAMPOS_FUNDO = (
+	Campo('CNPJ_FUNDO', cnpj),
+	Campo('TP_FUNDO', texto_repetido),
+	Campo('DENOM_SOCIAL', obrigatorio("Denominação social vazia")),
+	Campo('CD_CVM', texto),
+	Campo('DT_REG', data),
+	Campo('DT_CONST', data),
+	Campo('DT_CANCEL', data),
+	Campo('SIT', texto_repetido),
+	Campo('DT_INI_SIT', data),
+	Campo('CLASSE', texto_repetido),
+	Campo('CLASSE_ANBIMA', texto_repetido),
+	Campo('CONDOM', texto_repetido),
+	Campo('FUNDO_COTAS', flag_sim),
+	Campo('FUNDO_EXCLUSIVO', flag_sim),
+	Campo('PUBLICO_ALVO', texto_repetido),
+	Campo('TAXA_ADM', texto),
+	Campo('TAXA_PERFM', texto),
+	Campo('VL_PATRIM_LIQ', decimal_opcional),
+	Campo('DT_PATRIM_LIQ', data),
+	Campo('CNPJ_ADMIN', cnpj_opcional),
+	Campo('ADMIN', texto_repetido),
+	Campo('GESTOR', texto_repetido),
+)
+COLUNAS_FUNDO = tuple(campo.coluna for campo in CAMPOS_FUNDO)
+# colunas que não existem em todas as versões do arquivo (lidas como '')
+OPCIONAIS_FUNDO = ('TP_FUNDO', 'CLASSE_ANBIMA', 'CD_CVM')
+
+
+class FundosImportService:
+	"""Serviço de importação do cadastro de fundos (cad_fi) da CVM."""
+
+	def __init__(self, progresso: Callback | None = None, perfil_memoria: bool = False):
+		self.repo = FiCadastroRepo()
+		# callback de progresso (ver app.ui.progresso); None = sem progresso
+		self.progresso = progresso
+		# snapshots do tracemalloc por etapa (lento; só para diagnóstico)
+		self.perfil_memoria = perfil_memoria
+		self.run_repo = ImportRunRepo(self.repo.conn)
+		# métricas e erros da última execução
+		self.metricas: MetricasImportacao | None = None
+		self.erros: ColetorErros | None = None
+
+	def importar_cadastro(self) -> Tuple[int, int, int, int, List[str]]:
+		"""
+		Baixa e importa o cadastro completo de fundos.
+
+		Returns:
+			Tuple[inseridos, atualizados, ignorados, erros, lista_erros]
+
+		Raises:
+			ValidationError: Para problemas de download ou de layout do arquivo
+		"""
+		try:
+			csv_path = self.baixar()
+		except Exception as e:
+			self.registrar_falha(e)
+			raise
+		return self.importar_arquivo(csv_path)
+
+	def baixar(self) -> str:
+		"""Baixa o cad_fi.csv para um diretório temporário (não acessa o banco)."""
+		metricas = self.metricas = MetricasImportacao('cad_fi', datetime.now().year)
+		if self.perfil_memoria:
+			metricas.perfil = PerfilMemoria()
+		return self._download()
+
+	def importar_arquivo(self, csv_path: str) -> Tuple[int, int, int, int, List[str]]:
+		"""
+		Processa o CSV baixado por baixar() e remove os temporários.
+		Grava a execução no histórico (import_runs), com sucesso ou erro.
+		"""
+		ano = datetime.now().year
+		if self.metricas is None:
+			self.metricas = MetricasImportacao('cad_fi', ano)
+		metricas = self.metricas
+		coletor = self.erros = ColetorErros('cad_fi', ano)
+		erro = None
+		try:
+			inseridos, atualizados, ignorados, erros = self._processar_csv(csv_path)
+			metricas.linhas = inseridos + atualizados + ignorados + erros
+			metricas.inseridos = inseridos + atualizados
+			metricas.ignorados = ignorados
+			metricas.erros = erros
+			return inseridos, atualizados, ignorados, erros, list(coletor.amostras)
+		except Exception as e:
+			erro = e
+			self.repo.conn.rollback()
+			raise
+		finally:
+			coletor.fechar()
+			self._registrar_execucao(metricas, erro)
+			# Limpeza obrigatória
+			self._cleanup_temp_files(csv_path)
+
+	def contar_por_situacao(self) -> List[Tuple[str, int]]:
+		"""(situação, quantidade) de fundos cadastrados, da maior para a menor."""
+		return self.repo.contar_por_situacao()
+
+	def registrar_falha(self, erro: Exception) -> None:
+		"""Grava no histórico uma execução que falhou antes do processamento."""
+		if self.metricas is None:
+			self.metricas = MetricasImportacao('cad_fi', datetime.now().year)
+		self._registrar_execucao(self.metricas, erro)
+
+	def _registrar_execucao(self, metricas: MetricasImportacao, erro: Exception | None) -> None:
+		metricas.finalizar(erro)
+		self.run_repo.insert(**metricas.como_dict())
+		self.repo.conn.commit()
+
+	def _download(self) -> str:
+		"""
+		Baixa o CSV em blocos direto para o disco.
+
+		Returns:
+			Path para o arquivo CSV baixado
+
+		Raises:
+			ValidationError: Para problemas de download
+		"""
+		url = f"{CVM_DADOS_URL}/FI/CAD/DADOS/{CSV_FILENAME}"
+		temp_dir = tempfile.mkdtemp()
+		csv_path = os.path.join(temp_dir, CSV_FILENAME)
+		metricas = self.metricas
+
+		try:
+			print("Baixando cadastro de fundos...")
+			with metricas.etapa('download'), requests.get(url, timeout=30, stream=True) as response:
+				if response.status_code == 404:
+					raise ValidationError("Cadastro de fundos não encontrado na CVM")
+				elif response.status_code != 200:
+					raise ValidationError(f"Erro no download: HTTP {response.status_code}")
+
+				tamanho = int(response.headers.get('Content-Length') or 0) or None
+				with Progresso(self.progresso, 'download', 'Baixando cad_fi.csv', total=tamanho, unidade='bytes') as baixado, \
+						open(csv_path, 'wb') as f:
+					for bloco in response.iter_content(TAMANHO_BLOCO):
+						f.write(bloco)
+						metricas.bytes_baixados += len(bloco)
+						baixado.avancar(len(bloco), len(bloco))
+			metricas.marcar_memoria('download')
+			return csv_path
+
+		except Exception as e:
+			# Limpar diretório em caso de erro
+			try:
+				shutil.rmtree(temp_dir)
+			except:
+				pass
+
+			if isinstance(e, ValidationError):
+				raise
+			else:
+				raise ValidationError(f"Erro no download: {str(e)}")
+
+	def _processar_csv(self, csv_path: str) -> Tuple[int, int, int, int]:
+		"""
+		Carrega o CSV na tabela temporária e aplica o upsert.
+
+		Returns:
+			Tuple[inseridos, atualizados, ignorados, erros]
+		"""
+		arquivo = os.path.basename(csv_path)
+		metricas = self.metricas
+		contagem = {'erros': 0}
+
+		self.repo.preparar_staging()
+		inicio = time.perf_counter()
+		with open(csv_path, 'r', encoding='latin1') as f:
+			fonte = LinhasLidas(f)
+			# só as colunas usadas (o cadastro tem ~40); ausentes abortam aqui
+			leitor = LeitorCsvProjetado(fonte, COLUNAS_FUNDO, arquivo, opcionais=OPCIONAIS_FUNDO)
+			with Progresso(self.progresso, 'parse', f'Lendo {arquivo}', unidade='fundos') as leitura:
+				# o gerador é consumido pelo executemany: nada do arquivo fica na memória
+				self.repo.carregar_staging(self._registros(leitor, fonte, arquivo, contagem, leitura))
+		metricas.somar('parse', inicio)
+		metricas.marcar_memoria(f'parse {arquivo}')
+
+		inicio = time.perf_counter()
+		inseridos, atualizados, ignorados, substituidos = self.repo.aplicar_staging()
+		metricas.somar('escrita', inicio)
+		metricas.marcar_memoria(f'escrita {arquivo}')
+
+		inicio = time.perf_counter()
+		self.repo.conn.commit()
+		metricas.somar('commit', inicio)
+		# registros antigos do mesmo CNPJ também não são gravados
+		return inseridos, atualizados, ignorados + substituidos, contagem['erros']
+
+	def _registros(self, leitor: LeitorCsvProjetado, fonte: LinhasLidas, arquivo: str,
+				   contagem: Dict[str, int], leitura: Progresso) -> Iterator[FundoCvm]:
+		"""Gera os fundos válidos; linhas inválidas vão para o coletor de erros."""
+		conversores = tuple(campo.conversor for campo in CAMPOS_FUNDO)
+		atualizado_em = get_utc_timestamp()
+		for row_num, row in enumerate(leitor, start=2):  # linha 2 = primeira linha de dados
+			leitura.avancar(1, len(fonte.ultima))
+			try:
+				if row is None:
+					raise ValidationError(leitor.mensagem_linha_incompleta)
+				yield FundoCvm(*[converter(valor) for converter, valor in zip(conversores, row)], atualizado_em)
+			except Exception as e:
+				contagem['erros'] += 1
+				self.erros.registrar_excecao(e, arquivo, row_num, fonte.ultima)
+
+	def _cleanup_temp_files(self, csv_path: str):
+		"""Remove arquivos temporários."""
+		try:
+			temp_dir = os.path.dirname(csv_path)
+			if temp_dir and os.path.exists(temp_dir):
+				shutil.rmtree(temp_dir)
+		except Exception:
+			# Ignorar erros de limpeza
+			pass
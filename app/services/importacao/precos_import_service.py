@@ -0,0 +1,173 @@
+"""
+Serviço para importação do histórico de preços (cotações diárias).
+Menu Importação → 7. [Preços] Histórico de cotações
+
+Arquivos locais .csv (';' ou ',') ou .xlsx com as colunas Data e
+Fechamento e, opcionais, Ticker, Abertura, Máxima, Mínima e Volume. Sem a
+coluna Ticker, o ticker é o informado na importação ou o nome do arquivo
+(PETR4.csv -> PETR4). Datas em dd/mm/aaaa ou aaaa-mm-dd; números no
+formato brasileiro ou com ponto decimal.
+
+Mesmo fluxo da posição B3: leitura em streaming para uma tabela
+temporária e upsert em conjunto em precos_historico (ver
+PrecosHistoricoRepo). O cache .npy dos tickers gravados é invalidado.
+"""
+import os
+import time
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+from ...db.repositories.precos.precos_historico_repo import PrecosHistoricoRepo
+from ...db.repositories.importacao.import_run_repo import ImportRunRepo
+from ...core.utils import parse_date, get_utc_timestamp, ValidationError
+from ...core.decimal_ctx import MONEY_SCALE, to_scaled
+from ...core.registros_b3 import CotacaoDiaria
+from ...core.metricas import MetricasImportacao
+from ...core.progresso import Progresso, Callback
+from ...core.perfil_memoria import PerfilMemoria
+from ...core.erros_importacao import ColetorErros
+from ..precos_service import invalidar_cache
+from .b3_leitura import iter_linhas, listar_arquivos, numero, texto
+
+# Colunas lidas do arquivo, na ordem de _montar_registro
+COLUNAS = ('Data', 'Ticker', 'Abertura', 'Máxima', 'Mínima', 'Fechamento', 'Volume')
+OBRIGATORIAS = ('Data', 'Fechamento')
+OPCIONAIS = tuple(c for c in COLUNAS if c not in OBRIGATORIAS)
+
+
+class PrecosImportService:
+	"""Importa arquivos de cotações diárias para precos_historico."""
+
+	def __init__(self, progresso: Callback | None = None, perfil_memoria: bool = False):
+		self.repo = PrecosHistoricoRepo()
+		# callback de progresso (ver app.ui.progresso); None = sem progresso
+		self.progresso = progresso
+		# snapshots do tracemalloc por etapa (lento; só para diagnóstico)
+		self.perfil_memoria = perfil_memoria
+		self.run_repo = ImportRunRepo(self.repo.conn)
+		# métricas e erros da última execução
+		self.metricas: MetricasImportacao | None = None
+		self.erros: ColetorErros | None = None
+
+	def importar(self, caminhos: Sequence[str], ticker: str | None = None) -> List[list]:
+		"""
+		Importa arquivos de cotações (ou pastas com eles).
+
+		Args:
+			caminhos: arquivos .csv/.xlsx ou pastas
+			ticker: ticker das linhas sem a coluna Ticker; se omitido, vem
+				do nome de cada arquivo
+
+		Returns:
+			Resumo por arquivo: [arquivo, total, inseridos, atualizados, ignorados, erros, segundos, linhas/s]
+
+		Raises:
+			ValidationError: nenhum arquivo encontrado
+		"""
+		arquivos = listar_arquivos(caminhos)
+		ticker = ticker.strip().upper() if ticker else None
+
+		ano = int(time.strftime('%Y'))
+		metricas = self.metricas = MetricasImportacao('precos_historico', ano)
+		if self.perfil_memoria:
+			metricas.perfil = PerfilMemoria()
+		coletor = self.erros = ColetorErros('precos_historico', ano)
+
+		resumo = []
+		erro = None
+		try:
+			self.repo.preparar_staging()
+			for caminho in arquivos:
+				inicio = time.perf_counter()
+				padrao = ticker or os.path.splitext(os.path.basename(caminho))[0].upper()
+				total, inseridos, atualizados, ignorados, erros = self._importar_arquivo(caminho, padrao)
+				segundos = time.perf_counter() - inicio
+				linhas_s = round((total + erros) / segundos) if segundos else 0
+				resumo.append([os.path.basename(caminho), total, inseridos, atualizados, ignorados, erros, round(segundos, 2), linhas_s])
+
+				metricas.linhas += total + erros
+				metricas.inseridos += inseridos + atualizados
+				metricas.ignorados += ignorados
+				metricas.erros += erros
+			return resumo
+		except Exception as e:
+			erro = e
+			self.repo.conn.rollback()
+			raise
+		finally:
+			coletor.fechar()
+			metricas.finalizar(erro)
+			self.run_repo.insert(**metricas.como_dict())
+			self.repo.conn.commit()
+
+	def resumo(self) -> Optional[Tuple[int, int, str, str]]:
+		"""(tickers, cotações, primeira data, última data) gravados, ou None se não houver."""
+		return self.repo.resumo()
+
+	def _importar_arquivo(self, caminho: str, ticker_padrao: str) -> Tuple[int, int, int, int, int]:
+		"""Lê um arquivo para a tabela temporária e aplica o upsert. Retorna (total, ins, atu, ign, erros)."""
+		metricas = self.metricas
+		arquivo = os.path.basename(caminho)
+		contagem = {'linhas': 0, 'erros': 0}
+
+		inicio = time.perf_counter()
+		leitura = Progresso(self.progresso, 'parse', f'Lendo {arquivo}', unidade='cotações')
+		# leitura e carga na temporária acontecem juntas (o gerador é consumido pelo executemany)
+		self.repo.carregar_staging(self._registros(caminho, ticker_padrao, contagem, leitura))
+		leitura.concluir()
+		metricas.somar('parse', inicio)
+		metricas.marcar_memoria(f'parse {arquivo}')
+
+		inicio = time.perf_counter()
+		tickers = self.repo.tickers_staging()
+		inseridos, atualizados, ignorados = self.repo.aplicar_staging()
+		metricas.somar('escrita', inicio)
+
+		inicio = time.perf_counter()
+		self.repo.conn.commit()
+		metricas.somar('commit', inicio)
+		# só depois do commit: um leitor entre a remoção e o commit refaria o
+		# .npy com os preços antigos
+		invalidar_cache(tickers)
+		metricas.marcar_memoria(f'escrita {arquivo}')
+		return contagem['linhas'], inseridos, atualizados, ignorados, contagem['erros']
+
+	def _registros(self, caminho: str, ticker_padrao: str, contagem: Dict[str, int],
+				   leitura: Progresso) -> Iterator[CotacaoDiaria]:
+		"""Gera os registros válidos do arquivo; linhas inválidas vão para o coletor de erros."""
+		arquivo = os.path.basename(caminho)
+		atualizado_em = get_utc_timestamp()
+		for _, row_num, valores in iter_linhas(caminho, COLUNAS, OPCIONAIS):
+			leitura.avancar()
+			try:
+				registro = self._montar_registro(valores, ticker_padrao, arquivo, atualizado_em)
+			except Exception as e:
+				contagem['erros'] += 1
+				self.erros.registrar_excecao(e, arquivo, row_num, ';'.join('' if v is None else str(v) for v in valores))
+				continue
+			contagem['linhas'] += 1
+			yield registro
+
+	def _montar_registro(self, valores: tuple, ticker_padrao: str, arquivo: str, atualizado_em: str) -> CotacaoDiaria:
+		data, ticker, abertura, maxima, minima, fechamento, volume = (texto(v) for v in valores)
+		if not data:
+			raise ValidationError("Data não informada")
+		fechamento = _preco(fechamento, 'Fechamento')
+		if not fechamento or fechamento < 0:
+			raise ValidationError(f"Fechamento inválido: {valores[5]}")
+
+		return CotacaoDiaria(
+			ticker=ticker.upper() or ticker_padrao,
+			data=parse_date(data)[:10],
+			abertura=_preco(abertura, 'Abertura'),
+			maxima=_preco(maxima, 'Máxima'),
+			minima=_preco(minima, 'Mínima'),
+			fechamento=fechamento,
+			volume=to_scaled(numero(volume, 'Volume'), 0) if volume else None,
+			arquivo=arquivo,
+			atualizado_em=atualizado_em,
+		)
+
+
+def _preco(valor: str, campo: str) -> Optional[int]:
+	"""Preço em escala fixa; célula vazia é None (e não zero)."""
+	return to_scaled(numero(valor, campo), MONEY_SCALE) if valor else None
@@ -0,0 +1,100 @@
+"""
+Árvore de contas dos demonstrativos (BPA/BPP/DRE) e conferência dos
+subtotais.
+
+A hierarquia vem do próprio código da CVM ('1.01.02' é filho de '1.01') e
+fica pré-calculada em plano_contas (pai e nível), alimentada na importação
+de ITR/DFP. Subárvores são buscas de intervalo no índice; a conferência
+compara cada conta com a soma dos filhos diretos, num documento só (última
+versão entregue), em inteiros (valor x 10**4), sem Decimal por linha.
+"""
+from decimal import Decimal
+from typing import List, NamedTuple, Optional, Tuple
+
+from ..db.connection import get_conn
+from ..db.repositories.fundamentos.demonstrativos_repo import DemonstrativosRepo
+from ..db.repositories.fundamentos.plano_contas_repo import PlanoContasRepo
+from ..core.decimal_ctx import MONEY_SCALE, scaled_str
+from ..core.utils import ValidationError
+
+# demonstrativo -> (tabela, conta raiz padrão; a DRE não tem a conta '3', mas
+# a subárvore de '3' é a DRE inteira)
+DEMONSTRATIVOS = {
+	'bpa': ('cia_aberta_itr_bpa', '1'),
+	'bpp': ('cia_aberta_itr_bpp', '2'),
+	'dre': ('cia_aberta_itr_dre', '3'),
+}
+
+CONSOLIDADO = 'DF Consolidado'
+
+
+class ContaArvore(NamedTuple):
+	codigo: str
+	nivel: int
+	descricao: str
+	valor: Decimal
+	divergencia: Optional[Decimal]     # valor - soma dos filhos, se passar da tolerância
+
+
+class ArvoreContas(NamedTuple):
+	versao: int
+	grupo: str
+	escala: str
+	contas: List[ContaArvore]
+	divergentes: int                   # contas com subtotal divergente no documento inteiro
+
+
+def _decimal(valor: int) -> Decimal:
+	return Decimal(scaled_str(valor, MONEY_SCALE))
+
+
+class PlanoContasService:
+	"""Consulta de subárvores e conferência de subtotais de um documento."""
+
+	def __init__(self, conn=None):
+		conn = conn or get_conn()
+		self.repo = DemonstrativosRepo(conn)
+		self.plano_repo = PlanoContasRepo(conn)
+
+	def documento(self, tabela: str, cnpj: str, data_referencia: str, grupo: str | None = None) -> Tuple[int, str]:
+		"""(versão mais recente, grupo) do documento; grupo None = consolidado, se houver."""
+		versao = self.repo.ultima_versao(tabela, cnpj, data_referencia)
+		if versao is None:
+			raise ValidationError(f"Nenhum demonstrativo de {cnpj} em {data_referencia}")
+		grupos = self.repo.grupos(tabela, cnpj, data_referencia, versao)
+		if grupo is None:
+			grupo = CONSOLIDADO if CONSOLIDADO in grupos else grupos[0]
+		elif grupo not in grupos:
+			raise ValidationError(f"Grupo não entregue no documento: {grupo}")
+		return versao, grupo
+
+	def divergencias(self, tabela: str, cnpj: str, data_referencia: str, grupo: str | None = None,
+					 tolerancia: Decimal = Decimal('0')) -> List[Tuple[str, Decimal, Decimal, int]]:
+		"""(conta, valor, soma dos filhos, filhos) das contas cujo subtotal não fecha."""
+		versao, grupo = self.documento(tabela, cnpj, data_referencia, grupo)
+		return [
+			(codigo, _decimal(valor), _decimal(soma), filhos)
+			for codigo, valor, soma, filhos in self.repo.divergencias_rollup(
+				tabela, cnpj, data_referencia, versao, grupo, int(tolerancia.scaleb(MONEY_SCALE)))
+		]
+
+	def arvore(self, tabela: str, cnpj: str, data_referencia: str, raiz: str, grupo: str | None = None,
+			   tolerancia: Decimal = Decimal('0')) -> ArvoreContas:
+		"""Subárvore de `raiz` no documento, com a divergência de cada subtotal."""
+		versao, grupo = self.documento(tabela, cnpj, data_referencia, grupo)
+		divergentes = {
+			codigo: valor - soma
+			for codigo, valor, soma, _ in self.repo.divergencias_rollup(
+				tabela, cnpj, data_referencia, versao, grupo, int(tolerancia.scaleb(MONEY_SCALE)))
+		}
+		linhas = self.repo.subarvore(tabela, cnpj, data_referencia, versao, grupo, raiz)
+		contas = [
+			ContaArvore(codigo, nivel, descricao, _decimal(valor),
+						_decimal(divergentes[codigo]) if codigo in divergentes else None)
+			for codigo, nivel, descricao, valor, _ in linhas
+		]
+		escala = linhas[0][4] if linhas else ''
+		return ArvoreContas(versao, grupo, escala, contas, len(divergentes))
+
+	def filhos(self, codigo: str) -> List[str]:
+		return self.plano_repo.filhos(codigo)
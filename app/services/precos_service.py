@@ -0,0 +1,95 @@
+"""
+Leitura do histórico de preços (precos_historico) como arrays numpy.
+
+A série de um ativo sai de uma única varredura de intervalo na chave
+primária (ticker, data) da tabela WITHOUT ROWID, já com os preços em
+inteiros de escala fixa, e vira dois arrays: datas (datetime64[D]) e
+fechamentos (int64, x 10**MONEY_SCALE).
+
+Cache opcional (PrecosService(cache=True)): a série completa de cada ticker
+é gravada uma vez em <pasta do banco>/cache/precos/<ticker>.npy e as
+leituras seguintes abrem o arquivo com np.load(mmap_mode='r'), sem SQL; o
+intervalo pedido é um recorte por busca binária nas datas. A importação de
+preços apaga o arquivo dos tickers que gravou (invalidar_cache).
+"""
+import os
+from contextlib import suppress
+from typing import Iterable, NamedTuple
+from urllib.parse import quote
+import numpy as np
+
+from ..db.connection import DB_PATH, get_conn
+from ..db.repositories.precos.precos_historico_repo import PrecosHistoricoRepo
+
+PASTA_CACHE = os.path.join(os.path.dirname(DB_PATH), 'cache', 'precos')
+
+# registro do .npy: uma linha por pregão
+DTYPE_SERIE = np.dtype([('data', 'datetime64[D]'), ('fechamento', np.int64)])
+
+
+class SeriePrecos(NamedTuple):
+	datas: np.ndarray           # datetime64[D], crescente
+	fechamentos: np.ndarray     # int64, x 10**MONEY_SCALE
+
+
+def _caminho_cache(ticker: str) -> str:
+	# quote: tickers de renda fixa têm espaços e '+'
+	return os.path.join(PASTA_CACHE, quote(ticker.upper(), safe='') + '.npy')
+
+
+def invalidar_cache(tickers: Iterable[str]) -> None:
+	"""Remove o .npy dos tickers (chamado pela importação ao gravar preços)."""
+	for ticker in tickers:
+		with suppress(FileNotFoundError):
+			os.remove(_caminho_cache(ticker))
+
+
+def _serie_de_linhas(linhas) -> np.ndarray:
+	serie = np.empty(len(linhas), dtype=DTYPE_SERIE)
+	if linhas:
+		datas, fechamentos = zip(*linhas)
+		serie['data'] = np.array(datas, dtype='datetime64[D]')
+		serie['fechamento'] = fechamentos
+	return serie
+
+
+class PrecosService:
+	"""Séries de preços por ticker, com cache .npy opcional."""
+
+	def __init__(self, conn=None, cache: bool = False):
+		self.repo = PrecosHistoricoRepo(conn or get_conn())
+		self.cache = cache
+
+	def serie(self, ticker: str, inicio: str | None = None, fim: str | None = None) -> SeriePrecos:
+		"""
+		Fechamentos de `ticker` entre `inicio` e `fim` inclusive (aaaa-mm-dd;
+		None = sem limite). Com cache, os arrays são visões somente leitura
+		do arquivo mapeado.
+		"""
+		if not self.cache:
+			serie = _serie_de_linhas(self.repo.serie(ticker, inicio, fim))
+			return SeriePrecos(serie['data'], serie['fechamento'])
+
+		serie = self._serie_em_cache(ticker)
+		datas = serie['data']
+		de = np.searchsorted(datas, np.datetime64(inicio, 'D')) if inicio else 0
+		ate = np.searchsorted(datas, np.datetime64(fim, 'D'), side='right') if fim else len(datas)
+		return SeriePrecos(datas[de:ate], serie['fechamento'][de:ate])
+
+	def _serie_em_cache(self, ticker: str) -> np.ndarray:
+		caminho = _caminho_cache(ticker)
+		try:
+			return np.load(caminho, mmap_mode='r')
+		except FileNotFoundError:
+			pass
+		serie = _serie_de_linhas(self.repo.serie(ticker))
+		if not len(serie):
+			# ticker sem cotações: nada a guardar (pode ser importado depois)
+			return serie
+		os.makedirs(PASTA_CACHE, exist_ok=True)
+		# grava num temporário e troca: um leitor concorrente nunca vê o arquivo pela metade
+		temporario = f"{caminho}.{os.getpid()}.tmp"
+		with open(temporario, 'wb') as f:
+			np.save(f, serie)
+		os.replace(temporario, caminho)
+		return np.load(caminho, mmap_mode='r')
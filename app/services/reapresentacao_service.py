@@ -0,0 +1,174 @@
+"""
+Reapresentações: o que mudou entre duas versões de um demonstrativo.
+
+As tabelas de contas guardam todas as versões entregues de cada documento
+(cnpj, data de referência). A comparação é um merge-join das duas versões
+lidas em ordem de (grupo, conta), a ordem do índice UNIQUE: uma passada em
+cada lista, sem dicionário nem ordenação, listando só as contas cujo valor
+mudou, entrou ou saiu. Os valores são comparados em reais x 10**4
+(inteiros, escala do documento já aplicada); Decimal só nas diferenças.
+
+O modo em lote acha todas as reapresentações de um ano (catálogo em
+cia_aberta_itr_controle) e compara, em cada documento, a última versão com
+a anterior: uma consulta por tabela de contas para o mercado inteiro, que
+já descarta no SQLite as contas repetidas entre as versões.
+"""
+from decimal import Decimal
+from itertools import groupby
+from operator import itemgetter
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+from ..db.connection import get_conn
+from ..db.repositories.fundamentos.demonstrativos_repo import DemonstrativosRepo, TABELAS_CONTAS
+from ..core.decimal_ctx import MONEY_SCALE
+from ..core.utils import ValidationError
+
+CONSOLIDADO = 'DF Consolidado'
+
+_PCT = Decimal('0.01')
+
+
+class Diferenca(NamedTuple):
+	grupo: str
+	codigo: str
+	descricao: str
+	anterior: Optional[Decimal]        # None: conta nova na versão atual
+	atual: Optional[Decimal]           # None: conta removida na versão atual
+	delta: Optional[Decimal]
+	delta_pct: Optional[Decimal]       # None sem base (conta nova/removida ou valor anterior zero)
+
+
+class Reapresentacao(NamedTuple):
+	cnpj: str
+	data_referencia: str
+	razao_social: str
+	versao_anterior: int
+	versao: int
+	diferencas: List[Diferenca]
+
+
+def comparar_contas(anteriores: Sequence[tuple], atuais: Sequence[tuple],
+					minimo_pct: Decimal = Decimal('0')) -> Iterator[tuple]:
+	"""
+	Merge-join de duas versões: `anteriores` e `atuais` são (grupo, codigo,
+	descricao, valor) em ordem de (grupo, codigo), valor inteiro. Gera
+	(grupo, codigo, descricao, anterior, atual) das contas que mudaram, com
+	None do lado em que a conta não existe. Com `minimo_pct`, variações até
+	esse percentual do valor anterior ficam de fora (contas novas/removidas
+	e as de valor anterior zero sempre entram).
+	"""
+	i = j = 0
+	n, m = len(anteriores), len(atuais)
+	while i < n and j < m:
+		grupo, codigo, _, valor_anterior = a = anteriores[i]
+		b = atuais[j]
+		chave_a, chave_b = (grupo, codigo), (b[0], b[1])
+		if chave_a == chave_b:
+			valor_atual = b[3]
+			if valor_atual != valor_anterior and (
+				not valor_anterior or abs(valor_atual - valor_anterior) * 100 > minimo_pct * abs(valor_anterior)
+			):
+				yield grupo, codigo, b[2], valor_anterior, valor_atual
+			i += 1
+			j += 1
+		elif chave_a < chave_b:
+			yield grupo, codigo, a[2], valor_anterior, None
+			i += 1
+		else:
+			yield b[0], b[1], b[2], None, b[3]
+			j += 1
+	for grupo, codigo, descricao, valor in anteriores[i:]:
+		yield grupo, codigo, descricao, valor, None
+	for grupo, codigo, descricao, valor in atuais[j:]:
+		yield grupo, codigo, descricao, None, valor
+
+
+def _decimal(valor: Optional[int]) -> Optional[Decimal]:
+	"""Inteiro x 10**4 -> Decimal com 4 casas (exato, sem passar por texto)."""
+	return None if valor is None else Decimal(valor).scaleb(-MONEY_SCALE)
+
+
+def _diferenca(grupo: str, codigo: str, descricao: str, anterior: Optional[int], atual: Optional[int]) -> Diferenca:
+	if anterior is None or atual is None:
+		return Diferenca(grupo, codigo, descricao, _decimal(anterior), _decimal(atual), None, None)
+	delta = atual - anterior
+	# a escala se cancela na razão: percentual direto dos inteiros
+	delta_pct = (Decimal(delta * 100) / abs(anterior)).quantize(_PCT) if anterior else None
+	return Diferenca(grupo, codigo, descricao, _decimal(anterior), _decimal(atual), _decimal(delta), delta_pct)
+
+
+def _diferencas_documento(linhas: Iterable[tuple], versao_anterior: int, minimo_pct: Decimal) -> List[Diferenca]:
+	"""
+	Linhas de iter_contas_reapresentadas de um documento (versão anterior
+	primeiro, depois a atual, cada uma em ordem de grupo e conta; as contas
+	idênticas nas duas já vêm de fora).
+	"""
+	anteriores, atuais = [], []
+	for _, _, versao, grupo, codigo, descricao, valor in linhas:
+		(anteriores if versao == versao_anterior else atuais).append((grupo, codigo, descricao, valor))
+	return [_diferenca(*d) for d in comparar_contas(anteriores, atuais, minimo_pct)]
+
+
+class ReapresentacaoService:
+	"""Diferenças entre versões de demonstrativos (BPA, BPP e DRE)."""
+
+	def __init__(self, conn=None):
+		self.repo = DemonstrativosRepo(conn or get_conn())
+
+	def versoes(self, cnpj: str, data_referencia: str) -> List[int]:
+		return self.repo.versoes(cnpj, data_referencia)
+
+	def comparar(self, cnpj: str, data_referencia: str, grupo: str | None = None,
+				 versao_anterior: int | None = None, versao: int | None = None,
+				 minimo_pct: Decimal = Decimal('0')) -> Reapresentacao:
+		"""
+		Diferenças conta a conta entre duas versões de um documento (padrão:
+		a última e a anterior a ela), no grupo informado (None = consolidado,
+		se houver). BPA, BPP e DRE em sequência (códigos 1.*, 2.*, 3.*).
+		"""
+		versoes = self.repo.versoes(cnpj, data_referencia)
+		if len(versoes) < 2:
+			raise ValidationError(f"Documento de {cnpj} em {data_referencia} sem versões para comparar")
+		versao = versoes[-1] if versao is None else versao
+		if versao_anterior is None:
+			anteriores_a = [v for v in versoes if v < versao]
+			if not anteriores_a:
+				raise ValidationError(f"Não há versão anterior à {versao}")
+			versao_anterior = anteriores_a[-1]
+		for v in (versao_anterior, versao):
+			if v not in versoes:
+				raise ValidationError(f"Versão {v} não importada (disponíveis: {', '.join(map(str, versoes))})")
+
+		if grupo is None:
+			grupos = self.repo.grupos(TABELAS_CONTAS[0], cnpj, data_referencia, versao)
+			grupo = CONSOLIDADO if not grupos or CONSOLIDADO in grupos else grupos[0]
+
+		def contas(v: int) -> List[tuple]:
+			return [
+				(grupo, codigo, descricao, valor)
+				for tabela in TABELAS_CONTAS
+				for codigo, descricao, valor in self.repo.contas_versao(tabela, cnpj, data_referencia, v, grupo)
+			]
+
+		diferencas = [_diferenca(*d) for d in comparar_contas(contas(versao_anterior), contas(versao), minimo_pct)]
+		return Reapresentacao(cnpj, data_referencia, self.repo.razao_social(cnpj, data_referencia),
+							  versao_anterior, versao, diferencas)
+
+	def reapresentacoes(self, ano: int, minimo_pct: Decimal = Decimal('0')) -> List[Reapresentacao]:
+		"""
+		Todos os documentos do ano com mais de uma versão, cada um com as
+		diferenças entre a última versão e a anterior (lista vazia se só
+		mudou o que não é valor de conta).
+		"""
+		if not self.repo.preparar_reapresentacoes(ano):
+			return []
+		documentos = self.repo.listar_reapresentacoes()
+		anterior_de = {(cnpj, data): versao_anterior for cnpj, data, _, versao_anterior, _ in documentos}
+		diferencas: Dict[Tuple[str, str], List[Diferenca]] = {}
+		for tabela in TABELAS_CONTAS:
+			for chave, linhas in groupby(self.repo.iter_contas_reapresentadas(tabela), key=itemgetter(0, 1)):
+				diferencas.setdefault(chave, []).extend(_diferencas_documento(linhas, anterior_de[chave], minimo_pct))
+		return [
+			Reapresentacao(cnpj, data, razao_social, versao_anterior, versao, diferencas.get((cnpj, data), []))
+			for cnpj, data, razao_social, versao_anterior, versao in documentos
+		]
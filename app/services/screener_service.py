@@ -0,0 +1,174 @@
+"""
+Screener de fundamentos: indicadores de todas as empresas em um período.
+
+As contas padrão do plano da CVM (CONTAS) de BPA, BPP e DRE de todas as
+companhias numa data de referência saem de uma consulta só (última versão
+de cada documento, ver DemonstrativosRepo.valores_periodo) e viram uma
+matriz densa empresas x contas (float64, NaN onde a conta não veio). Os
+indicadores são operações de coluna sobre essa matriz, sem laço por
+empresa.
+
+A matriz de cada período fica em memória até a próxima importação de
+ITR/DFP (o id da última execução em import_runs é a versão do cache).
+
+Os valores da DRE são os do período gravado (trimestre ou acumulado no ano,
+como vieram no arquivo), sem anualizar.
+"""
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+import numpy as np
+
+from ..db.connection import get_conn
+from ..db.repositories.fundamentos.demonstrativos_repo import DemonstrativosRepo
+from ..db.repositories.importacao.import_run_repo import ImportRunRepo
+from ..core.registros_cvm import fator_escala
+from ..core.utils import ValidationError
+
+# Contas padrão (código CVM -> descrição), colunas da matriz nesta ordem
+CONTAS = {
+	'1': 'Ativo Total',
+	'1.01': 'Ativo Circulante',
+	'1.01.01': 'Caixa e Equivalentes de Caixa',
+	'2.01': 'Passivo Circulante',
+	'2.01.04': 'Empréstimos e Financiamentos (CP)',
+	'2.02.01': 'Empréstimos e Financiamentos (LP)',
+	'2.03': 'Patrimônio Líquido',
+	'3.01': 'Receita Líquida',
+	'3.03': 'Resultado Bruto',
+	'3.05': 'EBIT',
+	'3.11': 'Lucro Líquido',
+}
+CODIGOS = tuple(CONTAS)
+COLUNA = {codigo: j for j, codigo in enumerate(CODIGOS)}
+
+# chave -> (rótulo, é percentual)
+INDICADORES = {
+	'roe': ('ROE', True),
+	'roa': ('ROA', True),
+	'margem_bruta': ('Margem Bruta', True),
+	'margem_ebit': ('Margem EBIT', True),
+	'margem_liquida': ('Margem Líquida', True),
+	'liquidez_corrente': ('Liquidez Corrente', False),
+	'divida_liquida_pl': ('Dív. Líquida/PL', False),
+	'passivo_pl': ('Passivo/PL', False),
+}
+
+CONSOLIDADO = 'DF Consolidado'
+# importações que gravam nos demonstrativos (tipo em import_runs)
+TIPOS_IMPORTACAO = ('itr', 'dfp')
+
+
+class MatrizFundamentos(NamedTuple):
+	periodo: str
+	cnpjs: List[str]
+	razoes_sociais: List[str]
+	consolidado: np.ndarray              # bool por empresa: DF Consolidado (senão DF Individual)
+	valores: np.ndarray                  # float64 empresas x CODIGOS, em R$ (NaN = conta ausente)
+	indicadores: Dict[str, np.ndarray]   # chave de INDICADORES -> float64 por empresa (NaN = sem base)
+
+
+# período -> (versão da carga, matriz)
+_cache: Dict[str, Tuple[int, MatrizFundamentos]] = {}
+
+
+def invalidar_cache() -> None:
+	"""Descarta as matrizes em memória (são remontadas na próxima consulta)."""
+	_cache.clear()
+
+
+def montar_matriz(periodo: str, linhas: Sequence[Tuple[str, str, str, str, str, str]]) -> MatrizFundamentos:
+	"""
+	Pivota as linhas de valores_periodo em empresas x contas. Cada empresa
+	usa o DF Consolidado se o entregou no período; senão, o Individual.
+	"""
+	linha_de: Dict[str, int] = {}
+	razoes_sociais: List[str] = []
+	grupos, linhas_idx, colunas, valores = [], [], [], []
+	for cnpj, razao_social, grupo, codigo, valor, escala in linhas:
+		i = linha_de.get(cnpj)
+		if i is None:
+			i = linha_de[cnpj] = len(razoes_sociais)
+			razoes_sociais.append(razao_social)
+		grupos.append(grupo != CONSOLIDADO)
+		linhas_idx.append(i)
+		colunas.append(COLUNA[codigo])
+		valores.append(float(valor) * fator_escala(escala))
+
+	# [0] consolidado, [1] individual
+	pivot = np.full((2, len(razoes_sociais), len(CODIGOS)), np.nan)
+	pivot[np.array(grupos, dtype=np.intp), np.array(linhas_idx, dtype=np.intp), np.array(colunas, dtype=np.intp)] = valores
+	consolidado = ~np.isnan(pivot[0]).all(axis=1)
+	matriz = np.where(consolidado[:, None], pivot[0], pivot[1])
+	return MatrizFundamentos(periodo, list(linha_de), razoes_sociais, consolidado, matriz, calcular_indicadores(matriz))
+
+
+def _razao(a: np.ndarray, b: np.ndarray, escala: float = 1.0) -> np.ndarray:
+	"""a / b onde b > 0; NaN onde não há base (b ausente, zero ou negativo)."""
+	with np.errstate(divide='ignore', invalid='ignore'):
+		return np.where(b > 0, a / b * escala, np.nan)
+
+
+def calcular_indicadores(valores: np.ndarray) -> Dict[str, np.ndarray]:
+	"""Indicadores de INDICADORES, vetoriais sobre as colunas da matriz."""
+	def conta(codigo):
+		return valores[:, COLUNA[codigo]]
+
+	ativo, pl, receita, lucro = conta('1'), conta('2.03'), conta('3.01'), conta('3.11')
+	emprestimos_cp, emprestimos_lp = conta('2.01.04'), conta('2.02.01')
+	# sem nenhuma das duas contas (ex.: bancos) a dívida é indefinida, não zero
+	divida_bruta = np.where(np.isnan(emprestimos_cp) & np.isnan(emprestimos_lp), np.nan,
+							np.nan_to_num(emprestimos_cp) + np.nan_to_num(emprestimos_lp))
+	divida_liquida = divida_bruta - np.nan_to_num(conta('1.01.01'))
+	return {
+		'roe': _razao(lucro, pl, 100),
+		'roa': _razao(lucro, ativo, 100),
+		'margem_bruta': _razao(conta('3.03'), receita, 100),
+		'margem_ebit': _razao(conta('3.05'), receita, 100),
+		'margem_liquida': _razao(lucro, receita, 100),
+		'liquidez_corrente': _razao(conta('1.01'), conta('2.01')),
+		'divida_liquida_pl': _razao(divida_liquida, pl),
+		'passivo_pl': _razao(ativo - pl, pl),
+	}
+
+
+def ranquear(matriz: MatrizFundamentos, indicador: str, crescente: bool = False,
+			 receita_minima: float = 0.0, limite: Optional[int] = None) -> np.ndarray:
+	"""
+	Índices das empresas ordenadas pelo indicador (NaN fica de fora), só as
+	com receita líquida >= receita_minima (R$).
+	"""
+	if indicador not in INDICADORES:
+		raise ValidationError(f"Indicador inválido: {indicador}")
+	valores = matriz.indicadores[indicador]
+	validos = ~np.isnan(valores)
+	if receita_minima:
+		validos &= matriz.valores[:, COLUNA['3.01']] >= receita_minima
+	indices = np.flatnonzero(validos)
+	ordem = np.argsort(valores[indices] if crescente else -valores[indices], kind='stable')
+	return indices[ordem][:limite]
+
+
+class ScreenerService:
+	"""Screener de indicadores sobre os demonstrativos importados."""
+
+	def __init__(self, conn=None):
+		conn = conn or get_conn()
+		self.repo = DemonstrativosRepo(conn)
+		self.run_repo = ImportRunRepo(conn)
+
+	def periodos(self) -> List[str]:
+		return self.repo.periodos()
+
+	def matriz(self, periodo: str | None = None) -> MatrizFundamentos:
+		"""Matriz do período (aaaa-mm-dd; None = o mais recente), do cache se não houve carga nova."""
+		if periodo is None:
+			periodos = self.repo.periodos()
+			if not periodos:
+				raise ValidationError("Nenhum demonstrativo importado (Importação → ITR/DFP)")
+			periodo = periodos[0]
+		carga = self.run_repo.ultima_execucao(TIPOS_IMPORTACAO)
+		em_cache = _cache.get(periodo)
+		if em_cache is not None and em_cache[0] == carga:
+			return em_cache[1]
+		matriz = montar_matriz(periodo, self.repo.valores_periodo(periodo, CODIGOS))
+		_cache[periodo] = (carga, matriz)
+		return matriz
@@ -0,0 +1,147 @@
+"""
+DRE em doze meses (TTM) a partir das ITRs (acumulado no ano) e DFPs (anual).
+
+Para cada empresa, grupo (consolidado/individual), conta da DRE e fim de
+trimestre:
+
+	TTM = acumulado do ano até o trimestre
+		+ anual do exercício anterior
+		- acumulado do exercício anterior até o mesmo trimestre
+
+No 4º trimestre o TTM é o próprio anual (DFP). Exercício social = ano
+civil, a regra das companhias abertas brasileiras.
+
+A tabela de DRE guarda uma linha por conta e trimestre: a do acumulado no
+ano (início em 01/01) ou a dos três meses, conforme o arquivo da CVM. O
+acumulado de uma linha de três meses é o do trimestre anterior mais ela.
+Trimestres sem os dados necessários ficam sem TTM (não viram zero). Linhas
+antigas com início do exercício desconhecido (igual ao fim) também ficam de
+fora, e a atualização informa quantos documentos estão nessa situação.
+
+Atualização incremental: só as empresas com linhas de DRE novas (id maior
+que a marca d'água de cia_aberta_dre_ttm_controle) são recalculadas, e só
+nos exercícios afetados (o das linhas novas e o seguinte, cujo TTM usa o
+anterior). A conta é em inteiros (reais x 10**4), sem Decimal por linha.
+"""
+from itertools import groupby
+from operator import itemgetter
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Tuple
+
+from ..db.connection import get_conn
+from ..db.repositories.fundamentos.ttm_repo import TtmRepo
+from ..core.decimal_ctx import MONEY_SCALE, scaled_str
+from ..core.utils import get_utc_timestamp
+
+# fim de trimestre (mm-dd) -> trimestre
+TRIMESTRES = {'03-31': 1, '06-30': 2, '09-30': 3, '12-31': 4}
+FIM_TRIMESTRE = {n: mmdd for mmdd, n in TRIMESTRES.items()}
+
+
+class AtualizacaoTtm(NamedTuple):
+	empresas: int                      # empresas recalculadas
+	linhas: int                        # linhas TTM gravadas
+	inicio_desconhecido: int           # documentos de DRE ignorados: início do exercício igual ao fim
+
+
+def _acumulados(linhas: Iterable[tuple]) -> Dict[Tuple[int, int], int]:
+	"""
+	{(ano, trimestre): acumulado no ano} de uma conta, em ordem de data.
+	`linhas` em ordem de data: (data_referencia, data_inicio_exercicio, valor).
+	"""
+	acumulado: Dict[Tuple[int, int], int] = {}
+	for data, inicio, valor in linhas:
+		trimestre = TRIMESTRES.get(data[5:10])
+		if trimestre is None:
+			continue
+		ano = int(data[:4])
+		if inicio[:10] == f'{ano}-01-01':
+			acumulado[(ano, trimestre)] = valor
+		elif trimestre > 1 and inicio[5:7] == f'{3 * trimestre - 2:02d}' and (ano, trimestre - 1) in acumulado:
+			# três meses: soma ao acumulado até o trimestre anterior
+			acumulado[(ano, trimestre)] = acumulado[(ano, trimestre - 1)] + valor
+	return acumulado
+
+
+def calcular_ttm(linhas: Iterable[tuple], atualizado_em: str,
+				 contagem: Dict[str, int] | None = None) -> Iterator[tuple]:
+	"""
+	Linhas de TtmRepo.iter_dre_empresas -> registros de cia_aberta_dre_ttm
+	(cnpj, grupo, codigo_conta, data_referencia, descricao_conta, valor,
+	atualizado_em) dos anos ano_inicio..ano_fim de cada empresa, na ordem
+	da chave primária.
+
+	De cada documento (cnpj, data) só conta a última versão: uma conta que
+	saiu numa reapresentação não fica com o valor antigo. Em `contagem`,
+	'inicio_desconhecido' soma os documentos com início do exercício igual
+	à data (linhas gravadas antes da importação ler DT_INI_EXERC).
+	"""
+	for (cnpj, ano_inicio, ano_fim), empresa in groupby(linhas, key=itemgetter(0, 1, 2)):
+		# (grupo, conta) -> {data: (início, valor)}, com as datas em ordem (a da consulta)
+		contas: Dict[Tuple[str, str], Dict[str, Tuple[str, int]]] = {}
+		descricoes: Dict[Tuple[str, str], str] = {}
+		for data, documento in groupby(empresa, key=itemgetter(5)):
+			documento = list(documento)
+			# as versões vêm em ordem: a última linha é da versão mais recente
+			ultima = documento[-1][6]
+			desconhecido = False
+			for _, _, _, grupo, codigo, _, versao, inicio, descricao, valor in documento:
+				if versao != ultima:
+					continue
+				contas.setdefault((grupo, codigo), {})[data] = (inicio, valor)
+				descricoes[(grupo, codigo)] = descricao
+				desconhecido = desconhecido or inicio[:10] == data[:10]
+			if desconhecido and contagem is not None:
+				contagem['inicio_desconhecido'] += 1
+
+		for chave in sorted(contas):
+			grupo, codigo = chave
+			datas = contas[chave]
+			acumulado = _acumulados((data, inicio, valor) for data, (inicio, valor) in datas.items())
+			for (ano, trimestre), valor in acumulado.items():
+				if not ano_inicio <= ano <= ano_fim:
+					continue
+				if trimestre != 4:
+					anual = acumulado.get((ano - 1, 4))
+					anterior = acumulado.get((ano - 1, trimestre))
+					if anual is None or anterior is None:
+						continue
+					valor = valor + anual - anterior
+				data = f'{ano}-{FIM_TRIMESTRE[trimestre]}'
+				yield cnpj, grupo, codigo, data, descricoes[chave], scaled_str(valor, MONEY_SCALE), atualizado_em
+
+
+class TtmService:
+	"""Cálculo e consulta da DRE TTM (cia_aberta_dre_ttm)."""
+
+	def __init__(self, conn=None):
+		self.repo = TtmRepo(conn or get_conn())
+
+	def atualizar(self, completo: bool = False) -> AtualizacaoTtm:
+		"""
+		Recalcula o TTM das empresas com DRE nova desde a última atualização
+		(todas, se `completo`). Retorna empresas recalculadas, linhas TTM
+		gravadas e documentos ignorados por início do exercício desconhecido.
+		"""
+		conn = self.repo.conn
+		ate_id = self.repo.max_id_dre()
+		desde_id = 0 if completo else self.repo.ultimo_id_processado()
+		try:
+			empresas = self.repo.preparar_empresas(desde_id, ate_id) if ate_id > desde_id else 0
+			gravadas = 0
+			contagem = {'inicio_desconhecido': 0}
+			if empresas:
+				atualizado_em = get_utc_timestamp()
+				gravadas = self.repo.substituir(calcular_ttm(self.repo.iter_dre_empresas(), atualizado_em, contagem))
+			self.repo.marcar_processado(ate_id, get_utc_timestamp())
+			conn.commit()
+		except Exception:
+			conn.rollback()
+			raise
+		return AtualizacaoTtm(empresas, gravadas, contagem['inicio_desconhecido'])
+
+	def serie(self, cnpj: str, codigos: Iterable[str], grupo: str | None = None) -> List[Tuple[str, str, str, str, str]]:
+		"""(grupo, codigo_conta, descricao_conta, data_referencia, valor) em ordem de data."""
+		return self.repo.serie(cnpj, codigos, grupo)
+
+	def contar(self) -> Tuple[int, int]:
+		return self.repo.contar()
@@ -0,0 +1,117 @@
+from colorama import Fore, Style
+from ..widgets import header, pause, confirm
+from ...core.utils import ValidationError
+from ...core.formatters import render_table, paint_header, paint_success, paint_warning, paint_error
+from ...services.ativos_service import AtivoService, TIPOS_ATIVO
+
+HEADERS_ATIVOS = ["Ticker", "Nome", "Tipo", "ISIN", "Emissor"]
+
+def _input(t):
+    return input(Fore.WHITE + t + Style.RESET_ALL)
+
+def _linhas(ativos):
+    return [[a['ticker'], a['nome'], a['tipo'], a['isin'] or "", a['emissor'] or a['cnpj_emissor'] or ""] for a in ativos]
+
+def tela_listar(service: AtivoService):
+    ativos = service.listar()
+    header("Ativos Cadastrados", {"Total": len(ativos)})
+    if not ativos:
+        print("Nenhum ativo cadastrado.")
+    else:
+        print(render_table(_linhas(ativos), HEADERS_ATIVOS, tablefmt='fancy_grid'))
+    pause()
+
+def tela_buscar(service: AtivoService):
+    """Busca por prefixo do ticker ou de uma palavra do nome (índice em memória)."""
+    header("Buscar Ativo", {"Ativos no índice": len(service.indice())})
+    while True:
+        prefixo = _input("Ticker ou nome (ENTER p/ voltar): ").strip()
+        if not prefixo:
+            return
+        encontrados = service.buscar(prefixo, limite=15)
+        if encontrados:
+            print(render_table(_linhas(encontrados), HEADERS_ATIVOS, tablefmt='fancy_grid'))
+        else:
+            print(paint_warning(f"Nenhum ativo encontrado para '{prefixo}'."))
+        print()
+
+def _ler_campos(atual: dict | None = None):
+    """Lê nome, tipo, ISIN e CNPJ do emissor (ENTER mantém o valor atual na edição)."""
+    atual = atual or {}
+    def campo(rotulo, chave):
+        padrao = atual.get(chave) or ""
+        valor = _input(f"{rotulo}" + (f" [{padrao}]" if padrao else "") + ": ").strip()
+        return valor or padrao
+    nome = campo("Nome", 'nome')
+    tipo = campo(f"Tipo ({'/'.join(TIPOS_ATIVO)})", 'tipo')
+    isin = campo("ISIN (opcional)", 'isin')
+    cnpj = campo("CNPJ do emissor (opcional)", 'cnpj_emissor')
+    return nome, tipo, isin, cnpj
+
+def _avisar_emissor(service: AtivoService, cnpj: str):
+    if cnpj and not service.emissor_importado(cnpj):
+        print(paint_warning("⚠️  Emissor não encontrado no cadastro de empresas (importe o FCA)."))
+
+def tela_cadastrar(service: AtivoService):
+    header("Cadastrar Ativo")
+    ticker = _input("Ticker: ").strip()
+    nome, tipo, isin, cnpj = _ler_campos()
+    try:
+        service.cadastrar(ticker, nome, tipo, isin, cnpj)
+        print(paint_success(f"✅ Ativo {ticker.upper()} cadastrado."))
+        _avisar_emissor(service, cnpj)
+    except ValidationError as e:
+        print(paint_error(f"❌ {str(e)}"))
+    pause()
+
+def tela_editar(service: AtivoService):
+    header("Editar Ativo")
+    ticker = _input("Ticker: ").strip()
+    ativo = service.resolver(ticker)
+    if not ativo:
+        print(paint_error(f"❌ Ticker não cadastrado: {ticker.upper()}")); pause(); return
+    print(render_table(_linhas([ativo]), HEADERS_ATIVOS, tablefmt='fancy_grid'))
+    nome, tipo, isin, cnpj = _ler_campos(ativo)
+    try:
+        service.atualizar(ticker, nome, tipo, isin, cnpj)
+        print(paint_success(f"✅ Ativo {ticker.upper()} atualizado."))
+        _avisar_emissor(service, cnpj)
+    except ValidationError as e:
+        print(paint_error(f"❌ {str(e)}"))
+    pause()
+
+def tela_remover(service: AtivoService):
+    header("Remover Ativo")
+    ticker = _input("Ticker: ").strip()
+    ativo = service.resolver(ticker)
+    if not ativo:
+        print(paint_error(f"❌ Ticker não cadastrado: {ticker.upper()}")); pause(); return
+    print(render_table(_linhas([ativo]), HEADERS_ATIVOS, tablefmt='fancy_grid'))
+    if not confirm(f"Remover {ativo['ticker']} (S/N)? "):
+        print("Cancelado."); pause(); return
+    try:
+        service.remover(ticker)
+        print(paint_success(f"✅ Ativo {ativo['ticker']} removido."))
+    except ValidationError as e:
+        print(paint_error(f"❌ {str(e)}"))
+    pause()
+
+def ativos_loop():
+    service = AtivoService()
+    keep = True
+    while keep:
+        header("Cadastro de Ativos")
+        print("1. Listar ativos")
+        print("2. Buscar (ticker ou nome)")
+        print("3. Cadastrar ativo")
+        print("4. Editar ativo")
+        print("5. Remover ativo")
+        print("6. Voltar")
+        ch = _input("> ").strip()
+        match ch:
+            case "1": tela_listar(service)
+            case "2": tela_buscar(service)
+            case "3": tela_cadastrar(service)
+            case "4": tela_editar(service)
+            case "5": tela_remover(service)
+            case _: keep = False
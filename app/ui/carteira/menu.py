@@ -0,0 +1,57 @@
+import time
+from colorama import Fore, Style
+from ..widgets import header, pause
+from ...core.utils import parse_date, ValidationError
+from ...core.formatters import (
+    render_table, paint_header, paint_warning, paint_error,
+    fmt_money, fmt_qty, fmt_pct, fmt_profit, fmt_profit_pct,
+)
+
+HEADERS_CARTEIRA = [
+    "Ticker", "Quantidade", "Custo Médio", "Custo Total", "Preço", "Valor Mercado",
+    "Lucro Não Realiz.", "%", "Lucro Realizado", "Proventos", "Alocação",
+]
+
+def _input(t):
+    return input(Fore.WHITE + t + Style.RESET_ALL)
+
+def tela_carteira():
+    """Carteira avaliada a partir da movimentação e da posição importadas da B3."""
+    header("Carteira")
+    data_input = _input("Avaliar até a data (dd/mm/aaaa) [hoje]: ").strip()
+    try:
+        ate = parse_date(data_input) if data_input else None
+    except ValidationError as e:
+        print(paint_error(f"❌ {str(e)}")); pause(); return
+
+    from ...services.carteira_service import CarteiraService, totais
+    inicio = time.perf_counter()
+    posicoes = CarteiraService().avaliar(ate)
+    segundos = time.perf_counter() - inicio
+
+    header("Carteira", {"Até": ate or "hoje", "Ativos": len(posicoes)})
+    if not posicoes:
+        print(paint_warning("Nenhuma movimentação importada (Importação → 5. [B3] Movimentação)."))
+        pause()
+        return
+
+    rows = [[
+        p.ticker, fmt_qty(p.quantidade), fmt_money(p.custo_medio), fmt_money(p.custo_total),
+        fmt_money(p.preco), fmt_money(p.valor_mercado), fmt_profit(p.lucro_nao_realizado),
+        fmt_profit_pct(p.lucro_nao_realizado_pct), fmt_profit(p.lucro_realizado),
+        fmt_money(p.proventos), fmt_pct(p.alocacao_pct),
+    ] for p in posicoes]
+    print(render_table(rows, HEADERS_CARTEIRA, tablefmt='fancy_grid'))
+    print()
+
+    custo, mercado, nao_realizado, realizado, proventos = totais(posicoes)
+    print(f"💰 {paint_header('Custo total:')} {fmt_money(custo)}  |  "
+          f"{paint_header('Valor de mercado:')} {fmt_money(mercado)}  |  "
+          f"{paint_header('Não realizado:')} {fmt_profit(nao_realizado)}")
+    print(f"📈 {paint_header('Lucro realizado:')} {fmt_profit(realizado)}  |  "
+          f"{paint_header('Proventos:')} {fmt_money(proventos)}")
+    sem_preco = [p.ticker for p in posicoes if p.preco is None and p.quantidade > 0]
+    if sem_preco:
+        print(paint_warning(f"⚠️  Sem cotação (importe a posição B3): {', '.join(sem_preco)}"))
+    print(f"⏱️  Avaliado em {segundos * 1000:.1f} ms")
+    pause()
@@ -0,0 +1,253 @@
+import math
+import time
+from decimal import Decimal
+from colorama import Fore, Style
+from ..widgets import header, pause
+from ...core.utils import ValidationError, normalize_cnpj, parse_date
+from ...core.formatters import render_table, paint_header, paint_warning, paint_error, paint_success, fmt_money, fmt_profit_pct
+
+def _input(t):
+    return input(Fore.WHITE + t + Style.RESET_ALL)
+
+def _fmt_indicador(valor, percentual):
+    if math.isnan(valor):
+        return "N/D"
+    if percentual:
+        return fmt_profit_pct(valor)
+    return f"{valor:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
+
+def _escolher_periodo(service):
+    periodos = service.periodos()
+    if not periodos:
+        raise ValidationError("Nenhum demonstrativo importado (Importação → ITR/DFP)")
+    recentes = periodos[:8]
+    print("Períodos: " + "  ".join(f"{i}. {p}" for i, p in enumerate(recentes, start=1)))
+    ch = _input(f"Período [1 = {recentes[0]}]: ").strip()
+    if not ch:
+        return recentes[0]
+    if ch.isdigit() and 1 <= int(ch) <= len(recentes):
+        return recentes[int(ch) - 1]
+    if ch in periodos:
+        return ch
+    raise ValidationError(f"Período inválido: {ch}")
+
+def tela_screener():
+    """Ranking de todas as empresas por um indicador, no período escolhido."""
+    from ...services.screener_service import ScreenerService, INDICADORES, ranquear
+    service = ScreenerService()
+    header("Screener de Fundamentos")
+    try:
+        periodo = _escolher_periodo(service)
+        chaves = list(INDICADORES)
+        print()
+        for i, chave in enumerate(chaves, start=1):
+            print(f"{i}. {INDICADORES[chave][0]}")
+        ch = _input("Indicador [1]: ").strip() or "1"
+        if not (ch.isdigit() and 1 <= int(ch) <= len(chaves)):
+            raise ValidationError(f"Indicador inválido: {ch}")
+        indicador = chaves[int(ch) - 1]
+        crescente = _input("Ordem (D)ecrescente/(C)rescente [D]: ").strip().upper() == "C"
+        receita_input = _input("Receita líquida mínima no período (R$ milhões) [0]: ").strip().replace(",", ".")
+        receita_minima = float(receita_input) * 1e6 if receita_input else 0.0
+    except ValueError:
+        print(paint_error("❌ Valor inválido")); pause(); return
+    except ValidationError as e:
+        print(paint_error(f"❌ {str(e)}")); pause(); return
+
+    inicio = time.perf_counter()
+    matriz = service.matriz(periodo)
+    indices = ranquear(matriz, indicador, crescente, receita_minima, limite=30)
+    segundos = time.perf_counter() - inicio
+
+    header("Screener de Fundamentos", {
+        "Período": periodo, "Indicador": INDICADORES[indicador][0], "Empresas": len(matriz.cnpjs),
+    })
+    if not len(indices):
+        print(paint_warning("Nenhuma empresa com o indicador calculável no período."))
+        pause()
+        return
+
+    headers = ["#", "Empresa", "DF"] + [rotulo for rotulo, _ in INDICADORES.values()]
+    rows = []
+    for pos, i in enumerate(indices.tolist(), start=1):
+        rows.append([pos, matriz.razoes_sociais[i][:40], "Cons." if matriz.consolidado[i] else "Ind."] + [
+            _fmt_indicador(float(matriz.indicadores[chave][i]), percentual)
+            for chave, (_, percentual) in INDICADORES.items()
+        ])
+    print(render_table(rows, headers, tablefmt='fancy_grid'))
+    print(f"⏱️  {paint_header('Calculado em')} {segundos * 1000:.1f} ms (DRE do período, sem anualizar)")
+    pause()
+
+CONTAS_TTM = {"3.01": "Receita Líquida", "3.03": "Resultado Bruto", "3.05": "EBIT", "3.11": "Lucro Líquido"}
+
+def tela_ttm():
+    """DRE em doze meses (TTM) de uma empresa, trimestre a trimestre."""
+    from ...services.ttm_service import TtmService
+    header("DRE TTM (doze meses)")
+    cnpj = normalize_cnpj(_input("CNPJ da empresa: ").strip())
+    serie = TtmService().serie(cnpj, CONTAS_TTM)
+    if not serie:
+        print(paint_warning("Sem TTM para este CNPJ (importe ITR e DFP de dois exercícios)."))
+        pause()
+        return
+    # consolidado, se a empresa tiver
+    grupo = "DF Consolidado" if any(g == "DF Consolidado" for g, *_ in serie) else serie[0][0]
+    por_data = {}
+    for g, codigo, _, data, valor in serie:
+        if g == grupo:
+            por_data.setdefault(data, {})[codigo] = Decimal(valor)
+    datas = sorted(por_data)[-12:]
+    rows = [[data] + [fmt_money(por_data[data].get(codigo)) for codigo in CONTAS_TTM] for data in datas]
+
+    header("DRE TTM (doze meses)", {"CNPJ": cnpj, "Grupo": grupo})
+    print(render_table(rows, ["Trimestre"] + list(CONTAS_TTM.values()), tablefmt='fancy_grid'))
+    pause()
+
+def tela_recalcular_ttm():
+    from ...services.ttm_service import TtmService
+    header("Recalcular DRE TTM")
+    inicio = time.perf_counter()
+    resultado = TtmService().atualizar(completo=True)
+    print(paint_success(f"✅ {resultado.empresas} empresas, {resultado.linhas} linhas TTM "
+                        f"em {time.perf_counter() - inicio:.2f}s"))
+    if resultado.inicio_desconhecido:
+        print(paint_warning(f"⚠️  {resultado.inicio_desconhecido} documento(s) de DRE sem início do exercício "
+                            "(importados antes de DT_INI_EXERC) ficaram fora do TTM"))
+    pause()
+
+def tela_arvore_contas():
+    """Subárvore de contas de um demonstrativo, com os subtotais que não fecham."""
+    from ...services.plano_contas_service import PlanoContasService, DEMONSTRATIVOS
+    service = PlanoContasService()
+    header("Árvore de Contas")
+    try:
+        cnpj = normalize_cnpj(_input("CNPJ da empresa: ").strip())
+        data = parse_date(_input("Data de referência (dd/mm/aaaa): ").strip())
+        if not data:
+            raise ValidationError("Data de referência obrigatória")
+        demonstrativo = (_input("Demonstrativo (BPA/BPP/DRE) [BPA]: ").strip() or "bpa").lower()
+        if demonstrativo not in DEMONSTRATIVOS:
+            raise ValidationError(f"Demonstrativo inválido: {demonstrativo}")
+        tabela, raiz_padrao = DEMONSTRATIVOS[demonstrativo]
+        raiz = _input(f"Conta raiz [{raiz_padrao}]: ").strip() or raiz_padrao
+        tolerancia_input = _input("Tolerância (na escala do documento) [0]: ").strip().replace(",", ".")
+        tolerancia = Decimal(tolerancia_input) if tolerancia_input else Decimal("0")
+        arvore = service.arvore(tabela, cnpj, data, raiz, tolerancia=tolerancia)
+    except ArithmeticError:
+        print(paint_error("❌ Valor inválido")); pause(); return
+    except ValidationError as e:
+        print(paint_error(f"❌ {str(e)}")); pause(); return
+
+    header("Árvore de Contas", {
+        "CNPJ": cnpj, "Data": data, "Versão": arvore.versao, "Grupo": arvore.grupo, "Escala": arvore.escala,
+    })
+    if not arvore.contas:
+        print(paint_warning(f"Conta {raiz} não encontrada no documento."))
+        pause()
+        return
+    nivel_raiz = arvore.contas[0].nivel
+    rows = []
+    for conta in arvore.contas:
+        descricao = "  " * (conta.nivel - nivel_raiz) + conta.descricao[:60]
+        divergencia = paint_error(fmt_money(conta.divergencia)) if conta.divergencia is not None else ""
+        rows.append([conta.codigo, descricao, fmt_money(conta.valor), divergencia])
+    print(render_table(rows, ["Conta", "Descrição", "Valor", "Valor - Σ filhos"], tablefmt='fancy_grid', numparse=False))
+    if arvore.divergentes:
+        print(paint_warning(f"⚠️  {arvore.divergentes} subtotal(is) não fecha(m) com a soma dos filhos no documento."))
+    else:
+        print(paint_success("✅ Todos os subtotais do documento fecham com a soma dos filhos."))
+    pause()
+
+def _fmt_diferenca(valor):
+    return fmt_money(valor) if valor is not None else "—"
+
+def tela_reapresentacao():
+    """Diferenças conta a conta entre duas versões de um documento."""
+    from ...services.reapresentacao_service import ReapresentacaoService
+    service = ReapresentacaoService()
+    header("Reapresentação de Documento")
+    try:
+        cnpj = normalize_cnpj(_input("CNPJ da empresa: ").strip())
+        data = parse_date(_input("Data de referência (dd/mm/aaaa): ").strip())
+        if not data:
+            raise ValidationError("Data de referência obrigatória")
+        versoes = service.versoes(cnpj, data)
+        if versoes:
+            print(f"Versões importadas: {', '.join(map(str, versoes))}")
+        v1 = _input("Versão anterior [penúltima]: ").strip()
+        v2 = _input("Versão atual [última]: ").strip()
+        reapresentacao = service.comparar(cnpj, data, versao_anterior=int(v1) if v1 else None, versao=int(v2) if v2 else None)
+    except ValueError:
+        print(paint_error("❌ Versão inválida")); pause(); return
+    except ValidationError as e:
+        print(paint_error(f"❌ {str(e)}")); pause(); return
+
+    header("Reapresentação de Documento", {
+        "Empresa": reapresentacao.razao_social or cnpj, "Data": data,
+        "Versões": f"{reapresentacao.versao_anterior} → {reapresentacao.versao}",
+    })
+    if not reapresentacao.diferencas:
+        print(paint_success("✅ Nenhum valor de conta mudou entre as versões."))
+        pause()
+        return
+    rows = [
+        [d.codigo, d.descricao[:50], _fmt_diferenca(d.anterior), _fmt_diferenca(d.atual),
+         _fmt_diferenca(d.delta), fmt_profit_pct(d.delta_pct) if d.delta_pct is not None else "—"]
+        for d in reapresentacao.diferencas
+    ]
+    print(render_table(rows, ["Conta", "Descrição", "Anterior", "Atual", "Δ", "Δ %"], tablefmt='fancy_grid', numparse=False))
+    print(f"{len(rows)} conta(s) alterada(s) — {reapresentacao.diferencas[0].grupo}, valores em R$")
+    pause()
+
+def tela_reapresentacoes_ano():
+    """Todas as reapresentações de um ano, no mercado inteiro."""
+    from ...services.reapresentacao_service import ReapresentacaoService
+    header("Reapresentações do Ano")
+    try:
+        ano = int(_input("Ano de referência: ").strip())
+        minimo_input = _input("Variação mínima por conta (%) [0]: ").strip().replace(",", ".")
+        minimo_pct = Decimal(minimo_input) if minimo_input else Decimal("0")
+    except (ValueError, ArithmeticError):
+        print(paint_error("❌ Valor inválido")); pause(); return
+
+    inicio = time.perf_counter()
+    reapresentacoes = ReapresentacaoService().reapresentacoes(ano, minimo_pct)
+    segundos = time.perf_counter() - inicio
+
+    header("Reapresentações do Ano", {"Ano": ano, "Documentos reapresentados": len(reapresentacoes)})
+    com_diferencas = sorted((r for r in reapresentacoes if r.diferencas), key=lambda r: len(r.diferencas), reverse=True)
+    if not com_diferencas:
+        print(paint_warning("Nenhuma reapresentação com valores de conta alterados no ano."))
+        pause()
+        return
+    rows = []
+    for r in com_diferencas[:40]:
+        maior = max((d for d in r.diferencas if d.delta_pct is not None), key=lambda d: abs(d.delta_pct), default=None)
+        rows.append([
+            r.razao_social[:40], r.data_referencia, f"{r.versao_anterior} → {r.versao}", len(r.diferencas),
+            f"{maior.codigo} {fmt_profit_pct(maior.delta_pct)}" if maior else "—",
+        ])
+    print(render_table(rows, ["Empresa", "Data", "Versões", "Contas alteradas", "Maior variação"], tablefmt='fancy_grid'))
+    print(f"⏱️  {paint_header('Calculado em')} {segundos * 1000:.1f} ms")
+    pause()
+
+def fundamentos_loop():
+    keep = True
+    while keep:
+        header("Análise Fundamentalista")
+        print("1. Screener de indicadores")
+        print("2. DRE TTM de uma empresa")
+        print("3. Recalcular DRE TTM (todas as empresas)")
+        print("4. Árvore de contas / conferir subtotais")
+        print("5. Reapresentação de um documento (diferença entre versões)")
+        print("6. Reapresentações do ano (mercado inteiro)")
+        print("7. Voltar")
+        ch = _input("> ").strip()
+        match ch:
+            case "1": tela_screener()
+            case "2": tela_ttm()
+            case "3": tela_recalcular_ttm()
+            case "4": tela_arvore_contas()
+            case "5": tela_reapresentacao()
+            case "6": tela_reapresentacoes_ano()
+            case _: keep = False
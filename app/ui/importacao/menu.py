@@ -1,16 +1,84 @@
+import time
 from colorama import Fore, Style
 from datetime import datetime
 from ..widgets import title, pause
-from ...core.utils import clear_screen
+from ...core.utils import clear_screen, ValidationError
 from ...core.formatters import render_table, paint_header, paint_success, paint_warning, paint_error
-from ...services.importacao.fca_import_service import FcaImportService , ValidationError
-from ...services.importacao.itr_import_service import ItrImportService
-from ...services.importacao.dfp_import_service import DfpImportService
+from ..progresso import TqdmProgresso
 
 
+ETAPAS_IMPORTACAO = [
+    ("download", "Download"),
+    ("extracao", "Extração"),
+    ("parse", "Leitura/validação"),
+    ("escrita", "Gravação"),
+    ("commit", "Commit"),
+]
+
 def _input(t):
     return input(Fore.WHITE + t + Style.RESET_ALL)
 
+def _print_metricas(metricas):
+    """Tabela de tempos por etapa + volume, vazão e memória da importação."""
+    rows = [[label, f"{metricas.tempos[etapa]:.2f}"] for etapa, label in ETAPAS_IMPORTACAO]
+    rows.append(["Total", f"{metricas.duracao:.2f}"])
+    print(render_table(rows, ["Etapa", "Tempo (s)"], tablefmt='fancy_grid'))
+    print(f"📦 {paint_header('Baixado:')} {metricas.bytes_baixados / 1024 / 1024:.1f} MB  |  "
+          f"{paint_header('Linhas/s:')} {metricas.linhas_por_segundo:,.0f}  |  "
+          f"{paint_header('Pico de memória:')} {metricas.pico_memoria_kb / 1024:.0f} MB")
+
+def _print_erros(coletor, limite=10):
+    """Erros por categoria, últimas mensagens e caminho do arquivo de rejeitados."""
+    if not coletor or not coletor.total:
+        return
+    print()
+    print(paint_warning("⚠️  Detalhes dos erros:"))
+    print(render_table(coletor.resumo(), ["Categoria", "Quantidade"], tablefmt='fancy_grid'))
+    # Mostrar apenas as últimas mensagens para não poluir a tela
+    amostras = list(coletor.amostras)[-limite:]
+    for erro in amostras:
+        print(f"   • {erro}")
+    if coletor.total > len(amostras):
+        print(f"   • ... e mais {coletor.total - len(amostras)} erros")
+    if coletor.caminho_rejeitados:
+        print(f"📄 {paint_header('Linhas rejeitadas:')} {coletor.caminho_rejeitados}")
+
+def _atualizar_ttm():
+    """
+    Recalcula a DRE TTM das empresas com demonstrativos novos (após ITR/DFP).
+    A importação já foi gravada: uma falha aqui é só um aviso.
+    """
+    from ...services.ttm_service import TtmService
+    inicio = time.perf_counter()
+    try:
+        resultado = TtmService().atualizar()
+    except Exception as e:
+        print(paint_warning(f"⚠️  DRE TTM não atualizada: {e} (Análise Fundamentalista → Recalcular DRE TTM)"))
+        return
+    print(f"🔁 {paint_header('DRE TTM:')} {resultado.empresas} empresas recalculadas, "
+          f"{resultado.linhas} linhas em {time.perf_counter() - inicio:.2f}s")
+    if resultado.inicio_desconhecido:
+        print(paint_warning(f"⚠️  {resultado.inicio_desconhecido} documento(s) de DRE sem início do exercício "
+                            "(importados antes de DT_INI_EXERC) ficaram fora do TTM"))
+
+def _alertar_reapresentacoes(ano):
+    """
+    Documentos do ano reapresentados com valores de conta alterados (após
+    ITR/DFP). Como o TTM, uma falha aqui não desfaz a importação: só avisa.
+    """
+    from ...services.reapresentacao_service import ReapresentacaoService
+    try:
+        alterados = [r for r in ReapresentacaoService().reapresentacoes(ano) if r.diferencas]
+    except Exception as e:
+        print(paint_warning(f"⚠️  Reapresentações de {ano} não verificadas: {e}"))
+        return
+    if not alterados:
+        return
+    print(paint_warning(f"⚠️  {len(alterados)} documento(s) de {ano} reapresentado(s) com valores alterados "
+                        f"(Análise Fundamentalista → Reapresentações do ano)"))
+    for r in sorted(alterados, key=lambda r: len(r.diferencas), reverse=True)[:5]:
+        print(f"   {r.razao_social[:40]} {r.data_referencia} v{r.versao_anterior}→v{r.versao}: {len(r.diferencas)} contas")
+
 #* IMPORTACAO DFP - INFORMAÇÕES ANUAIS
 def importar_dfp_flow():
     """Importação DFP - Informações anuais de Empresas CVM com formatação tabular."""
@@ -53,7 +121,8 @@ def importar_dfp_flow():
     print()
 
     try:
-        dfp_service = DfpImportService()
+        from ...services.importacao.dfp_import_service import DfpImportService
+        dfp_service = DfpImportService(progresso=TqdmProgresso())
         resumo = dfp_service.importar_por_ano(year)
 
         # Relatório final com tabela
@@ -64,7 +133,7 @@ def importar_dfp_flow():
         print()
         
         # Tabela de resultados
-        headers = ["Arquivo", "Total Registros", "Inseridos", "Atualizados", "Ignorados", "Erros" ]
+        headers = ["Arquivo", "Total Registros", "Inseridos", "Atualizados", "Ignorados", "Erros", "Tempo (s)", "Linhas/s" ]
         rows = resumo
         
         print(render_table(rows, headers, tablefmt='fancy_grid'))
@@ -74,18 +143,15 @@ def importar_dfp_flow():
         processados = sum(r[1] for r in resumo)
         
         print(f"📈 {paint_header('Total processado:')} {processados} registros")
+        print()
+        _print_metricas(dfp_service.metricas[year])
         
         # Mostrar erros se houver
-        # if erros > 0 and lista_erros:
-        #     print()
-        #     print(paint_warning("⚠️  Detalhes dos erros:"))
-        #     # Mostrar apenas os primeiros 10 erros para não poluir a tela
-        #     for erro in lista_erros[:10]:
-        #         print(f"   • {erro}")
-        #     if len(lista_erros) > 10:
-        #         print(f"   • ... e mais {len(lista_erros) - 10} erros")
+        _print_erros(dfp_service.erros.get(year))
         
         print()
+        _atualizar_ttm()
+        _alertar_reapresentacoes(year)
         print(paint_success("✅ Importação concluída com sucesso!"))
 
     except ValidationError as e:
@@ -149,7 +215,8 @@ def importar_itr_flow():
     print()
 
     try:
-        itr_service = ItrImportService()
+        from ...services.importacao.itr_import_service import ItrImportService
+        itr_service = ItrImportService(progresso=TqdmProgresso())
         resumo = itr_service.importar_por_ano(year)
 
         # Relatório final com tabela
@@ -160,7 +227,7 @@ def importar_itr_flow():
         print()
         
         # Tabela de resultados
-        headers = ["Arquivo", "Total Registros", "Inseridos", "Atualizados", "Ignorados", "Erros" ]
+        headers = ["Arquivo", "Total Registros", "Inseridos", "Atualizados", "Ignorados", "Erros", "Tempo (s)", "Linhas/s" ]
         rows = resumo
         
         print(render_table(rows, headers, tablefmt='fancy_grid'))
@@ -170,18 +237,15 @@ def importar_itr_flow():
         processados = sum(r[1] for r in resumo)
         
         print(f"📈 {paint_header('Total processado:')} {processados} registros")
+        print()
+        _print_metricas(itr_service.metricas[year])
         
         # Mostrar erros se houver
-        # if erros > 0 and lista_erros:
-        #     print()
-        #     print(paint_warning("⚠️  Detalhes dos erros:"))
-        #     # Mostrar apenas os primeiros 10 erros para não poluir a tela
-        #     for erro in lista_erros[:10]:
-        #         print(f"   • {erro}")
-        #     if len(lista_erros) > 10:
-        #         print(f"   • ... e mais {len(lista_erros) - 10} erros")
+        _print_erros(itr_service.erros.get(year))
         
         print()
+        _atualizar_ttm()
+        _alertar_reapresentacoes(year)
         print(paint_success("✅ Importação concluída com sucesso!"))
 
     except ValidationError as e:
@@ -245,7 +309,8 @@ def importar_fca_cadastro_empresas_flow():
     print()
 
     try:
-        fca_service = FcaImportService()
+        from ...services.importacao.fca_import_service import FcaImportService
+        fca_service = FcaImportService(progresso=TqdmProgresso())
         inseridos, atualizados, ignorados, erros, lista_erros = fca_service.importar_fca_por_ano(year)
 
         # Relatório final com tabela
@@ -269,16 +334,11 @@ def importar_fca_cadastro_empresas_flow():
         
         total_processado = inseridos + atualizados + ignorados + erros
         print(f"📈 {paint_header('Total processado:')} {total_processado} registros")
+        print()
+        _print_metricas(fca_service.metricas[year])
         
         # Mostrar erros se houver
-        if erros > 0 and lista_erros:
-            print()
-            print(paint_warning("⚠️  Detalhes dos erros:"))
-            # Mostrar apenas os primeiros 10 erros para não poluir a tela
-            for erro in lista_erros[:10]:
-                print(f"   • {erro}")
-            if len(lista_erros) > 10:
-                print(f"   • ... e mais {len(lista_erros) - 10} erros")
+        _print_erros(fca_service.erros.get(year))
         
         if inseridos > 0 or atualizados > 0:
             print()
@@ -303,6 +363,270 @@ def importar_fca_cadastro_empresas_flow():
     print()
     pause()
 
+#* IMPORTACAO B3 - POSIÇÃO CONSOLIDADA
+def importar_posicao_b3_flow():
+    """Importação da posição consolidada da B3 (arquivos exportados da Área do Investidor)."""
+    clear_screen()
+    title("B3 | Importar Posição Consolidada")
+
+    pasta_padrao = "./imports/b3"
+
+    print("📋 " + paint_header("Posição Consolidada - Área do Investidor B3"))
+    print("   Arquivos: .xlsx (uma aba por categoria) ou .csv, um por data")
+    print("   Data da posição: do nome do arquivo (posicao-aaaa-mm-dd-...)")
+    print()
+
+    caminho = _input(f"Arquivo ou pasta para importação [{pasta_padrao}]: ").strip() or pasta_padrao
+    data_referencia = _input("Data da posição (dd/mm/aaaa) [do nome do arquivo]: ").strip() or None
+
+    print()
+    print(f"🚀 Iniciando importação da posição B3 de {paint_header(caminho)}...")
+    print()
+
+    try:
+        from ...services.importacao.b3_posicao_import_service import B3PosicaoImportService
+        b3_service = B3PosicaoImportService(progresso=TqdmProgresso())
+        resumo = b3_service.importar([caminho], data_referencia)
+
+        # Relatório final com tabela
+        clear_screen()
+        title("Importação Posição B3 - Relatório Final")
+
+        headers = ["Arquivo", "Total Registros", "Inseridos", "Atualizados", "Ignorados", "Removidos", "Erros", "Tempo (s)", "Linhas/s" ]
+        print(render_table(resumo, headers, tablefmt='fancy_grid'))
+        print()
+
+        processados = sum(r[1] for r in resumo)
+        print(f"📈 {paint_header('Total processado:')} {processados} posições")
+        print(f"📅 {paint_header('Datas importadas:')} {len(b3_service.datas_importadas())}")
+        print()
+        _print_metricas(b3_service.metricas)
+
+        # Mostrar erros se houver
+        _print_erros(b3_service.erros)
+
+        print()
+        print(paint_success("✅ Importação concluída com sucesso!"))
+
+    except ValidationError as e:
+        clear_screen()
+        title(paint_error("Erro na Importação da Posição B3"))
+        print()
+        print(paint_error(f"❌ {str(e)}"))
+        print()
+        print("Verifique os parâmetros e tente novamente.")
+
+    except Exception as e:
+        clear_screen()
+        title(paint_error("Erro Inesperado"))
+        print()
+        print(paint_error(f"❌ Erro durante importação: {str(e)}"))
+        print()
+        print("Verifique o arquivo e tente novamente.")
+
+    print()
+    pause()
+
+#* IMPORTACAO B3 - MOVIMENTAÇÃO
+def importar_movimentacao_b3_flow():
+    """Importação do extrato de movimentação da B3 (períodos sobrepostos são deduplicados)."""
+    clear_screen()
+    title("B3 | Importar Movimentação")
+
+    pasta_padrao = "./imports/b3/movimentacao"
+
+    print("📋 " + paint_header("Extrato de Movimentação - Área do Investidor B3"))
+    print("   Arquivos: .xlsx ou .csv; períodos sobrepostos podem ser importados de novo")
+    print("   (só as movimentações ainda não gravadas entram)")
+    print()
+
+    caminho = _input(f"Arquivo ou pasta para importação [{pasta_padrao}]: ").strip() or pasta_padrao
+
+    print()
+    print(f"🚀 Iniciando importação da movimentação B3 de {paint_header(caminho)}...")
+    print()
+
+    try:
+        from ...services.importacao.b3_movimentacao_import_service import B3MovimentacaoImportService
+        b3_service = B3MovimentacaoImportService(progresso=TqdmProgresso())
+        resumo = b3_service.importar([caminho])
+
+        # Relatório final com tabela
+        clear_screen()
+        title("Importação Movimentação B3 - Relatório Final")
+
+        headers = ["Arquivo", "Total Registros", "Inseridos", "Atualizados", "Ignorados", "Erros", "Tempo (s)", "Linhas/s" ]
+        print(render_table(resumo, headers, tablefmt='fancy_grid'))
+        print()
+
+        processados = sum(r[1] for r in resumo)
+        print(f"📈 {paint_header('Total processado:')} {processados} movimentações")
+        periodo = b3_service.periodo()
+        if periodo:
+            inicio, fim, total = periodo
+            print(f"📅 {paint_header('Histórico gravado:')} {total} movimentações de {inicio} a {fim}")
+        print()
+        _print_metricas(b3_service.metricas)
+
+        # Mostrar erros se houver
+        _print_erros(b3_service.erros)
+
+        print()
+        print(paint_success("✅ Importação concluída com sucesso!"))
+
+    except ValidationError as e:
+        clear_screen()
+        title(paint_error("Erro na Importação da Movimentação B3"))
+        print()
+        print(paint_error(f"❌ {str(e)}"))
+        print()
+        print("Verifique os parâmetros e tente novamente.")
+
+    except Exception as e:
+        clear_screen()
+        title(paint_error("Erro Inesperado"))
+        print()
+        print(paint_error(f"❌ Erro durante importação: {str(e)}"))
+        print()
+        print("Verifique o arquivo e tente novamente.")
+
+    print()
+    pause()
+
+#* IMPORTACAO CVM - CADASTRO DE FUNDOS
+def importar_cadastro_fundos_flow():
+    """Importação do Cadastro de Fundos de Investimento da CVM (cad_fi.csv)."""
+    clear_screen()
+    title("CVM - Fundos | Importar Cadastro de Fundos")
+
+    print("📋 " + paint_header("Cadastro de Fundos de Investimento (cad_fi)"))
+    print(f"   Fonte: CVM - Comissão de Valores Mobiliários")
+    print(f"   Carga completa do cadastro atual (um registro por CNPJ)")
+    print()
+    print(f"🚀 Iniciando importação do cadastro de fundos...")
+    print("   Este processo pode levar alguns minutos...")
+    print()
+
+    try:
+        from ...services.importacao.fundos_import_service import FundosImportService
+        fundos_service = FundosImportService(progresso=TqdmProgresso())
+        inseridos, atualizados, ignorados, erros, lista_erros = fundos_service.importar_cadastro()
+
+        # Relatório final com tabela
+        clear_screen()
+        title("Importação Cadastro de Fundos - Relatório Final")
+
+        headers = ["Operação", "Quantidade", "Descrição"]
+        rows = [
+            ["Inseridos", paint_success(inseridos), "Novos fundos cadastrados"],
+            ["Atualizados", paint_warning(atualizados), "Fundos com dados atualizados"],
+            ["Ignorados", ignorados, "Fundos sem alteração ou registros antigos"],
+            ["Erros", paint_error(erros), "Linhas com problemas de validação"]
+        ]
+
+        print(render_table(rows, headers, tablefmt='fancy_grid'))
+        print()
+
+        total_processado = inseridos + atualizados + ignorados + erros
+        print(f"📈 {paint_header('Total processado:')} {total_processado} registros")
+        print()
+        print(render_table(fundos_service.contar_por_situacao(), ["Situação", "Fundos"], tablefmt='fancy_grid'))
+        print()
+        _print_metricas(fundos_service.metricas)
+
+        # Mostrar erros se houver
+        _print_erros(fundos_service.erros)
+
+        if inseridos > 0 or atualizados > 0:
+            print()
+            print(paint_success("✅ Importação concluída com sucesso!"))
+
+    except ValidationError as e:
+        clear_screen()
+        title(paint_error("Erro na Importação do Cadastro de Fundos"))
+        print()
+        print(paint_error(f"❌ {str(e)}"))
+        print()
+        print("Verifique os parâmetros e tente novamente.")
+
+    except Exception as e:
+        clear_screen()
+        title(paint_error("Erro Inesperado"))
+        print()
+        print(paint_error(f"❌ Erro durante importação: {str(e)}"))
+        print()
+        print("Verifique sua conexão de internet e tente novamente.")
+
+    print()
+    pause()
+
+#* IMPORTACAO PREÇOS - HISTÓRICO DE COTAÇÕES
+def importar_precos_historico_flow():
+    """Importação do histórico de cotações diárias (arquivos locais .csv/.xlsx)."""
+    clear_screen()
+    title("Preços | Importar Histórico de Cotações")
+
+    pasta_padrao = "./imports/precos"
+
+    print("📋 " + paint_header("Histórico de Cotações Diárias"))
+    print("   Colunas: Data, Fechamento e (opcionais) Ticker, Abertura, Máxima, Mínima, Volume")
+    print("   Sem a coluna Ticker: o ticker informado ou o nome do arquivo (PETR4.csv)")
+    print()
+
+    caminho = _input(f"Arquivo ou pasta para importação [{pasta_padrao}]: ").strip() or pasta_padrao
+    ticker = _input("Ticker (ENTER = coluna Ticker ou nome do arquivo): ").strip() or None
+
+    print()
+    print(f"🚀 Iniciando importação de cotações de {paint_header(caminho)}...")
+    print()
+
+    try:
+        from ...services.importacao.precos_import_service import PrecosImportService
+        precos_service = PrecosImportService(progresso=TqdmProgresso())
+        resumo = precos_service.importar([caminho], ticker)
+
+        # Relatório final com tabela
+        clear_screen()
+        title("Importação Histórico de Cotações - Relatório Final")
+
+        headers = ["Arquivo", "Total Registros", "Inseridos", "Atualizados", "Ignorados", "Erros", "Tempo (s)", "Linhas/s" ]
+        print(render_table(resumo, headers, tablefmt='fancy_grid'))
+        print()
+
+        processados = sum(r[1] for r in resumo)
+        print(f"📈 {paint_header('Total processado:')} {processados} cotações")
+        gravado = precos_service.resumo()
+        if gravado:
+            tickers, cotacoes, inicio, fim = gravado
+            print(f"📅 {paint_header('Histórico gravado:')} {cotacoes} cotações de {tickers} ativos, de {inicio} a {fim}")
+        print()
+        _print_metricas(precos_service.metricas)
+
+        # Mostrar erros se houver
+        _print_erros(precos_service.erros)
+
+        print()
+        print(paint_success("✅ Importação concluída com sucesso!"))
+
+    except ValidationError as e:
+        clear_screen()
+        title(paint_error("Erro na Importação de Cotações"))
+        print()
+        print(paint_error(f"❌ {str(e)}"))
+        print()
+        print("Verifique os parâmetros e tente novamente.")
+
+    except Exception as e:
+        clear_screen()
+        title(paint_error("Erro Inesperado"))
+        print()
+        print(paint_error(f"❌ Erro durante importação: {str(e)}"))
+        print()
+        print("Verifique o arquivo e tente novamente.")
+
+    print()
+    pause()
+
 #* MENU DE IMPORTAÇÃO
 def importacao_loop():
     while True:
@@ -314,6 +638,7 @@ def importacao_loop():
         print("4. [B3] Posição consolidada")
         print("5. [B3] Movimentação")
         print("6. [CVM] Cadastro de Fundos e Empresas")
+        print("7. [Preços] Histórico de cotações")
         print("8. Voltar")
         ch = _input("> ").strip()
         if ch == "1":
@@ -325,12 +650,12 @@ def importacao_loop():
             importar_dfp_flow()
             pause()
         elif ch == "4":
-            #importar_movimentacao_b3_flow()
-            print("Em desenvolvimento...")
-            pause()
+            importar_posicao_b3_flow()
         elif ch == "5":
-            #importar_fundos_empresas_flow()
-            print("Em desenvolvimento...")
-            pause()
+            importar_movimentacao_b3_flow()
+        elif ch == "6":
+            importar_cadastro_fundos_flow()
+        elif ch == "7":
+            importar_precos_historico_flow()
         else:
             break
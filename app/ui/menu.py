@@ -3,13 +3,16 @@ from .widgets import title, divider, pause
 from .prompts import prompt_menu_choice
 from ..core.utils import clear_screen
 
-from .importacao.menu import importacao_loop
-from .backup.menu import backup_loop
+# Os submenus (e os serviços que eles usam: requests, tqdm, csv, zipfile...)
+# são importados só quando a opção é escolhida, para não atrasar o login.
 
 
 MAIN_ITEMS = [
     "Importação",
     "Database - Backup/Restore",
+    "Cadastro de Ativos",
+    "Carteira",
+    "Análise Fundamentalista",
     "Sair"
 ]
 
@@ -29,11 +32,22 @@ def handle_main_choice(choice: str) -> bool:
     """
     match choice.lower():
         case "1":
+            from .importacao.menu import importacao_loop
             importacao_loop()
             pause()
         case "2":
+            from .backup.menu import backup_loop
             backup_loop()
             pause()
+        case "3":
+            from .ativos.menu import ativos_loop
+            ativos_loop()
+        case "4":
+            from .carteira.menu import tela_carteira
+            tela_carteira()
+        case "5":
+            from .fundamentos.menu import fundamentos_loop
+            fundamentos_loop()
         case "0" | "q" | "sair" | "exit":
             return False
         case _:
@@ -0,0 +1,43 @@
+"""
+Adaptadores de progresso (ver app.core.progresso) para o terminal e para
+execuções sem interação.
+"""
+import json
+import sys
+import threading
+
+
+class TqdmProgresso:
+    """Uma barra tqdm por etapa, atualizada com os eventos em lote."""
+
+    def __init__(self):
+        self._barras = {}
+
+    def __call__(self, evento):
+        from tqdm import tqdm
+
+        chave = (evento.etapa, evento.descricao)
+        barra = self._barras.get(chave)
+        if barra is None:
+            barra = self._barras[chave] = tqdm(total=evento.total, desc=evento.descricao, unit=evento.unidade)
+        barra.update(evento.feitos - barra.n)
+        if evento.final:
+            barra.close()
+            del self._barras[chave]
+
+
+class JsonLinesProgresso:
+    """Um objeto JSON por linha (stderr por padrão), para cron/scripts."""
+
+    def __init__(self, stream=None, **contexto):
+        self.stream = stream or sys.stderr
+        self.contexto = contexto
+        # downloads podem rodar em threads (CLI --workers)
+        self._lock = threading.Lock()
+
+    def __call__(self, evento):
+        registro = {**self.contexto, **evento._asdict(), 'taxa': round(evento.taxa, 1)}
+        linha = json.dumps(registro, ensure_ascii=False)
+        with self._lock:
+            self.stream.write(linha + '\n')
+            self.stream.flush()
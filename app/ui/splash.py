@@ -1,7 +1,6 @@
 import os
 import time
 from colorama import Fore, Style, init as colorama_init
-from pyfiglet import Figlet
 
 colorama_init()
 
@@ -10,6 +9,9 @@ def _normalize_figlet_font(name: str) -> str:
     return (name or "ansi_shadow").strip().lower().replace(" ", "_")
 
 def splash():
+    # pyfiglet carrega fontes do disco: importa só quando a splash é exibida
+    from pyfiglet import Figlet
+
     env_font = os.getenv("DMARKI_FIGLET_FONT", "ansi_shadow")
     font = _normalize_figlet_font(env_font)
     try:
@@ -0,0 +1,106 @@
+"""
+Benchmark da avaliação da carteira (services.carteira_service): motor em
+escala fixa (arrays int64) contra a mesma conta com um Decimal por linha
+(money()/qty()), numa movimentação sintética de vários anos. Confere que
+posição, custo e lucro realizado são iguais nos dois.
+
+Uso (na raiz do projeto):
+	python -m benchmarks.carteira
+	python -m benchmarks.carteira --movimentos 50000 --ativos 200
+"""
+import argparse
+import random
+import timeit
+from datetime import date, timedelta
+
+from app.core.decimal_ctx import MONEY_SCALE, QTY_SCALE, money, money_str, qty, qty_str, to_scaled
+from app.services.carteira_service import Movimento, avaliar_movimentos
+
+
+def gerar_movimentos(movimentos: int, ativos: int, semente: int = 42) -> tuple[list[Movimento], dict[str, str]]:
+	"""Movimentos com os valores em texto, como gravados (qty_str/money_str)."""
+	rnd = random.Random(semente)
+	tickers = [f'TCK{i:03d}4' for i in range(ativos)]
+	posicao = dict.fromkeys(tickers, 0)
+	linhas = []
+	inicio = date(2015, 1, 2)
+	for i in range(movimentos):
+		ticker = rnd.choice(tickers)
+		# dez anos, em ordem cronológica
+		dia = (inicio + timedelta(days=i * 3650 // movimentos)).isoformat()
+		preco = f'{rnd.uniform(5, 100):.2f}'
+		sorteio = rnd.random()
+		if sorteio < 0.15:
+			linhas.append(Movimento(ticker, dia, 'Credito', 'Dividendo', qty_str(0), money_str(0), money_str(f'{rnd.uniform(1, 500):.2f}')))
+			continue
+		quantidade = rnd.randint(1, 20) * 100
+		if sorteio < 0.35 and posicao[ticker] >= quantidade:
+			posicao[ticker] -= quantidade
+			entrada, tipo = 'Debito', 'Venda'
+		else:
+			posicao[ticker] += quantidade
+			entrada, tipo = 'Credito', 'Compra'
+		valor = f'{quantidade * float(preco):.2f}'
+		linhas.append(Movimento(ticker, dia, entrada, tipo, qty_str(quantidade), money_str(preco), money_str(valor)))
+	# a ordem do repositório (ticker, data): sort estável, as datas já estão em ordem
+	linhas.sort(key=lambda m: m.ticker)
+	precos = {t: f'{rnd.uniform(5, 100):.2f}' for t in tickers}
+	return linhas, precos
+
+
+def escalar(movimentos: list[Movimento]) -> list[Movimento]:
+	"""O que B3MovimentacaoRepo.listar_para_avaliacao devolve: valores em escala fixa."""
+	return [m._replace(
+		quantidade=to_scaled(m.quantidade, QTY_SCALE),
+		preco_unitario=to_scaled(m.preco_unitario, MONEY_SCALE),
+		valor_operacao=to_scaled(m.valor_operacao, MONEY_SCALE),
+	) for m in movimentos]
+
+
+def avaliar_decimal(movimentos, precos) -> dict:
+	"""Referência: a mesma conta com Decimal em cada linha."""
+	estado = {}
+	for m in movimentos:
+		custo, posicao, realizado, proventos = estado.get(m.ticker, (money(0), qty(0), money(0), money(0)))
+		q, v = qty(m.quantidade), money(m.valor_operacao)
+		if m.movimentacao == 'Dividendo':
+			proventos += v
+		elif m.entrada_saida == 'Credito':
+			custo += v
+			posicao += q
+		else:
+			baixado = money(custo * min(q, posicao) / posicao) if posicao > 0 else money(0)
+			custo -= baixado
+			posicao -= q
+			realizado += v - baixado
+			if posicao <= 0:
+				custo = money(0)
+		estado[m.ticker] = (custo, posicao, realizado, proventos)
+	return estado
+
+
+def main() -> None:
+	parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+	parser.add_argument('--movimentos', type=int, default=10_000)
+	parser.add_argument('--ativos', type=int, default=80)
+	parser.add_argument('--repeticoes', type=int, default=5)
+	args = parser.parse_args()
+
+	movimentos, precos = gerar_movimentos(args.movimentos, args.ativos)
+	escalados = escalar(movimentos)
+	resultado = {p.ticker: p for p in avaliar_movimentos(escalados, precos)}
+	for ticker, (custo, posicao, realizado, proventos) in avaliar_decimal(movimentos, precos).items():
+		p = resultado[ticker]
+		assert (p.custo_total, p.quantidade, p.lucro_realizado, p.proventos) == (custo, posicao, realizado, proventos), ticker
+
+	print(f"{args.movimentos:,} movimentações, {args.ativos} ativos")
+	for rotulo, funcao, entrada in (
+		('Decimal por linha', avaliar_decimal, movimentos),
+		('Escala fixa (int64)', avaliar_movimentos, escalados),
+	):
+		segundos = min(timeit.repeat(lambda: funcao(entrada, precos), number=1, repeat=args.repeticoes))
+		print(f"  {rotulo:<22} {segundos * 1000:>8.1f} ms")
+
+
+if __name__ == '__main__':
+	main()
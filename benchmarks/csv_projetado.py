@@ -0,0 +1,68 @@
+"""
+Micro-benchmark da leitura de CSV: csv.DictReader + row.get (como as
+importações faziam) contra core.csv_projetado.LeitorCsvProjetado, no
+FCA geral (arquivo mais largo) e num balanço, com os CSVs sintéticos de
+benchmarks.cvm_sinteticos. Mede só a leitura/projeção, sem conversões.
+
+Uso (na raiz do projeto):
+	python -m benchmarks.csv_projetado
+	python -m benchmarks.csv_projetado --linhas 500000
+"""
+import argparse
+import csv
+import io
+import random
+import timeit
+
+from app.core.csv_projetado import LeitorCsvProjetado
+from app.services.importacao.demonstrativos import SPECS
+from app.services.importacao.fca_import_service import COLUNAS_FCA
+from benchmarks.cvm_sinteticos import COLUNAS_BALANCO, COLUNAS_FCA_GERAL
+
+
+def gerar_csv(colunas, linhas: int, semente: int = 42) -> str:
+	rnd = random.Random(semente)
+	valores = [[f'{nome[:6]}{rnd.randint(0, 999)}' for nome in colunas] for _ in range(200)]
+	saida = io.StringIO()
+	saida.write(';'.join(colunas) + '\n')
+	for i in range(linhas):
+		saida.write(';'.join(valores[i % 200]) + '\n')
+	return saida.getvalue()
+
+
+def ler_dict(texto: str, colunas) -> int:
+	n = 0
+	for row in csv.DictReader(io.StringIO(texto), delimiter=';', quoting=csv.QUOTE_NONE, escapechar='\\'):
+		valores = [row.get(nome, '') for nome in colunas]
+		n += len(valores)
+	return n
+
+
+def ler_projetado(texto: str, colunas) -> int:
+	n = 0
+	for valores in LeitorCsvProjetado(io.StringIO(texto), colunas):
+		n += len(valores)
+	return n
+
+
+def main() -> None:
+	parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+	parser.add_argument('--linhas', type=int, default=200_000)
+	parser.add_argument('--repeticoes', type=int, default=3)
+	args = parser.parse_args()
+
+	casos = (
+		('FCA geral', COLUNAS_FCA_GERAL, COLUNAS_FCA),
+		('BPA', COLUNAS_BALANCO, SPECS[0].colunas()),
+	)
+	for nome, todas, usadas in casos:
+		texto = gerar_csv(todas, args.linhas)
+		assert ler_dict(texto, usadas) == ler_projetado(texto, usadas)
+		print(f"{nome}: {len(set(usadas))} de {len(todas)} colunas, {args.linhas:,} linhas")
+		for rotulo, funcao in (('DictReader + get', ler_dict), ('LeitorCsvProjetado', ler_projetado)):
+			segundos = min(timeit.repeat(lambda: funcao(texto, usadas), number=1, repeat=args.repeticoes))
+			print(f"  {rotulo:<20} {segundos * 1000:>9.1f} ms  {segundos / args.linhas * 1e9:>7.0f} ns/linha")
+
+
+if __name__ == '__main__':
+	main()
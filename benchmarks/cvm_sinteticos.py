@@ -0,0 +1,222 @@
+"""
+Geradores de arquivos sintéticos no formato dos dados abertos da CVM.
+
+Produzem os ZIPs `fca_cia_aberta_{ano}.zip`, `itr_cia_aberta_{ano}.zip` e
+`dfp_cia_aberta_{ano}.zip` com o mesmo layout de colunas, encoding latin1,
+delimitador ';', CNPJs com dígitos verificadores válidos e linhas com
+ORDEM_EXERC 'ÚLTIMO' e 'PENÚLTIMO'. A escala é dada pelo número de empresas
+e de contas por demonstrativo; a saída é determinística para a mesma semente.
+"""
+import os
+import random
+import zipfile
+
+COLUNAS_FCA_GERAL = (
+	'CNPJ_Companhia', 'Data_Referencia', 'Versao', 'ID_Documento', 'Nome_Empresarial',
+	'Data_Nome_Empresarial', 'Nome_Empresarial_Anterior', 'Data_Constituicao', 'Codigo_CVM',
+	'Data_Registro_CVM', 'Categoria_Registro_CVM', 'Data_Categoria_Registro_CVM',
+	'Situacao_Registro_CVM', 'Data_Situacao_Registro_CVM', 'Pais_Origem',
+	'Pais_Custodia_Valores_Mobiliarios', 'Setor_Atividade', 'Descricao_Atividade',
+	'Situacao_Emissor', 'Data_Situacao_Emissor', 'Especie_Controle_Acionario',
+	'Data_Especie_Controle_Acionario', 'Dia_Encerramento_Exercicio_Social',
+	'Mes_Encerramento_Exercicio_Social', 'Data_Alteracao_Exercicio_Social', 'Pagina_Web',
+)
+
+COLUNAS_DOC = (
+	'CNPJ_CIA', 'DT_REFER', 'VERSAO', 'DENOM_CIA', 'CD_CVM', 'CATEG_DOC', 'ID_DOC',
+	'DT_RECEB', 'LINK_DOC',
+)
+
+COLUNAS_BALANCO = (
+	'CNPJ_CIA', 'DT_REFER', 'VERSAO', 'DENOM_CIA', 'CD_CVM', 'GRUPO_DFP', 'MOEDA',
+	'ESCALA_MOEDA', 'ORDEM_EXERC', 'DT_FIM_EXERC', 'CD_CONTA', 'DS_CONTA', 'VL_CONTA',
+	'ST_CONTA_FIXA',
+)
+
+COLUNAS_DRE = (
+	'CNPJ_CIA', 'DT_REFER', 'VERSAO', 'DENOM_CIA', 'CD_CVM', 'GRUPO_DFP', 'MOEDA',
+	'ESCALA_MOEDA', 'ORDEM_EXERC', 'DT_INI_EXERC', 'DT_FIM_EXERC', 'CD_CONTA', 'DS_CONTA',
+	'VL_CONTA', 'ST_CONTA_FIXA',
+)
+
+COLUNAS_COMPOSICAO = (
+	'CNPJ_CIA', 'DT_REFER', 'VERSAO', 'DENOM_CIA', 'QT_ACAO_ORDIN_CAP_INTEGR',
+	'QT_ACAO_PREF_CAP_INTEGR', 'QT_ACAO_TOTAL_CAP_INTEGR', 'QT_ACAO_ORDIN_TESOURO',
+	'QT_ACAO_PREF_TESOURO', 'QT_ACAO_TOTAL_TESOURO',
+)
+
+# Contas-raiz e descrições usadas na geração da árvore de contas
+RAIZES = {
+	'BPA': ('1', 'Ativo Total', 'Balanço Patrimonial Ativo'),
+	'BPP': ('2', 'Passivo Total', 'Balanço Patrimonial Passivo'),
+	'DRE': ('3', 'Receita de Venda de Bens e/ou Serviços', 'Demonstração do Resultado'),
+}
+
+SETORES = (
+	'Energia Elétrica', 'Bancos', 'Construção Civil, Mat. Constr. e Decoração',
+	'Petróleo e Gás', 'Comércio (Atacado e Varejo)', 'Saneamento, Serv. Água e Gás',
+)
+
+
+def cnpj_valido(base12: str) -> str:
+	"""Completa 12 dígitos com os dois dígitos verificadores do CNPJ."""
+	pesos1 = [5, 4, 3, 2, 9, 8, 7, 6, 5, 4, 3, 2]
+	pesos2 = [6] + pesos1
+	dv1 = sum(int(d) * p for d, p in zip(base12, pesos1)) % 11
+	dv1 = 0 if dv1 < 2 else 11 - dv1
+	base13 = base12 + str(dv1)
+	dv2 = sum(int(d) * p for d, p in zip(base13, pesos2)) % 11
+	dv2 = 0 if dv2 < 2 else 11 - dv2
+	return base13 + str(dv2)
+
+
+def formatar_cnpj(cnpj: str) -> str:
+	return f'{cnpj[:2]}.{cnpj[2:5]}.{cnpj[5:8]}/{cnpj[8:12]}-{cnpj[12:]}'
+
+
+def empresas(n: int, seed: int = 42) -> list[dict]:
+	rnd = random.Random(seed)
+	lista = []
+	for i in range(1, n + 1):
+		cnpj = cnpj_valido(f'{rnd.randrange(10**8):08d}0001')
+		lista.append({
+			'cnpj': cnpj,
+			'cnpj_fmt': formatar_cnpj(cnpj),
+			'nome': f'COMPANHIA SINTÉTICA {i:05d} S.A.',
+			'cd_cvm': f'{i * 7:06d}',
+			'setor': SETORES[i % len(SETORES)],
+		})
+	return lista
+
+
+def contas(tipo: str, n: int) -> list[tuple[str, str]]:
+	"""Gera n códigos de conta hierárquicos (1, 1.01, 1.01.01, ...)."""
+	raiz, descricao, _ = RAIZES[tipo]
+	codigos = [(raiz, descricao)]
+	i = 1
+	while len(codigos) < n:
+		codigos.append((f'{raiz}.{i:02d}', f'Conta {raiz}.{i:02d}'))
+		for j in range(1, 5):
+			if len(codigos) >= n:
+				break
+			codigos.append((f'{raiz}.{i:02d}.{j:02d}', f'Subconta {raiz}.{i:02d}.{j:02d}'))
+		i += 1
+	return codigos
+
+
+def _csv(colunas, linhas) -> bytes:
+	texto = ';'.join(colunas) + '\n' + ''.join(';'.join(map(str, l)) + '\n' for l in linhas)
+	return texto.encode('latin1')
+
+
+def _valor(rnd: random.Random) -> str:
+	return f'{rnd.randint(-5 * 10**6, 5 * 10**7)}.0000000000'
+
+
+def gerar_fca_zip(destino: str, ano: int, n_empresas: int, seed: int = 42) -> str:
+	rnd = random.Random(seed)
+	linhas = []
+	for i, emp in enumerate(empresas(n_empresas, seed)):
+		# algumas empresas reenviam o FCA no mesmo ano (ID_Documento maior)
+		for versao in range(1, 2 + (i % 5 == 0)):
+			linhas.append((
+				emp['cnpj_fmt'], f'{ano}-01-01', versao, 100000 + i * 10 + versao, emp['nome'],
+				'', '', '1990-05-10', emp['cd_cvm'], '1995-01-01', 'Categoria A', '2010-01-01',
+				'Ativo', '2010-01-01', 'Brasil', 'Brasil', emp['setor'],
+				'Atividade sintética de benchmark', 'Fase Operacional', '2010-01-01',
+				'Privado', '2010-01-01', 31, 12, '',
+				f'www.sintetica{i}.com.br' if rnd.random() < 0.8 else '',
+			))
+	caminho = os.path.join(destino, f'fca_cia_aberta_{ano}.zip')
+	with zipfile.ZipFile(caminho, 'w', zipfile.ZIP_DEFLATED) as z:
+		z.writestr(f'fca_cia_aberta_geral_{ano}.csv', _csv(COLUNAS_FCA_GERAL, linhas))
+	return caminho
+
+
+def _periodos(doc: str, ano: int) -> list[str]:
+	if doc == 'dfp':
+		return [f'{ano}-12-31']
+	return [f'{ano}-03-31', f'{ano}-06-30', f'{ano}-09-30']
+
+
+def gerar_doc_zip(destino: str, doc: str, ano: int, n_empresas: int, n_contas: int,
+				  seed: int = 42) -> str:
+	"""Gera o ZIP de ITR ('itr') ou DFP ('dfp')."""
+	rnd = random.Random(seed)
+	emps = empresas(n_empresas, seed)
+	periodos = _periodos(doc, ano)
+	categoria = doc.upper()
+	arquivos = {}
+
+	# documentos: ~10% das empresas têm versão 2 (reapresentação)
+	versoes = {emp['cnpj']: (1, 2) if i % 10 == 0 else (1,) for i, emp in enumerate(emps)}
+	docs = []
+	id_doc = 1
+	for emp in emps:
+		for dt_refer in periodos:
+			for versao in versoes[emp['cnpj']]:
+				docs.append((
+					emp['cnpj_fmt'], dt_refer, versao, emp['nome'], emp['cd_cvm'], categoria,
+					id_doc, dt_refer, f'https://www.rad.cvm.gov.br/ENET/frmExibirArquivo?ID={id_doc}',
+				))
+				id_doc += 1
+	arquivos[f'{doc}_cia_aberta_{ano}.csv'] = _csv(COLUNAS_DOC, docs)
+
+	composicao = []
+	for emp in emps:
+		for dt_refer in periodos:
+			for versao in versoes[emp['cnpj']]:
+				ordin = rnd.randrange(10**6, 10**9)
+				pref = rnd.randrange(0, 10**9)
+				tes = rnd.randrange(0, 10**5)
+				composicao.append((
+					emp['cnpj_fmt'], dt_refer, versao, emp['nome'], ordin, pref, ordin + pref,
+					tes, 0, tes,
+				))
+	arquivos[f'{doc}_cia_aberta_composicao_capital_{ano}.csv'] = _csv(COLUNAS_COMPOSICAO, composicao)
+
+	for tipo in ('BPA', 'BPP', 'DRE'):
+		plano = contas(tipo, n_contas)
+		descricao_grupo = RAIZES[tipo][2]
+		for sufixo, grupo in (('con', 'DF Consolidado'), ('ind', 'DF Individual')):
+			linhas = []
+			for emp in emps:
+				for dt_refer in periodos:
+					ano_ant = f'{int(dt_refer[:4]) - 1}{dt_refer[4:]}'
+					for versao in versoes[emp['cnpj']]:
+						for ordem, dt_fim in (('ÚLTIMO', dt_refer), ('PENÚLTIMO', ano_ant)):
+							for codigo, descricao in plano:
+								base = (emp['cnpj_fmt'], dt_refer, versao, emp['nome'], emp['cd_cvm'],
+										f'{grupo} - {descricao_grupo}', 'REAL', 'MIL', ordem)
+								fixa = 'S' if codigo.count('.') < 2 else 'N'
+								if tipo == 'DRE':
+									linhas.append(base + (f'{dt_fim[:4]}-01-01', dt_fim, codigo, descricao, _valor(rnd), fixa))
+								else:
+									linhas.append(base + (dt_fim, codigo, descricao, _valor(rnd), fixa))
+			colunas = COLUNAS_DRE if tipo == 'DRE' else COLUNAS_BALANCO
+			arquivos[f'{doc}_cia_aberta_{tipo}_{sufixo}_{ano}.csv'] = _csv(colunas, linhas)
+
+	# demonstrativo que o importador não processa (deve ser ignorado)
+	arquivos[f'{doc}_cia_aberta_DVA_con_{ano}.csv'] = _csv(COLUNAS_DRE, [])
+
+	caminho = os.path.join(destino, f'{doc}_cia_aberta_{ano}.zip')
+	with zipfile.ZipFile(caminho, 'w', zipfile.ZIP_DEFLATED) as z:
+		for nome, conteudo in arquivos.items():
+			z.writestr(nome, conteudo)
+	return caminho
+
+
+def gerar_arvore_cvm(raiz: str, ano: int, n_empresas: int, n_contas: int, seed: int = 42) -> dict[str, str]:
+	"""
+	Gera os três ZIPs na estrutura de diretórios do portal da CVM
+	(CIA_ABERTA/DOC/{FCA,ITR,DFP}/DADOS) e retorna {conjunto: caminho_zip}.
+	"""
+	caminhos = {}
+	for conjunto in ('fca', 'itr', 'dfp'):
+		destino = os.path.join(raiz, 'CIA_ABERTA', 'DOC', conjunto.upper(), 'DADOS')
+		os.makedirs(destino, exist_ok=True)
+		if conjunto == 'fca':
+			caminhos[conjunto] = gerar_fca_zip(destino, ano, n_empresas, seed)
+		else:
+			caminhos[conjunto] = gerar_doc_zip(destino, conjunto, ano, n_empresas, n_contas, seed)
+	return caminhos
@@ -0,0 +1,59 @@
+"""
+Micro-benchmark do parser em escala fixa (core.decimal_ctx.to_scaled) contra
+money()/qty(), com valores no formato de VL_CONTA e QT_ACAO_* dos CSVs da CVM.
+Confere também que os resultados são iguais aos de money()/qty().
+
+Uso (na raiz do projeto):
+	python -m benchmarks.decimal_escala
+	python -m benchmarks.decimal_escala --linhas 500000
+"""
+import argparse
+import random
+import timeit
+
+from app.core.decimal_ctx import (
+	MONEY_SCALE, QTY_SCALE, from_scaled, money, money_str, qty, qty_str, to_scaled, to_scaled_many,
+)
+
+
+def gerar_valores(linhas: int, semente: int = 42) -> tuple[list[str], list[str]]:
+	rnd = random.Random(semente)
+	# VL_CONTA: 10 casas decimais, ~20% negativos, alguns vazios
+	contas = [
+		'' if rnd.random() < 0.01 else
+		f"{'-' if rnd.random() < 0.2 else ''}{rnd.randint(0, 10**9)}.{rnd.randint(0, 10**10 - 1):010d}"
+		for _ in range(linhas)
+	]
+	quantidades = [str(rnd.randint(0, 10**10)) for _ in range(linhas)]
+	return contas, quantidades
+
+
+def medir(rotulo: str, funcao, linhas: int, repeticoes: int) -> None:
+	segundos = min(timeit.repeat(funcao, number=1, repeat=repeticoes))
+	print(f"{rotulo:<28} {segundos * 1000:>9.1f} ms  {linhas / segundos:>12,.0f} valores/s")
+
+
+def main() -> None:
+	parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+	parser.add_argument('--linhas', type=int, default=200_000)
+	parser.add_argument('--repeticoes', type=int, default=3)
+	args = parser.parse_args()
+
+	contas, quantidades = gerar_valores(args.linhas)
+	for valores, escala, referencia in ((contas, MONEY_SCALE, money), (quantidades, QTY_SCALE, qty)):
+		for valor in valores[:20_000]:
+			assert from_scaled(to_scaled(valor, escala), escala) == referencia(valor), valor
+
+	n, r = args.linhas, args.repeticoes
+	medir('money() VL_CONTA', lambda: [money(v) for v in contas], n, r)
+	medir('to_scaled VL_CONTA', lambda: [to_scaled(v, MONEY_SCALE) for v in contas], n, r)
+	medir('to_scaled_many VL_CONTA', lambda: to_scaled_many(contas, MONEY_SCALE), n, r)
+	medir('str(money()) VL_CONTA', lambda: [str(money(v)) for v in contas], n, r)
+	medir('money_str VL_CONTA', lambda: [money_str(v) for v in contas], n, r)
+	medir('str(qty()) QT_ACAO', lambda: [str(qty(v)) for v in quantidades], n, r)
+	medir('qty_str QT_ACAO', lambda: [qty_str(v) for v in quantidades], n, r)
+	medir('to_scaled_many QT_ACAO', lambda: to_scaled_many(quantidades, QTY_SCALE), n, r)
+
+
+if __name__ == '__main__':
+	main()
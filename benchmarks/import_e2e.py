@@ -0,0 +1,173 @@
+"""
+Benchmark ponta a ponta das importações FCA, ITR e DFP.
+
+Gera ZIPs sintéticos no layout da CVM (ver cvm_sinteticos), serve-os por um
+servidor HTTP local e executa FcaImportService, ItrImportService e
+DfpImportService contra um banco temporário. Cada etapa roda num processo
+próprio para que o pico de RSS seja dela; ITR e DFP são executados duas
+vezes para medir também a reimportação (todas as linhas já existentes).
+
+Reporta linhas/s, pico de RSS e tamanho do banco por etapa e compara com a
+baseline salva (exit 1 se houver regressão acima da tolerância).
+
+Uso (na raiz do projeto):
+	python -m benchmarks.import_e2e
+	python -m benchmarks.import_e2e --companies 400 --accounts 60
+	python -m benchmarks.import_e2e --save-baseline
+"""
+import argparse
+import contextlib
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from app.core.metricas import pico_rss_kb
+
+from .cvm_sinteticos import gerar_arvore_cvm
+from .servidor_cvm import ServidorCvmLocal
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BASELINE_PADRAO = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baselines', 'import_e2e.json')
+
+# (nome da etapa, conjunto importado)
+ETAPAS = (
+	('fca', 'fca'),
+	('itr', 'itr'),
+	('itr_reimportacao', 'itr'),
+	('dfp', 'dfp'),
+	('dfp_reimportacao', 'dfp'),
+)
+
+
+def _executar_etapa(conjunto: str, ano: int) -> dict:
+	"""Roda uma importação no processo atual (modo filho)."""
+	with contextlib.redirect_stdout(sys.stderr):
+		from app.db.bootstrap import apply_migrations
+		apply_migrations()
+
+		inicio = time.perf_counter()
+		if conjunto == 'fca':
+			from app.services.importacao.fca_import_service import FcaImportService
+			inseridos, atualizados, ignorados, erros, _ = FcaImportService().importar_fca_por_ano(ano)
+			linhas = inseridos + atualizados + ignorados + erros
+		else:
+			if conjunto == 'itr':
+				from app.services.importacao.itr_import_service import ItrImportService as Servico
+			else:
+				from app.services.importacao.dfp_import_service import DfpImportService as Servico
+			resumo = Servico().importar_por_ano(ano)
+			linhas = sum(r[1] + r[5] for r in resumo)
+		segundos = time.perf_counter() - inicio
+
+	return {
+		'linhas': linhas,
+		'segundos': round(segundos, 3),
+		'linhas_s': round(linhas / segundos, 1) if segundos else 0.0,
+		'pico_rss_kb': pico_rss_kb(),
+	}
+
+
+def _rodar_filho(conjunto: str, ano: int, env: dict, verbose: bool) -> dict:
+	proc = subprocess.run(
+		[sys.executable, '-m', 'benchmarks.import_e2e', '--run-stage', conjunto, '--year', str(ano)],
+		cwd=RAIZ, env=env, stdout=subprocess.PIPE,
+		stderr=None if verbose else subprocess.DEVNULL, text=True,
+	)
+	if proc.returncode != 0:
+		raise RuntimeError(f'Etapa {conjunto} falhou (exit {proc.returncode})')
+	return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def _comparar(etapas: dict, baseline: dict, tolerancia: float) -> list[str]:
+	"""Retorna a lista de regressões (linhas/s menor ou RSS maior que a tolerância)."""
+	regressoes = []
+	for nome, atual in etapas.items():
+		base = baseline.get(nome)
+		if not base:
+			continue
+		if atual['linhas_s'] < base['linhas_s'] * (1 - tolerancia):
+			regressoes.append(f'{nome}: linhas/s {atual["linhas_s"]:.0f} < baseline {base["linhas_s"]:.0f}')
+		if atual['pico_rss_kb'] > base['pico_rss_kb'] * (1 + tolerancia):
+			regressoes.append(f'{nome}: pico RSS {atual["pico_rss_kb"]} KB > baseline {base["pico_rss_kb"]} KB')
+	return regressoes
+
+
+def _delta(atual: float, base: float | None) -> str:
+	if not base:
+		return ''
+	return f'{(atual - base) / base * 100:+.1f}%'
+
+
+def main(argv: list[str] | None = None) -> int:
+	parser = argparse.ArgumentParser(description='Benchmark ponta a ponta das importações CVM')
+	parser.add_argument('--companies', type=int, default=200, help='Empresas por arquivo (padrão: 200)')
+	parser.add_argument('--accounts', type=int, default=40, help='Contas por demonstrativo (padrão: 40)')
+	parser.add_argument('--year', type=int, default=2024)
+	parser.add_argument('--baseline', default=BASELINE_PADRAO)
+	parser.add_argument('--save-baseline', action='store_true', help='Grava o resultado como nova baseline')
+	parser.add_argument('--tolerance', type=float, default=0.25, help='Tolerância de regressão (padrão: 0.25)')
+	parser.add_argument('--verbose', action='store_true', help='Mostra a saída dos serviços')
+	parser.add_argument('--run-stage', choices=('fca', 'itr', 'dfp'), help=argparse.SUPPRESS)
+	args = parser.parse_args(argv)
+
+	if args.run_stage:
+		print(json.dumps(_executar_etapa(args.run_stage, args.year)))
+		return 0
+
+	parametros = {'companies': args.companies, 'accounts': args.accounts, 'year': args.year}
+	etapas = {}
+
+	with tempfile.TemporaryDirectory(prefix='dmarki_bench_') as tmp:
+		raiz_http = os.path.join(tmp, 'cvm')
+		db_path = os.path.join(tmp, 'data', 'bench.db')
+		zips = gerar_arvore_cvm(raiz_http, args.year, args.companies, args.accounts)
+		print('Arquivos gerados: ' + ', '.join(
+			f'{os.path.basename(p)} ({os.path.getsize(p) / 1024:.0f} KB)' for p in zips.values()))
+
+		with ServidorCvmLocal(raiz_http) as servidor:
+			env = dict(os.environ, PYTHONPATH=RAIZ, DMARKI_DB_PATH=db_path,
+					   DMARKI_CVM_DADOS_URL=servidor.url)
+			for nome, conjunto in ETAPAS:
+				resultado = _rodar_filho(conjunto, args.year, env, args.verbose)
+				resultado['db_kb'] = os.path.getsize(db_path) // 1024
+				etapas[nome] = resultado
+
+	baseline = {}
+	if os.path.exists(args.baseline):
+		with open(args.baseline, 'r', encoding='utf-8') as f:
+			salvo = json.load(f)
+		if salvo.get('parametros') == parametros:
+			baseline = salvo.get('etapas', {})
+		else:
+			print(f'Baseline ignorada: parâmetros diferentes {salvo.get("parametros")}')
+
+	print()
+	print(f'{"Etapa":<18}{"Linhas":>10}{"Tempo(s)":>10}{"Linhas/s":>12}{"Δ":>9}{"Pico RSS(KB)":>14}{"Δ":>9}{"DB(KB)":>10}')
+	for nome, r in etapas.items():
+		base = baseline.get(nome, {})
+		print(f'{nome:<18}{r["linhas"]:>10}{r["segundos"]:>10.2f}{r["linhas_s"]:>12.0f}'
+			  f'{_delta(r["linhas_s"], base.get("linhas_s")):>9}{r["pico_rss_kb"]:>14}'
+			  f'{_delta(r["pico_rss_kb"], base.get("pico_rss_kb")):>9}{r["db_kb"]:>10}')
+
+	if args.save_baseline:
+		os.makedirs(os.path.dirname(args.baseline), exist_ok=True)
+		with open(args.baseline, 'w', encoding='utf-8') as f:
+			json.dump({'parametros': parametros, 'etapas': etapas}, f, indent=2, ensure_ascii=False)
+			f.write('\n')
+		print(f'\nBaseline gravada em {args.baseline}')
+		return 0
+
+	regressoes = _comparar(etapas, baseline, args.tolerance)
+	if regressoes:
+		print('\nREGRESSÕES:')
+		for r in regressoes:
+			print(f'  {r}')
+		return 1
+	return 0
+
+
+if __name__ == '__main__':
+	sys.exit(main())
@@ -0,0 +1,74 @@
+"""
+Benchmark da leitura do histórico de preços (services.precos_service): série
+de um ativo por varredura de intervalo em precos_historico (WITHOUT ROWID,
+chave (ticker, data)) contra a mesma série servida do cache .npy mapeado.
+Mostra o plano da consulta e confere que os dois caminhos dão os mesmos
+arrays. Usa um banco temporário.
+
+Uso (na raiz do projeto):
+	python -m benchmarks.precos_historico
+	python -m benchmarks.precos_historico --ativos 500 --anos 20
+"""
+import argparse
+import os
+import random
+import tempfile
+import timeit
+from datetime import date, timedelta
+
+
+def gerar_cotacoes(ativos: int, anos: int, semente: int = 42):
+	rnd = random.Random(semente)
+	dias = [date(2000, 1, 3) + timedelta(days=i) for i in range(anos * 365)]
+	pregoes = [d.isoformat() for d in dias if d.weekday() < 5]
+	for i in range(ativos):
+		preco = rnd.randint(5_0000, 100_0000)
+		for data in pregoes:
+			preco = max(1, preco + rnd.randint(-preco // 50, preco // 50))
+			yield (f'TCK{i:03d}4', data, None, None, None, preco, None, 'bench.csv', '')
+
+
+def main() -> None:
+	parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+	parser.add_argument('--ativos', type=int, default=200)
+	parser.add_argument('--anos', type=int, default=10)
+	parser.add_argument('--repeticoes', type=int, default=20)
+	args = parser.parse_args()
+
+	with tempfile.TemporaryDirectory(prefix='dmarki_bench_') as tmp:
+		# antes de importar app.db: DB_PATH é lido no import
+		os.environ['DMARKI_DB_PATH'] = os.path.join(tmp, 'bench.db')
+		from app.db.bootstrap import apply_migrations
+		from app.services.precos_service import PrecosService
+		import numpy as np
+
+		apply_migrations()
+		sql = PrecosService()
+		cache = PrecosService(cache=True)
+		repo = sql.repo
+		repo.preparar_staging()
+		repo.carregar_staging(gerar_cotacoes(args.ativos, args.anos))
+		repo.aplicar_staging()
+		repo.conn.commit()
+		tickers, cotacoes, _, _ = repo.resumo()
+		print(f"{cotacoes:,} cotações, {tickers} ativos")
+
+		plano = repo.conn.execute("""
+			EXPLAIN QUERY PLAN SELECT data, fechamento FROM precos_historico
+			WHERE ticker = ? AND data >= ? AND data <= ? ORDER BY data
+		""", ('TCK0004', '2005-01-01', '2005-12-31')).fetchall()
+		print("Plano:", '; '.join(row[3] for row in plano))
+
+		ticker, inicio, fim = f'TCK{args.ativos // 2:03d}4', '2003-01-01', '2007-12-31'
+		a, b = sql.serie(ticker, inicio, fim), cache.serie(ticker, inicio, fim)
+		assert np.array_equal(a.datas, b.datas) and np.array_equal(a.fechamentos, b.fechamentos)
+		print(f"Série {ticker} {inicio} a {fim}: {len(a.datas)} pregões")
+
+		for rotulo, servico in (('SQL (intervalo na PK)', sql), ('Cache .npy (mmap)', cache)):
+			segundos = min(timeit.repeat(lambda: servico.serie(ticker, inicio, fim), number=1, repeat=args.repeticoes))
+			print(f"  {rotulo:<24} {segundos * 1000:>8.2f} ms")
+		repo.conn.close()
+
+
+if __name__ == '__main__':
+	main()
@@ -0,0 +1,84 @@
+"""
+Benchmark das reapresentações (services.reapresentacao_service): todas as
+reapresentações de um ano de uma vez (uma consulta por tabela de contas +
+merge-join por documento) contra a comparação documento a documento.
+Confere que as duas formas dão as mesmas diferenças. Usa um banco
+temporário com demonstrativos sintéticos em que ~10% dos documentos têm
+versão 2 com poucas contas alteradas, como numa reapresentação real.
+
+Uso (na raiz do projeto):
+	python -m benchmarks.reapresentacoes
+	python -m benchmarks.reapresentacoes --empresas 1000 --alteradas 0.05
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from benchmarks.screener import gerar_contas
+
+
+def main() -> None:
+	parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+	parser.add_argument('--empresas', type=int, default=700)
+	parser.add_argument('--periodos', type=int, default=4)
+	parser.add_argument('--contas-extras', type=int, default=40)
+	parser.add_argument('--alteradas', type=float, default=0.02, help='fração das contas alteradas na versão 2')
+	args = parser.parse_args()
+
+	with tempfile.TemporaryDirectory(prefix='dmarki_bench_') as tmp:
+		# antes de importar app.db: DB_PATH é lido no import
+		os.environ['DMARKI_DB_PATH'] = os.path.join(tmp, 'bench.db')
+		from app.db.bootstrap import apply_migrations
+		from app.db.repositories.importacao.cia_aberta_itr_repo import CiaAbertaItrRepo
+		from app.services.reapresentacao_service import ReapresentacaoService
+
+		apply_migrations()
+		repo = CiaAbertaItrRepo()
+		rnd = random.Random(7)
+		lotes, primeira = {}, {}
+		for tabela, registro in gerar_contas(args.empresas, args.periodos, args.contas_extras):
+			chave = (tabela, registro.cnpj, registro.data_referencia, registro.grupo, registro.codigo_conta)
+			if registro.versao == 1:
+				primeira[chave] = registro.valor_conta
+			elif rnd.random() >= args.alteradas:
+				# versão 2 igual à 1, salvo as contas sorteadas
+				registro = registro._replace(valor_conta=primeira[chave])
+			lotes.setdefault(tabela, []).append(registro)
+		for tabela, registros in lotes.items():
+			repo.inserir_lote(tabela, registros)
+		# catálogo de documentos (o arquivo principal do ZIP)
+		repo.conn.execute("""
+			INSERT INTO cia_aberta_itr_controle (cnpj, data_referencia, versao, razao_social, codigo_cvm,
+				categoria_documento, codigo_documento, data_recebimento, link_documento)
+			SELECT DISTINCT cnpj, data_referencia, versao, razao_social, codigo_cvm, 'ITR',
+				cnpj || data_referencia || versao, data_referencia, ''
+			FROM cia_aberta_itr_bpa
+		""")
+		repo.conn.commit()
+		print(f"{sum(map(len, lotes.values())):,} contas, {args.empresas} empresas, {args.periodos} períodos")
+
+		service = ReapresentacaoService(repo.conn)
+		# a primeira leitura paga o cache de páginas do SQLite
+		service.reapresentacoes(2020)
+		inicio = time.perf_counter()
+		lote = service.reapresentacoes(2020)
+		print(f"  {'Ano inteiro (lote)':<26} {(time.perf_counter() - inicio) * 1000:>9.1f} ms")
+
+		inicio = time.perf_counter()
+		referencia = {}
+		for r in lote:
+			for grupo in service.repo.grupos('cia_aberta_itr_bpa', r.cnpj, r.data_referencia, r.versao):
+				referencia.setdefault((r.cnpj, r.data_referencia), []).extend(
+					service.comparar(r.cnpj, r.data_referencia, grupo=grupo).diferencas)
+		print(f"  {'Documento a documento':<26} {(time.perf_counter() - inicio) * 1000:>9.1f} ms")
+
+		for r in lote:
+			assert sorted(r.diferencas) == sorted(referencia.get((r.cnpj, r.data_referencia), [])), r.cnpj
+		print(f"{len(lote)} documentos reapresentados, {sum(len(r.diferencas) for r in lote)} contas alteradas")
+		repo.conn.close()
+
+
+if __name__ == '__main__':
+	main()
@@ -0,0 +1,111 @@
+"""
+Benchmark do screener de fundamentos (services.screener_service): matriz
+empresas x contas de um período inteiro (uma consulta + pivot numpy), a
+mesma matriz servida do cache, e a alternativa de buscar as contas empresa
+por empresa. Confere que o ROE das duas formas é igual. Usa um banco
+temporário com demonstrativos sintéticos (várias versões, DF Consolidado e
+Individual).
+
+Uso (na raiz do projeto):
+	python -m benchmarks.screener
+	python -m benchmarks.screener --empresas 1000 --periodos 8
+"""
+import argparse
+import math
+import os
+import random
+import tempfile
+import time
+
+TABELAS = {'cia_aberta_itr_bpa': '1', 'cia_aberta_itr_bpp': '2', 'cia_aberta_itr_dre': '3'}
+
+
+def gerar_contas(empresas: int, periodos: int, contas_extras: int, semente: int = 42):
+	"""(tabela, ContaDemonstrativo) sintéticos, no layout das tabelas de ITR."""
+	from app.core.registros_cvm import ContaDemonstrativo
+	from app.services.screener_service import CODIGOS
+
+	rnd = random.Random(semente)
+	datas = [f'{2020 + t // 4}-{("03-31", "06-30", "09-30", "12-31")[t % 4]}' for t in range(periodos)]
+	for e in range(empresas):
+		cnpj = f'{e:014d}'
+		grupos = ('DF Consolidado', 'DF Individual') if rnd.random() < 0.7 else ('DF Individual',)
+		for data in datas:
+			versoes = (1, 2) if rnd.random() < 0.1 else (1,)
+			for grupo in grupos:
+				for versao in versoes:
+					for tabela, raiz in TABELAS.items():
+						codigos = [c for c in CODIGOS if c.split('.')[0] == raiz]
+						codigos += [f'{raiz}.{90 + i // 10}.{i % 10:02d}' for i in range(contas_extras)]
+						for codigo in codigos:
+							valor = f'{rnd.uniform(-1e6, 1e7):.4f}'
+							yield tabela, ContaDemonstrativo(
+								cnpj, data, versao, f'EMPRESA {e} S.A.', str(e), grupo, 'REAL', 'MIL',
+								data, data, codigo, codigo, valor, 1, '',
+							)
+
+
+def roe_empresa_por_empresa(conn, periodo: str) -> dict:
+	"""O caminho antigo: uma consulta por empresa (última versão, consolidado se houver)."""
+	resultado = {}
+	cnpjs = [r[0] for r in conn.execute(
+		"SELECT DISTINCT cnpj FROM cia_aberta_itr_dre WHERE data_referencia = ?", (periodo,))]
+	for cnpj in cnpjs:
+		valores = {}
+		for tabela, codigo in (('cia_aberta_itr_bpp', '2.03'), ('cia_aberta_itr_dre', '3.11')):
+			valores[codigo] = conn.execute(f"""
+				SELECT valor_conta FROM {tabela}
+				WHERE cnpj = ? AND data_referencia = ? AND codigo_conta = ?
+				ORDER BY grupo = 'DF Consolidado' DESC, versao DESC LIMIT 1
+			""", (cnpj, periodo, codigo)).fetchone()
+		pl, lucro = (float(valores[c][0]) if valores[c] else math.nan for c in ('2.03', '3.11'))
+		resultado[cnpj] = lucro / pl * 100 if pl > 0 else math.nan
+	return resultado
+
+
+def main() -> None:
+	parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+	parser.add_argument('--empresas', type=int, default=700)
+	parser.add_argument('--periodos', type=int, default=4)
+	parser.add_argument('--contas-extras', type=int, default=40)
+	args = parser.parse_args()
+
+	with tempfile.TemporaryDirectory(prefix='dmarki_bench_') as tmp:
+		# antes de importar app.db: DB_PATH é lido no import
+		os.environ['DMARKI_DB_PATH'] = os.path.join(tmp, 'bench.db')
+		from app.db.bootstrap import apply_migrations
+		from app.db.repositories.importacao.cia_aberta_itr_repo import CiaAbertaItrRepo
+		from app.services.screener_service import ScreenerService, ranquear
+
+		apply_migrations()
+		repo = CiaAbertaItrRepo()
+		lotes = {tabela: [] for tabela in TABELAS}
+		for tabela, registro in gerar_contas(args.empresas, args.periodos, args.contas_extras):
+			lotes[tabela].append(registro)
+		for tabela, registros in lotes.items():
+			repo.inserir_lote(tabela, registros)
+		repo.conn.commit()
+		print(f"{sum(map(len, lotes.values())):,} contas, {args.empresas} empresas, {args.periodos} períodos")
+
+		service = ScreenerService(repo.conn)
+		periodo = service.periodos()[0]
+		for rotulo in ('Consulta + pivot (frio)', 'Cache (mesma carga)'):
+			inicio = time.perf_counter()
+			matriz = service.matriz(periodo)
+			ranking = ranquear(matriz, 'roe')
+			print(f"  {rotulo:<26} {(time.perf_counter() - inicio) * 1000:>9.1f} ms")
+
+		inicio = time.perf_counter()
+		referencia = roe_empresa_por_empresa(repo.conn, periodo)
+		print(f"  {'Empresa por empresa':<26} {(time.perf_counter() - inicio) * 1000:>9.1f} ms")
+
+		roe = matriz.indicadores['roe']
+		for i, cnpj in enumerate(matriz.cnpjs):
+			esperado = referencia[cnpj]
+			assert (math.isnan(esperado) and math.isnan(roe[i])) or math.isclose(esperado, roe[i]), cnpj
+		print(f"Período {periodo}: {len(matriz.cnpjs)} empresas, {len(ranking)} com ROE calculável")
+		repo.conn.close()
+
+
+if __name__ == '__main__':
+	main()
@@ -0,0 +1,38 @@
+"""
+Servidor HTTP local que imita o portal dados.cvm.gov.br para os benchmarks.
+
+Serve um diretório com a mesma estrutura de caminhos do portal; os serviços
+de importação são apontados para ele via DMARKI_CVM_DADOS_URL.
+"""
+import functools
+import threading
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+
+class _HandlerSilencioso(SimpleHTTPRequestHandler):
+
+	def log_message(self, format, *args):
+		pass
+
+
+class ServidorCvmLocal:
+	"""Context manager: sobe o servidor numa thread e expõe a URL base."""
+
+	def __init__(self, raiz: str, host: str = '127.0.0.1', porta: int = 0):
+		handler = functools.partial(_HandlerSilencioso, directory=raiz)
+		self._httpd = ThreadingHTTPServer((host, porta), handler)
+		self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+
+	@property
+	def url(self) -> str:
+		host, porta = self._httpd.server_address[:2]
+		return f'http://{host}:{porta}'
+
+	def __enter__(self):
+		self._thread.start()
+		return self
+
+	def __exit__(self, *exc):
+		self._httpd.shutdown()
+		self._httpd.server_close()
+		self._thread.join()
@@ -0,0 +1,89 @@
+"""
+Benchmark de inicialização: mede `python -X importtime -c "import app.main"`
+e falha (exit 1) se o tempo de import estourar o orçamento ou se algum módulo
+pesado, que só as telas de importação usam, for carregado antes do login.
+
+Uso (na raiz do projeto):
+	python -m benchmarks.startup_importtime
+	python -m benchmarks.startup_importtime --budget-ms 120 --runs 7
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+MODULO_ALVO = 'app.main'
+
+# Orçamento do import de app.main (cumulativo, mediana das execuções)
+ORCAMENTO_MS = 80.0
+
+# Não podem ser importados até o prompt de login
+MODULOS_PROIBIDOS = (
+	'requests', 'tqdm', 'csv', 'zipfile', 'pyfiglet',
+	'pandas', 'numpy', 'openpyxl',
+)
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def medir_importtime(modulo: str = MODULO_ALVO) -> dict[str, int]:
+	"""Executa um interpretador novo e retorna {módulo: cumulativo_us}."""
+	env = dict(os.environ, PYTHONPATH=RAIZ)
+	proc = subprocess.run(
+		[sys.executable, '-X', 'importtime', '-c', f'import {modulo}'],
+		cwd=RAIZ, env=env, capture_output=True, text=True,
+	)
+	if proc.returncode != 0:
+		raise RuntimeError(f'Falha ao importar {modulo}:\n{proc.stderr}')
+
+	tempos = {}
+	for linha in proc.stderr.splitlines():
+		if not linha.startswith('import time:') or 'cumulative' in linha:
+			continue
+		_, cumulativo, nome = linha[len('import time:'):].split('|')
+		if nome == ' site':
+			# o que o `site` carregou (.pth do ambiente) não é custo do app
+			tempos.clear()
+			continue
+		tempos[nome.strip()] = int(cumulativo)
+	return tempos
+
+
+def main(argv: list[str] | None = None) -> int:
+	parser = argparse.ArgumentParser(description='Orçamento de tempo de import até o login')
+	parser.add_argument('--budget-ms', type=float, default=ORCAMENTO_MS)
+	parser.add_argument('--runs', type=int, default=5)
+	args = parser.parse_args(argv)
+
+	execucoes = [medir_importtime() for _ in range(max(1, args.runs))]
+	total_ms = statistics.median(e[MODULO_ALVO] for e in execucoes) / 1000
+	carregados = set().union(*execucoes)
+	proibidos = [m for m in MODULOS_PROIBIDOS if m in carregados]
+
+	# 10 módulos de maior custo cumulativo na última execução (exceto o alvo)
+	ultimo = execucoes[-1]
+	maiores = sorted(
+		((us, nome) for nome, us in ultimo.items() if nome != MODULO_ALVO),
+		reverse=True,
+	)[:10]
+
+	print(f'import {MODULO_ALVO}: {total_ms:.1f} ms (mediana de {len(execucoes)}; orçamento {args.budget_ms:.1f} ms)')
+	print('Maiores custos cumulativos:')
+	for us, nome in maiores:
+		print(f'  {us / 1000:8.1f} ms  {nome}')
+
+	ok = True
+	if total_ms > args.budget_ms:
+		print(f'FALHA: orçamento estourado ({total_ms:.1f} ms > {args.budget_ms:.1f} ms)')
+		ok = False
+	if proibidos:
+		print(f'FALHA: módulos carregados antes do login: {", ".join(proibidos)}')
+		ok = False
+	if ok:
+		print('OK')
+	return 0 if ok else 1
+
+
+if __name__ == '__main__':
+	sys.exit(main())